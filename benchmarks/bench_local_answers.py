@@ -0,0 +1,53 @@
+"""
+Local Answer Engine Benchmark
+Index build time and single-core queries per second for the offline BM25 engine
+
+Usage: python benchmarks/bench_local_answers.py [seconds]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.project_info import PROJECT_INFO
+from utils.local_answers import LocalAnswerEngine
+
+QUERIES = [
+    'what ports does a pnode need?',
+    'how do I set up a vnode?',
+    'what is the xand token mint address',
+    'how do I vote on dao proposals',
+    'what are the hardware requirements for a pnode',
+    'what are the innovation eras',
+    'how do I update my vnode',
+    'is devnet live',
+    'where is the documentation',
+    'completely unrelated question about pizza',
+]
+
+
+def run(seconds: float = 3.0):
+    start = time.perf_counter()
+    engine = LocalAnswerEngine.build(PROJECT_INFO)
+    build = time.perf_counter() - start
+    print(f"build {build * 1000:.1f} ms  passages={len(engine.index.passages)}  terms={len(engine.index.postings)}")
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for query in QUERIES:
+            started = time.perf_counter()
+            engine.answer(query)
+            latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    total = sum(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{len(latencies)} queries  {len(latencies) / total:,.0f} qps  p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+
+if __name__ == '__main__':
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
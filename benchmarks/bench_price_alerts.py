@@ -0,0 +1,60 @@
+"""
+Price Alert Benchmark
+Time to find and remove the crossed alerts in a book of N subscriptions for ticks of different sizes
+
+Usage: python benchmarks/bench_price_alerts.py [alerts]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.price_alerts import AlertBook, PriceAlert, format_notifications
+
+# Thresholds are spread over $0.10-$0.50; the book starts with the price at $0.30
+TICKS = [
+    ('no alerts crossed', 0.30),
+    ('~0.1% crossed', 0.3002),
+    ('~1% crossed', 0.302),
+    ('~10% crossed', 0.32),
+]
+
+
+def build(count: int) -> AlertBook:
+    rng = random.Random(42)
+    alerts = []
+    for alert_id in range(count):
+        # Alerts only make sense on the far side of the current price
+        if alert_id % 2:
+            alert = PriceAlert(alert_id, rng.randrange(count // 10), rng.randrange(500), None, 'XAND', 'above', round(rng.uniform(0.30001, 0.5), 5))
+        else:
+            alert = PriceAlert(alert_id, rng.randrange(count // 10), rng.randrange(500), None, 'XAND', 'below', round(rng.uniform(0.1, 0.29999), 5))
+        alerts.append(alert)
+    book = AlertBook()
+    book.load(alerts)
+    return book
+
+
+def run(count: int = 100_000):
+    start = time.perf_counter()
+    book = build(count)
+    print(f"built {len(book):,} alerts in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for label, price in TICKS:
+        timings, fired, messages = [], 0, 0
+        for _ in range(5):
+            book = build(count)
+            started = time.perf_counter()
+            crossed = book.crossed(price)
+            timings.append(time.perf_counter() - started)
+            fired = len(crossed)
+            messages = sum(len(batch) for batch in format_notifications(price, crossed).values())
+        timings.sort()
+        print(f"{label:<18} price ${price:<7} fired {fired:>6,}  tick {timings[len(timings) // 2] * 1000:7.3f} ms  messages {messages}")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,55 @@
+"""
+Prometheus Parser Benchmark
+Times the streaming parser on synthetic multi-megabyte metrics payloads
+
+Usage: python benchmarks/bench_prometheus_parser.py [size_mb ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.project_info import VALIDATOR_METRIC_SERIES
+from utils.prometheus_parser import PrometheusStreamParser
+
+
+def build_fixture(size_mb: float) -> bytes:
+    """Build a payload of noise series with the whitelisted ones at the end"""
+    lines = []
+    size = 0
+    target = int(size_mb * 1024 * 1024)
+    i = 0
+    while size < target:
+        line = f'# HELP noise_metric_{i % 500} Filler series\n' if i % 50 == 0 else \
+            f'noise_metric_{i % 500}{{bucket="{i}",host="validator-1"}} {i * 0.5} 1700000000000\n'
+        lines.append(line)
+        size += len(line)
+        i += 1
+    lines.append('validator_slot_height 283746512\n')
+    lines.append('validator_vote_lag 2\n')
+    lines.append('validator_gossip_peers{cluster="devnet"} 143\n')
+    return ''.join(lines).encode()
+
+
+def run(size_mb: float, chunk_size: int = 64 * 1024, rounds: int = 5):
+    body = build_fixture(size_mb)
+    best = float('inf')
+    for _ in range(rounds):
+        parser = PrometheusStreamParser(VALIDATOR_METRIC_SERIES)
+        start = time.perf_counter()
+        for offset in range(0, len(body), chunk_size):
+            parser.feed(body[offset:offset + chunk_size])
+        samples = parser.close()
+        best = min(best, time.perf_counter() - start)
+
+    assert len(samples) == 3, samples
+    mb = len(body) / (1024 * 1024)
+    print(f"{mb:6.1f} MB  best {best * 1000:8.1f} ms  {mb / best:7.1f} MB/s  samples={len(samples)}")
+
+
+if __name__ == '__main__':
+    sizes = [float(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,101 @@
+"""
+Semantic Cache Benchmark
+False-hit rate and recall on labelled question pairs, then lookup latency at a given number of cached entries
+
+Usage: python benchmarks/bench_semantic_cache.py [entries] [dim]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.semantic_pairs import PAIRS
+
+TRIGGER_KEYWORDS = ('xandeum', 'xand', 'pnode', 'vnode', 'xandminer', 'devnet', 'validator', 'dao')
+VOCABULARY = (
+    'setup install update ports hardware requirements storage staking rewards price token vote proposal '
+    'network devnet mainnet rpc gossip disk ssd ram cpu ubuntu service logs monitor error restart sync '
+    'wallet solana realms governance era roadmap docs guide firewall latency peers slot height'
+).split()
+
+
+def synthetic_question(rng: random.Random) -> str:
+    words = rng.sample(VOCABULARY, rng.randint(2, 5)) + [rng.choice(TRIGGER_KEYWORDS)]
+    rng.shuffle(words)
+    return f"how do i {' '.join(words)}?"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def calibrate():
+    """Serve each pair's first question from a one-entry cache and look up the second"""
+    from utils.semantic_cache import SemanticCache
+
+    paraphrases = sum(label for _, _, label in PAIRS)
+    others = len(PAIRS) - paraphrases
+    print(f"labelled pairs: {paraphrases} paraphrases, {others} different questions")
+    print("threshold  false hits  recall")
+    for threshold in (0.3, 0.4, 0.5, 0.6, 0.7, 0.8):
+        os.environ['SEMANTIC_CACHE_THRESHOLD'] = str(threshold)
+        false_hits = hits = 0
+        wrong = []
+        for cached, asked, label in PAIRS:
+            cache = SemanticCache(TRIGGER_KEYWORDS)
+            cache.put(cached, 'v1', 'answer')
+            hit = cache.lookup(asked, 'v1') is not None
+            hits += hit and label
+            false_hits += hit and not label
+            if hit and not label:
+                wrong.append(f"{cached!r} -> {asked!r}")
+        print(f"{threshold:>9.1f}  {false_hits:>4}/{others} {false_hits / others:>4.0%}  {hits:>3}/{paraphrases} {hits / paraphrases:.0%}")
+        for pair in wrong:
+            print(f"           served: {pair}")
+    del os.environ['SEMANTIC_CACHE_THRESHOLD']
+
+
+def run(entries: int, dim: int):
+    os.environ['SEMANTIC_CACHE_SIZE'] = str(entries)
+    os.environ['SEMANTIC_CACHE_DIM'] = str(dim)
+    from utils.semantic_cache import SemanticCache
+
+    rng = random.Random(7)
+    cache = SemanticCache(TRIGGER_KEYWORDS)
+    asked = {}
+    start = time.perf_counter()
+    for i in range(entries):
+        question = synthetic_question(rng)
+        cache.put(question, 'v1', question)
+    fill = time.perf_counter() - start
+    print(f"\n{entries:,} entries x {dim} dims  buckets {len(cache._buckets)}  fill {fill:.1f}s")
+
+    queries = [synthetic_question(rng) for _ in range(200)]
+    single = []
+    for query in queries:
+        started = time.perf_counter()
+        asked[query] = cache.lookup(query, 'v1')
+        single.append(time.perf_counter() - started)
+    print(f"single lookup  p50 {percentile(single, 50) * 1000:.2f} ms  p99 {percentile(single, 99) * 1000:.2f} ms")
+
+    batch = 32
+    started = time.perf_counter()
+    for offset in range(0, len(queries), batch):
+        cache.lookup_batch(queries[offset:offset + batch], 'v1')
+    per_query = (time.perf_counter() - started) / len(queries)
+    print(f"batched x{batch}   {per_query * 1000:.3f} ms/query")
+
+    # Random questions only share an answer when they ask for the same set of words in another order
+    words = cache.embedder.words
+    served = [(query, hit[0]) for query, hit in asked.items() if hit is not None]
+    false_hits = sum(sorted(set(words(query))) != sorted(set(words(answer))) for query, answer in served)
+    print(f"random questions: {len(served)} hits of {len(asked)}, {false_hits} served another question's answer")
+
+
+if __name__ == '__main__':
+    calibrate()
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000, int(sys.argv[2]) if len(sys.argv) > 2 else 256)
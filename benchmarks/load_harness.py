@@ -0,0 +1,382 @@
+"""
+End-to-End Load Harness
+Feeds synthetic Discord traffic through bot.py with local Groq and project API stubs
+
+Usage:
+    python benchmarks/load_harness.py --scenario ai_storm --messages 2000 --concurrency 50
+    python benchmarks/load_harness.py --scenario all --output results.json
+    python benchmarks/load_harness.py --processes 4   # one harness per core, shared store as in cluster.py
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.runtime import install_event_loop, runtime_settings
+
+SCENARIOS = {
+    # Prefix commands served from static data or the project API stub
+    'command_storm': [
+        '!price', '!stake', '!validators', '!governance', '!network',
+        '!overview', '!technical', '!token', '!help', '!pnode', '!vnode', '!eras',
+    ],
+    # Plain messages that match the AI keyword trigger and go through the AI queue
+    'ai_storm': [
+        'what is a pnode?', 'how do I set up a vnode?', 'what ports does a pnode need?',
+        'is the xandeum devnet live?', 'how does dao voting work?', 'what is the xand token?',
+    ],
+    # Port checks against a public address; probes are simulated, see install_probe_stub
+    'port_burst': [
+        '!pnode-ports 45.76.10.20', '!vnode-ports 45.76.10.20', '!vnode-ports 45.76.10.20 --latency',
+    ],
+}
+
+# Shared by all scenarios: reusing a channel id would inherit its drained outbound send bucket
+CHANNEL_IDS = itertools.count(1)
+
+
+class FakeUser:
+    def __init__(self, user_id: int, bot: bool = False):
+        self.id = user_id
+        self.bot = bot
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+
+    def __eq__(self, other):
+        return isinstance(other, FakeUser) and other.id == self.id
+
+    def __hash__(self):
+        return self.id
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, recorder: 'Recorder'):
+        self.id = channel_id
+        self.recorder = recorder
+        self.sent: List[str] = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+        self.recorder.replied(self.id)
+
+    def typing(self):
+        return FakeTyping()
+
+
+class FakeMessage:
+    _ids = itertools.count(1)
+
+    def __init__(self, content: str, author: FakeUser, channel: FakeChannel, guild: FakeGuild):
+        self.id = next(self._ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.mentions = []
+        self.attachments = []
+        self._state = None
+
+
+class Recorder:
+    def __init__(self):
+        self.started: Dict[int, float] = {}
+        self.waiters: Dict[int, asyncio.Event] = {}
+        self.latencies: List[float] = []
+
+    def expect(self, channel_id: int) -> asyncio.Event:
+        self.started[channel_id] = time.perf_counter()
+        event = self.waiters[channel_id] = asyncio.Event()
+        return event
+
+    def replied(self, channel_id: int):
+        started = self.started.pop(channel_id, None)
+        if started is not None:
+            self.latencies.append(time.perf_counter() - started)
+            self.waiters.pop(channel_id).set()
+
+
+class LoopLagSampler:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(len(ordered) * pct / 100 + 0.5) - 1))]
+
+
+async def start_stubs(ai_delay: float, api_delay: float):
+    """Serve Groq and project API stubs on a local port"""
+    from aiohttp import web
+    from config.apis import MOCK_DATA
+
+    routes = {
+        '/status': 'network_status', '/price': 'price_data', '/staking': 'staking_info',
+        '/validators': 'validators', '/governance': 'governance',
+    }
+
+    async def project_api(request):
+        await asyncio.sleep(api_delay)
+        return web.json_response(MOCK_DATA[routes[request.path]])
+
+    async def groq(request):
+        payload = await request.json()
+        await asyncio.sleep(ai_delay)
+        question = payload['messages'][-1]['content']
+        return web.json_response({
+            'choices': [{'message': {'content': f"Stub answer to: {question}"}}],
+            'usage': {'prompt_tokens': 1500, 'completion_tokens': 120},
+        })
+
+    app = web.Application()
+    for path in routes:
+        app.router.add_get(path, project_api)
+    app.router.add_post('/openai/v1/chat/completions', groq)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def install_probe_stub(bot_commands, probe_delay: float):
+    """Replace real nc/connect probes with a timed sleep so bursts don't touch the network"""
+    port_checker = bot_commands.port_checker
+
+    async def check_port(ip_address, port, protocol='tcp'):
+        await asyncio.sleep(probe_delay)
+        return True, f"✅ {protocol.upper()} {port} is OPEN on {ip_address}"
+
+    async def measure_latency(ip_address, port, samples=5, timeout=3.0):
+        from array import array
+        await asyncio.sleep(probe_delay * samples)
+        return array('d', [probe_delay * 1000] * samples), 0
+
+    port_checker.check_port = check_port
+    port_checker.measure_latency = measure_latency
+
+
+async def setup_bot(args):
+    """Import bot.py against the stubs and make it runnable without a gateway connection"""
+    import bot as bot_module
+    from discord.ext import commands
+
+    class HarnessContext(commands.Context):
+        async def send(self, content=None, **kwargs):
+            await self.channel.send(content, **kwargs)
+
+    bot = bot_module.bot
+    bot.loop = asyncio.get_running_loop()
+    bot._connection.user = FakeUser(0, bot=True)
+
+    original_get_context = bot.get_context
+
+    async def get_context(origin, *, cls=HarnessContext):
+        return await original_get_context(origin, cls=cls)
+
+    bot.get_context = get_context
+    await bot_module.setup_hook()
+    install_probe_stub(bot_module.bot_commands, args.probe_delay)
+    return bot_module
+
+
+async def run_scenario(bot_module, name: str, args) -> Dict[str, object]:
+    """Drive one scenario with a closed loop of concurrent senders"""
+    recorder = Recorder()
+    sampler = LoopLagSampler()
+    corpus = SCENARIOS[name]
+    users = [FakeUser(1000 + i) for i in range(args.users)]
+    guilds = [FakeGuild(1 + i) for i in range(args.guilds)]
+    counter = itertools.count()
+    timeouts = 0
+
+    async def sender():
+        nonlocal timeouts
+        while next(counter) < args.messages:
+            channel = FakeChannel(next(CHANNEL_IDS), recorder)
+            message = FakeMessage(random.choice(corpus), random.choice(users), channel, random.choice(guilds))
+            replied = recorder.expect(channel.id)
+            await bot_module.on_message(message)
+            try:
+                await asyncio.wait_for(replied.wait(), args.reply_timeout)
+            except asyncio.TimeoutError:
+                timeouts += 1
+                recorder.started.pop(channel.id, None)
+                recorder.waiters.pop(channel.id, None)
+
+    sampler.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    await sampler.stop()
+
+    return {
+        'scenario': name,
+        'messages': args.messages,
+        'concurrency': args.concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'messages_per_s': round(args.messages / elapsed, 1),
+        'replies': len(recorder.latencies),
+        'timeouts': timeouts,
+        'latency_p50_ms': round(percentile(recorder.latencies, 50) * 1000, 2),
+        'latency_p99_ms': round(percentile(recorder.latencies, 99) * 1000, 2),
+        'loop_lag_p99_ms': round(percentile(sampler.samples, 99) * 1000, 2),
+        'loop_lag_max_ms': round(max(sampler.samples, default=0.0) * 1000, 2),
+    }
+
+
+async def main_async(args) -> Dict[str, object]:
+    runner, stub_url = await start_stubs(args.ai_delay, args.api_delay)
+    os.environ['PROJECT_API_URL'] = stub_url
+    os.environ['GROQ_API_URL'] = f"{stub_url}/openai/v1/chat/completions"
+    os.environ.setdefault('GROQ_API_KEY', 'harness')
+    os.environ['METRICS_PORT'] = '0'
+    # Fake channels have no Discord rate limits; keep the global send budget from capping throughput
+    os.environ.setdefault('OUTBOUND_GLOBAL_RATE', '100000')
+
+    try:
+        bot_module = await setup_bot(args)
+        names = list(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+        results = [await run_scenario(bot_module, name, args) for name in names]
+        await bot_module.shutdown.run()
+    finally:
+        from utils.http_client import close_session
+        await close_session()
+        await runner.cleanup()
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'loop': type(asyncio.get_running_loop()).__module__,
+        'config': vars(args),
+        'runtime': runtime_settings(),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'results': results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', choices=list(SCENARIOS) + ['all'], default='all')
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--guilds', type=int, default=5)
+    parser.add_argument('--ai-delay', type=float, default=0.2, help='Simulated Groq latency (s)')
+    parser.add_argument('--api-delay', type=float, default=0.02, help='Simulated project API latency (s)')
+    parser.add_argument('--probe-delay', type=float, default=0.05, help='Simulated per-port probe time (s)')
+    parser.add_argument('--reply-timeout', type=float, default=30.0)
+    parser.add_argument('--runtime', choices=['default', 'performance'], default='default',
+                        help='BOT_RUNTIME mode; performance installs uvloop when available')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Split the messages across this many processes sharing one SQLite store')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    return parser.parse_args(argv)
+
+
+def run_cluster(args, argv) -> Dict[str, object]:
+    """Run one harness process per cluster member and aggregate their throughput"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    workdir = tempfile.mkdtemp(prefix='harness-cluster-')
+    env = dict(os.environ, SHARED_STORE_PATH=os.path.join(workdir, 'state.db'))
+    per_process = max(1, args.messages // args.processes)
+    outputs = [os.path.join(workdir, f'cluster{index}.json') for index in range(args.processes)]
+    children = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), *argv,
+             '--processes', '1', '--messages', str(per_process), '--output', output],
+            env=env, stdout=subprocess.DEVNULL,
+        )
+        for output in outputs
+    ]
+    if any(child.wait() for child in children):
+        raise SystemExit("a cluster harness process failed")
+
+    reports = []
+    for output in outputs:
+        with open(output) as f:
+            reports.append(json.load(f))
+
+    results = []
+    for position, first in enumerate(reports[0]['results']):
+        parts = [report['results'][position] for report in reports]
+        results.append({
+            'scenario': first['scenario'],
+            'messages': sum(part['messages'] for part in parts),
+            'messages_per_s': round(sum(part['messages_per_s'] for part in parts), 1),
+            'timeouts': sum(part['timeouts'] for part in parts),
+            'latency_p99_ms': max(part['latency_p99_ms'] for part in parts),
+            'loop_lag_p99_ms': max(part['loop_lag_p99_ms'] for part in parts),
+        })
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'processes': args.processes,
+        'config': vars(args),
+        'results': results,
+        'per_process': reports,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ['BOT_RUNTIME'] = args.runtime
+    if args.processes > 1:
+        report = run_cluster(args, argv)
+    else:
+        install_event_loop()
+        report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
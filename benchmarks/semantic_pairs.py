@@ -0,0 +1,60 @@
+"""
+Semantic Cache Calibration Pairs
+Hand-labelled question pairs: True when one answer serves both, False when serving it would be wrong
+"""
+
+PAIRS = [
+    # Paraphrases
+    ("how to run a pnode", "pnode setup steps?", True),
+    ("how do I set up a pnode?", "pnode setup guide", True),
+    ("how can i install a pnode", "steps to set up pnode", True),
+    ("what ports does a pnode need?", "which ports are required for a pnode", True),
+    ("what port does pnode use for udp", "which udp port does a pnode use?", True),
+    ("pnode hardware requirements", "what hardware do I need for a pnode?", True),
+    ("what are the minimum hardware requirements for a pnode", "pnode hardware requirements?", True),
+    ("how much ram does a pnode need", "pnode memory requirements", True),
+    ("how much disk space does a pnode need", "pnode storage requirements", True),
+    ("how do i update my pnode", "pnode update steps", True),
+    ("how to upgrade xandminer", "xandminer update guide", True),
+    ("how do I install xandminer?", "xandminer installation steps", True),
+    ("what is the xand price", "current price of xand", True),
+    ("how much is xand worth?", "xand price?", True),
+    ("how do i vote in the dao", "how to vote on dao proposals", True),
+    ("how does dao voting work?", "explain dao voting", True),
+    ("where can i see dao proposals", "list dao proposals", True),
+    ("how do i stake xand", "xand staking guide", True),
+    ("what are the vnode hardware requirements", "vnode hardware requirements?", True),
+    ("how do I restart my vnode", "vnode restart steps", True),
+    ("what is a pnode?", "what's a pnode", True),
+    ("is devnet live?", "is the devnet live", True),
+    ("where are the xandeum docs", "xandeum documentation link", True),
+    ("how do i check my pnode is online", "how to check if pnode is online", True),
+    ("pnode setup guide", "pnode setpu guide", True),
+    ("how to configure the validator firewall", "validator firewall configuration", True),
+    ("what are the pnode rewards", "pnode reward info", True),
+
+    # Same topic, different question: serving the cached answer would be wrong
+    ("what port does pnode use for udp", "what port does pnode use for tcp", False),
+    ("what is the minimum ram for a pnode", "what is the minimum disk for a pnode", False),
+    ("how do i install xandminer", "how do i uninstall xandminer", False),
+    ("how do i update my pnode", "how do i set up my pnode", False),
+    ("how do i start my pnode", "how do i stop my pnode", False),
+    ("how do i restart my vnode", "how do i update my vnode", False),
+    ("what are the pnode hardware requirements", "what are the pnode rewards", False),
+    ("how do i stake xand", "how do i unstake xand", False),
+    ("what is the xand price", "what is the xand supply", False),
+    ("how do i vote in the dao", "how do i create a dao proposal", False),
+    ("pnode logs location", "pnode logs error", False),
+    ("why is my pnode offline", "why is my pnode slow", False),
+    ("how do i open port 5000 for pnode", "how do i open port 6000 for pnode", False),
+    ("pnode ubuntu setup", "pnode windows setup", False),
+    ("how to run a pnode on devnet", "how to run a pnode on mainnet", False),
+    ("what is the validator rpc port", "what is the validator gossip port", False),
+    ("how much ram does a vnode need", "how much cpu does a vnode need", False),
+    ("is the xandeum dao live", "who runs the xandeum dao", False),
+    ("how do i check pnode sync status", "how do i check pnode storage usage", False),
+    ("where do i get devnet sol", "where do i get devnet xand", False),
+    ("pnode keeps crashing after update", "pnode keeps crashing after restart", False),
+    ("how do i migrate my pnode to a new server", "how do i back up my pnode", False),
+    ("what are the xandeum eras", "what is the xandeum roadmap", False),
+]
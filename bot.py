@@ -3,23 +3,43 @@ Xandeum AI Bot - Main Bot File
 Discord bot for Xandeum project information and AI assistance using Groq
 """
 
-import discord
-from discord.ext import commands
+from utils.startup import startup_timer
 import asyncio
+import io
 import os
+import signal
+import sys
 import logging
+import time
+
+import discord
+from discord.ext import commands
+startup_timer.mark('import', 'discord.py (+aiohttp)')
+
 from dotenv import load_dotenv
+from utils.logging_setup import setup_logging, stop_logging
+startup_timer.mark('import', 'dotenv, logging setup')
+
 from utils.ai_handler import AIHandler
+from utils.ai_queue import AIWorkQueue
+from utils.metrics import metrics
+from utils.loop_monitor import LoopLagMonitor
 from commands.bot_commands import BotCommands
+from commands.slash_commands import register_slash_commands, sync_command_tree
+from commands.pagination import send_paginated, stats as pagination_stats
+from utils.runtime import install_event_loop, tune_loop
+from utils.shutdown import shutdown
+from utils.dispatcher import outbound
+from utils.http_client import close_session
+from config.knowledge import knowledge
+startup_timer.mark('import', 'bot modules')
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging; records are written by a background thread, never on the event loop
+setup_logging()
+startup_timer.mark('init', 'load .env, start log listener')
 logger = logging.getLogger(__name__)
 
 # Bot configuration
@@ -27,24 +47,99 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
 
-bot = commands.Bot(
-    command_prefix=os.getenv('BOT_PREFIX', '!'),
-    intents=intents,
-    help_command=None
-)
+def create_bot() -> commands.Bot:
+    """Plain bot by default; AutoShardedBot with BOT_SHARDING=auto or when cluster.py assigns SHARD_IDS"""
+    options = dict(command_prefix=os.getenv('BOT_PREFIX', '!'), intents=intents, help_command=None)
+    shard_ids = os.getenv('SHARD_IDS', '')
+    if shard_ids:
+        return commands.AutoShardedBot(
+            shard_ids=[int(shard) for shard in shard_ids.split(',')],
+            shard_count=int(os.getenv('SHARD_COUNT', '1')),
+            **options
+        )
+    if os.getenv('BOT_SHARDING', 'off').lower() == 'auto':
+        # Shard count comes from Discord's recommendation at login
+        return commands.AutoShardedBot(**options)
+    return commands.Bot(**options)
+
+bot = create_bot()
 
-# Initialize handlers
+# Initialize handlers; the AI system prompt is rendered lazily on first use
 ai_handler = AIHandler()
+ai_queue = AIWorkQueue(ai_handler, send_paginated)
+loop_monitor = LoopLagMonitor()
 bot_commands = None
+startup_timer.mark('init', 'bot and handler objects')
 
 @bot.event
-async def on_ready():
-    """Called when the bot is ready"""
+async def setup_hook():
+    """Called once before connecting to Discord"""
     global bot_commands
-    bot_commands = BotCommands(bot)
+    startup_timer.reset_clock()
+    tune_loop(asyncio.get_running_loop())
+    bot_commands = BotCommands(bot, ai_handler)
+    register_slash_commands(bot, lambda: bot_commands)
+    startup_timer.mark('setup', 'BotCommands, slash commands')
+    
+    ai_queue.start()
+    metrics.register_collector('ai_queue', ai_queue.stats)
+    loop_monitor.start()
+    metrics.register_collector('loop', loop_monitor.stats)
+    knowledge.start()
+    ai_handler.start()
+    metrics.register_collector('answers', lambda: ai_handler.answers.metrics)
+    metrics.register_collector('ai', lambda: ai_handler.metrics)
+    metrics.register_collector('ai_tiers', ai_handler.router.report)
+    metrics.register_collector('semantic_cache', lambda: ai_handler.semantic_cache.metrics)
+    metrics.register_collector('outbound', outbound.stats)
+    metrics.register_collector('pagination', lambda: pagination_stats)
+    metrics.register_collector('query_log', lambda: dict(ai_handler.query_log.metrics, **ai_handler.prewarmer.metrics))
+    await bot_commands.price_alerts.start()
+    await bot_commands.governance_feed.start()
+    startup_timer.mark('setup', 'AI workers, loop monitor, knowledge watchers, answer store, price alerts, governance feed')
+    
+    # Drains run concurrently under SHUTDOWN_TIMEOUT; flushes run afterwards in this order
+    shutdown.on_drain('AI queue', ai_queue.drain)
+    shutdown.on_flush('outbound messages', outbound.close)
+    shutdown.on_flush('knowledge watcher', knowledge.stop)
+    shutdown.on_flush('document ingestion', ai_handler.documents.stop)
+    shutdown.on_flush('query pre-warm', ai_handler.prewarmer.stop)
+    shutdown.on_flush('query log', ai_handler.query_log.close)
+    shutdown.on_flush('answer store', ai_handler.answers.close)
+    shutdown.on_flush('price alerts', bot_commands.price_alerts.stop)
+    shutdown.on_flush('governance feed', bot_commands.governance_feed.stop)
+    shutdown.on_flush('loop monitor', loop_monitor.stop)
+    shutdown.on_flush('metrics snapshot', metrics.write_snapshot)
+    shutdown.on_flush('metrics endpoint', metrics.stop_http_server)
+    shutdown.on_flush('HTTP session', close_session)
+    
+    await metrics.start_http_server()
+    startup_timer.mark('setup', 'metrics endpoint')
     
-    logger.info(f'{bot.user} has connected to Discord!')
+    # Only logged-in runs have an application id to sync against; in a cluster only one process syncs
+    if bot.application_id and os.getenv('SLASH_SYNC', '1') != '0':
+        await sync_command_tree(bot)
+        startup_timer.mark('setup', 'slash command sync check')
+
+@bot.before_invoke
+async def start_command_timer(ctx):
+    """Stamp every command invocation with its start time"""
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_latency(ctx):
+    """Record latency and outcome for every command, including failed ones"""
+    started_at = getattr(ctx, 'started_at', None)
+    if started_at is not None:
+        metrics.observe('command', ctx.command.qualified_name, time.perf_counter() - started_at, ctx.command_failed)
+
+@bot.event
+async def on_ready():
+    """Called when the bot is ready"""
+    logger.info(f'{bot.user} has connected to Discord in {startup_timer.elapsed():.2f}s!')
     logger.info(f'Bot is in {len(bot.guilds)} guild(s)')
+    if bot.shard_count:
+        logger.info(f'Running shard(s) {getattr(bot, "shard_ids", None) or [bot.shard_id]} of {bot.shard_count}')
     
     # Set bot status
     await bot.change_presence(
@@ -57,155 +152,184 @@ async def on_ready():
 @bot.event
 async def on_message(message):
     """Handle incoming messages"""
-    # Ignore messages from the bot itself
-    if message.author == bot.user:
+    # Ignore messages from the bot itself, and everything once a shutdown has started
+    if message.author == bot.user or shutdown.draining:
         return
     
     # Process commands first
     await bot.process_commands(message)
     
-    # Check if we should respond with AI
+    # Check if we should respond with AI; the reply is produced by the AI worker pool
     if ai_handler.should_respond_to_message(message.content):
-        try:
-            # Get AI response
-            response = await ai_handler.get_ai_response(message.content)
-            
-            # Send response
-            await message.channel.send(response)
-            
-        except Exception as e:
-            logger.error(f"Error processing AI response: {e}")
-            await message.channel.send("Sorry, I encountered an error processing your request.")
+        if not ai_queue.submit(message, message.content):
+            await outbound.send(message.channel, "I'm answering a lot of questions right now. Please try again in a moment.")
 
 @bot.command(name='price')
 async def price_command(ctx):
     """Get current XAN price"""
     response = await bot_commands.handle_price_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
+
+@bot.command(name='alert')
+async def alert_command(ctx, *, args: str = ""):
+    """Add, list or remove XAND price alerts"""
+    response = await bot_commands.handle_alert_command(ctx, args)
+    await send_paginated(ctx, response)
 
 @bot.command(name='stake')
 async def stake_command(ctx):
     """Get staking information"""
     response = await bot_commands.handle_stake_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='validators')
 async def validators_command(ctx):
     """Get validators information"""
     response = await bot_commands.handle_validators_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='governance')
 async def governance_command(ctx):
     """Get governance information"""
     response = await bot_commands.handle_governance_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
+
+@bot.command(name='governance-feed')
+@commands.has_permissions(manage_channels=True)
+async def governance_feed_command(ctx, action: str = ""):
+    """Subscribe this channel to governance proposal changes (manage channels)"""
+    response = await bot_commands.handle_governance_feed_command(ctx, action)
+    await send_paginated(ctx, response)
 
 @bot.command(name='network')
 async def network_command(ctx):
     """Get network status"""
     response = await bot_commands.handle_network_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='help')
 async def help_command(ctx):
     """Show help information"""
     response = await bot_commands.handle_help_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='overview')
 async def overview_command(ctx):
     """Show project overview"""
     response = await bot_commands.handle_overview_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='technical')
 async def technical_command(ctx):
     """Show technical specifications"""
     response = await bot_commands.handle_technical_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='token')
 async def token_command(ctx):
     """Show token information"""
     response = await bot_commands.handle_token_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='eras')
 async def eras_command(ctx):
     """Show innovation eras roadmap"""
     response = await bot_commands.handle_eras_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='docs')
 async def docs_command(ctx):
     """Show documentation links"""
     response = await bot_commands.handle_docs_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='pnode')
 async def pnode_command(ctx):
     """Show pNode information and setup guides"""
     response = await bot_commands.handle_pnode_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='pnode-setup')
 async def pnode_setup_command(ctx):
     """Show pNode setup requirements and guide"""
     response = await bot_commands.handle_pnode_setup_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='pnode-update')
 async def pnode_update_command(ctx):
     """Show pNode update instructions"""
     response = await bot_commands.handle_pnode_update_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='pnode-ports')
 async def pnode_ports_command(ctx, ip_address: str = ""):
     """Test pNode port connectivity"""
     response = await bot_commands.handle_pnode_ports_command(ctx, ip_address)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='vnode')
 async def vnode_command(ctx):
     """Show vNode information and setup guides"""
     response = await bot_commands.handle_vnode_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='vnode-setup')
 async def vnode_setup_command(ctx):
     """Show vNode setup requirements and guide"""
     response = await bot_commands.handle_vnode_setup_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='vnode-update')
 async def vnode_update_command(ctx):
     """Show vNode update instructions"""
     response = await bot_commands.handle_vnode_update_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='vnode-ports')
-async def vnode_ports_command(ctx, ip_address: str = ""):
-    """Test vNode port connectivity"""
-    response = await bot_commands.handle_vnode_ports_command(ctx, ip_address)
-    await ctx.send(response)
+async def vnode_ports_command(ctx, ip_address: str = "", mode: str = ""):
+    """Test vNode port connectivity (add --latency for connect timings)"""
+    response = await bot_commands.handle_vnode_ports_command(ctx, ip_address, mode)
+    await send_paginated(ctx, response)
+
+@bot.command(name='vnode-health')
+async def vnode_health_command(ctx, ip_address: str = ""):
+    """Scrape validator metrics from TCP 8002"""
+    response = await bot_commands.handle_vnode_health_command(ctx, ip_address)
+    await send_paginated(ctx, response)
 
 @bot.command(name='devnet')
 async def devnet_command(ctx):
     """Show DevNet information and resources"""
     response = await bot_commands.handle_devnet_command(ctx)
-    await ctx.send(response)
+    await send_paginated(ctx, response)
 
 @bot.command(name='ai')
 async def ai_command(ctx, *, question: str = ""):
     """Ask the AI a question"""
     if not question:
-        await ctx.send("Please provide a question. Example: `!ai What is Xandeum?`")
+        await outbound.send(ctx, "Please provide a question. Example: `!ai What is Xandeum?`")
         return
     
     response = await bot_commands.handle_ai_command(ctx, f"!ai {question}")
-    await ctx.send(response)
+    await send_paginated(ctx, response)
+
+@bot.command(name='stats')
+@commands.has_permissions(administrator=True)
+async def stats_command(ctx):
+    """Show command and upstream latency stats (admin only)"""
+    response = await bot_commands.handle_stats_command(ctx)
+    await send_paginated(ctx, response)
+
+@bot.command(name='profile')
+@commands.has_permissions(administrator=True)
+async def profile_command(ctx, seconds: float = 10.0):
+    """Sample the event loop and attach the hottest functions (admin only)"""
+    response, report = await bot_commands.handle_profile_command(ctx, seconds)
+    if report is None:
+        await send_paginated(ctx, response)
+        return
+    
+    await outbound.send(ctx, response, file=discord.File(io.BytesIO(report.encode()), filename='profile.txt'))
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -214,14 +338,64 @@ async def on_command_error(ctx, error):
         return  # Ignore unknown commands
     
     if isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"Missing required argument: {error.param}")
+        await outbound.send(ctx, f"Missing required argument: {error.param}")
+        return
+    
+    if isinstance(error, commands.MissingPermissions):
+        await outbound.send(ctx, "You don't have permission to use this command.")
         return
     
     logger.error(f"Command error: {error}")
-    await ctx.send("An error occurred while processing your command.")
+    await outbound.send(ctx, "An error occurred while processing your command.")
+
+async def profile_startup():
+    """Run the offline part of startup and print the phase breakdown"""
+    await setup_hook()
+    
+    startup_timer.reset_clock()
+    ai_handler.context
+    startup_timer.mark('lazy', 'AI system prompt (first AI call)')
+    
+    await shutdown.run()
+    
+    print("Startup profile (excludes interpreter start and the Discord gateway handshake)")
+    print(startup_timer.format_report())
+
+async def run_bot(token: str):
+    """Run until the gateway stops or SIGTERM/SIGINT arrives, then drain before disconnecting"""
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop_requested.set)
+        except NotImplementedError:  # Windows
+            pass
+    
+    # Starting the bot directly (not bot.run) keeps discord.py on our queue-based root logger
+    async with bot:
+        runner = asyncio.create_task(bot.start(token))
+        stopper = asyncio.create_task(stop_requested.wait())
+        await asyncio.wait({runner, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        
+        if stop_requested.is_set():
+            logger.info("Received shutdown signal")
+        # The gateway stays connected while draining so in-flight replies can still be sent
+        await shutdown.run()
+        await bot.close()
+        result, = await asyncio.gather(runner, return_exceptions=True)
+        if isinstance(result, Exception):
+            raise result
 
 def main():
     """Main function to run the bot"""
+    # BOT_RUNTIME=performance switches to uvloop when it is installed
+    install_event_loop()
+    
+    if '--startup-profile' in sys.argv:
+        asyncio.run(profile_startup())
+        return
+    
     # Get bot token
     token = os.getenv('DISCORD_TOKEN')
     
@@ -231,11 +405,13 @@ def main():
     
     # Run the bot
     try:
-        bot.run(token)
+        asyncio.run(run_bot(token))
     except discord.LoginFailure:
         logger.error("Failed to login to Discord. Please check your token.")
     except Exception as e:
         logger.error(f"Error running bot: {e}")
+    finally:
+        stop_logging()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Xandeum AI Bot - Cluster Launcher
+Runs the bot as several processes, each owning a group of gateway shards
+
+Usage:
+    python cluster.py --processes 4            # shard count from Discord's recommendation
+    python cluster.py --processes 2 --shards 8
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional
+import logging
+
+from dotenv import load_dotenv
+
+from utils.shared_store import SharedStore
+
+logger = logging.getLogger('cluster')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def recommended_shards(token: str) -> int:
+    """Ask Discord how many shards this bot should run"""
+    request = urllib.request.Request(
+        'https://discord.com/api/v10/gateway/bot',
+        headers={'Authorization': f'Bot {token}', 'User-Agent': 'xandeum-ai-bot cluster'},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return int(json.load(response)['shards'])
+
+
+def shard_groups(shard_count: int, processes: int) -> List[List[int]]:
+    """Split shard ids into contiguous groups, one per process"""
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    groups, start = [], 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+
+def cluster_env(index: int, shards: List[int], shard_count: int, args) -> Dict[str, str]:
+    """Environment for one cluster process"""
+    env = dict(os.environ)
+    env.update({
+        'SHARD_IDS': ','.join(str(shard) for shard in shards),
+        'SHARD_COUNT': str(shard_count),
+        'SHARED_STORE_PATH': args.store,
+        # Only the first process syncs slash commands
+        'SLASH_SYNC': '1' if index == 0 else '0',
+    })
+    metrics_port = int(os.getenv('METRICS_PORT', '9108'))
+    if metrics_port:
+        env['METRICS_PORT'] = str(metrics_port + index)
+    log_file = os.getenv('LOG_FILE', '')
+    if log_file:
+        stem, ext = os.path.splitext(log_file)
+        env['LOG_FILE'] = f"{stem}.{index}{ext}"
+    # Each process diffs the governance feed for its own shards' subscribers
+    stem, ext = os.path.splitext(os.getenv('GOVERNANCE_FEED_STATE', 'governance_feed.json'))
+    env['GOVERNANCE_FEED_STATE'] = f"{stem}.{index}{ext}"
+    # Query logs are per process (the report reads them all); only the first process pre-warms
+    query_log = os.getenv('QUERY_LOG_PATH', 'queries.log')
+    if query_log:
+        stem, ext = os.path.splitext(query_log)
+        env['QUERY_LOG_PATH'] = f"{stem}.{index}{ext}"
+    if index:
+        env['QUERY_PREWARM_TOP'] = '0'
+    # Each process appends to and compacts its own document index; sharing one would corrupt its offsets
+    env['KNOWLEDGE_INDEX_DIR'] = f"{os.getenv('KNOWLEDGE_INDEX_DIR', '.knowledge_index')}.{index}"
+    return env
+
+
+def spawn(index: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start one bot process"""
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'bot.py')], env=env, cwd=ROOT)
+    logger.info(f"Cluster {index} (shards {env['SHARD_IDS']}) started as pid {process.pid}")
+    return process
+
+
+def supervise(envs: List[Dict[str, str]], restart_delay: float, healthy_after: float, store: SharedStore):
+    """Keep every cluster process running and forward SIGTERM/SIGINT to all of them"""
+    processes = [spawn(index, env) for index, env in enumerate(envs)]
+    next_purge = time.monotonic() + 3600
+    restarts = [0] * len(envs)
+    started = [time.monotonic()] * len(envs)
+    # When a crashed process is due to be restarted; the loop keeps polling the others meanwhile
+    restart_at: List[Optional[float]] = [None] * len(envs)
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        time.sleep(1)
+        if time.monotonic() >= next_purge:
+            store.purge_expired()
+            next_purge = time.monotonic() + 3600
+        for index, process in enumerate(processes):
+            if stopping:
+                break
+            now = time.monotonic()
+            if restart_at[index] is not None:
+                if now >= restart_at[index]:
+                    restart_at[index] = None
+                    processes[index] = spawn(index, envs[index])
+                    started[index] = time.monotonic()
+                continue
+            code = process.poll()
+            if code is None:
+                continue
+            # A process that stayed up long enough counts as recovered, so its backoff starts over
+            if now - started[index] >= healthy_after:
+                restarts[index] = 0
+            restarts[index] += 1
+            delay = min(60.0, restart_delay * 2 ** min(restarts[index] - 1, 6))
+            logger.warning(f"Cluster {index} exited with code {code}, restarting in {delay:.0f}s")
+            restart_at[index] = now + delay
+
+    for process in processes:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--shards', type=int, default=0, help='Total shard count (default: Discord recommendation)')
+    parser.add_argument('--store', default=os.getenv('SHARED_STORE_PATH', 'cluster_state.db'),
+                        help='SQLite file shared by all processes for caches and rate limits')
+    parser.add_argument('--restart-delay', type=float, default=5.0)
+    parser.add_argument('--healthy-after', type=float, default=300.0,
+                        help='Seconds a process must stay up before its restart backoff resets')
+    args = parser.parse_args(argv)
+
+    shard_count = args.shards
+    if not shard_count:
+        token = os.getenv('DISCORD_TOKEN')
+        if not token:
+            logger.error("No Discord token found! Please set DISCORD_TOKEN in your .env file")
+            return
+        shard_count = recommended_shards(token)
+        logger.info(f"Discord recommends {shard_count} shard(s)")
+
+    groups = shard_groups(shard_count, args.processes)
+    envs = [cluster_env(index, shards, shard_count, args) for index, shards in enumerate(groups)]
+    supervise(envs, args.restart_delay, args.healthy_after, SharedStore(args.store))
+
+
+if __name__ == "__main__":
+    main()
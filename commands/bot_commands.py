@@ -5,18 +5,95 @@ Handles all Discord bot commands and responses
 
 import discord
 from discord.ext import commands
-from typing import Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 import asyncio
+import logging
 from config.apis import ProjectAPIClient, get_mock_data
 from utils.ai_handler import AIHandler
 from utils.port_checker import PortChecker
-from config.project_info import PROJECT_INFO, BOT_COMMANDS
+from utils.rate_limiter import ProbeBudget, ProbeRejected
+from utils.resolver import ResolutionError
+from utils.metrics import metrics
+from utils.loop_monitor import SamplingProfiler
+from utils.shutdown import shutdown
+from utils.dispatcher import outbound
+from utils.price_alerts import PriceAlertMonitor, DIRECTIONS
+from utils.governance_feed import GovernanceFeed
+from config.project_info import BOT_COMMANDS
+from config.knowledge import knowledge
+
+logger = logging.getLogger(__name__)
+
+# Shared so that queued notifications for one channel can be coalesced into one message
+NOTIFY_MENTIONS = discord.AllowedMentions(everyone=False, roles=False, users=True)
 
 class BotCommands:
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, ai_handler: Optional[AIHandler] = None):
         self.bot = bot
-        self.ai_handler = AIHandler()
+        self.ai_handler = ai_handler or AIHandler()
         self.port_checker = PortChecker()
+        self.probe_budget = ProbeBudget()
+        self.profiler = SamplingProfiler()
+        self.price_alerts = PriceAlertMonitor(self._send_to_channel, self._fetch_price, self._owns_guild)
+        self.governance_feed = GovernanceFeed(self._send_to_channel, self._fetch_proposals, self._owns_guild)
+        # Invocations of !ai and /ai, which answer inline instead of through the AI queue
+        self._ai_commands: Set[asyncio.Task] = set()
+        
+        metrics.register_collector('price_alerts', lambda: self.price_alerts.metrics)
+        metrics.register_collector('governance_feed', lambda: self.governance_feed.metrics)
+        metrics.register_collector('probes', lambda: dict(self.probe_budget.metrics, queue_depth=self.probe_budget.queue_depth))
+        metrics.register_collector('dns', lambda: self.port_checker.resolver.metrics)
+        shutdown.on_drain('port probes', self.probe_budget.drain)
+        shutdown.on_drain('AI commands', self.drain_ai_commands)
+    
+    async def _run_probe(self, ctx, target: str, probe: Callable[[str], Awaitable[Any]]) -> Tuple[str, Any]:
+        """Resolve a target and probe it under the per-user, per-guild and global probe budgets; returns (address, result)"""
+        author = getattr(ctx, 'author', None)
+        guild = getattr(ctx, 'guild', None)
+        
+        async def notify_queued(position: int):
+            await outbound.send(ctx, f"⏳ Port checker is busy - you are #{position} in the queue.")
+        
+        user_id, guild_id = getattr(author, 'id', None), getattr(guild, 'id', None)
+        # Charged before resolving, so hostname lookups count against the rate limits too
+        await self.probe_budget.check_rate(user_id, guild_id)
+        address = await self.port_checker.resolve_target(target)
+        try:
+            async with self.probe_budget.slot(notify_queued):
+                return address, await probe(address)
+        except ProbeRejected:
+            # Turned away by the full queue; the attempt should not use up the user's or guild's rate
+            await self.probe_budget.refund(user_id, guild_id)
+            raise
+    
+    def _owns_guild(self, guild_id: Optional[int]) -> bool:
+        """Whether this process runs the shard for a guild; DMs belong to shard 0"""
+        shard_count = self.bot.shard_count
+        if not shard_count:
+            return True
+        shard_id = (guild_id >> 22) % shard_count if guild_id else 0
+        return shard_id in (getattr(self.bot, 'shard_ids', None) or [self.bot.shard_id or 0])
+    
+    async def _fetch_price(self) -> Optional[float]:
+        """Live XAND price for the alert monitor; None when the API is unavailable"""
+        async with ProjectAPIClient() as api_client:
+            price_data = await api_client.get_price_data()
+        if "error" in price_data or price_data.get('price_usd') is None:
+            return None
+        return float(price_data['price_usd'])
+    
+    async def _fetch_proposals(self) -> Optional[list]:
+        """Live governance proposals for the change feed; None when the API is unavailable"""
+        async with ProjectAPIClient() as api_client:
+            governance_data = await api_client.get_governance_proposals()
+        if "error" in governance_data:
+            return None
+        return governance_data.get('proposals', [])
+    
+    async def _send_to_channel(self, channel_id: int, content: str):
+        """Post a background notification, pinging users but never roles or @everyone"""
+        channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+        await outbound.send(channel, content, allowed_mentions=NOTIFY_MENTIONS)
     
     async def handle_price_command(self, ctx) -> str:
         """Handle !price command"""
@@ -27,6 +104,9 @@ class BotCommands:
             if "error" in price_data:
                 # Use mock data if API fails
                 price_data = await get_mock_data("price_data")
+            elif price_data.get('price_usd') is not None:
+                # Every live price is also an alert tick
+                self.price_alerts.observe(float(price_data['price_usd']))
             
             return f"""
 **XAND Price Information**
@@ -120,6 +200,26 @@ class BotCommands:
         except Exception as e:
             return f"Error fetching governance data: {str(e)}"
     
+    async def handle_governance_feed_command(self, ctx, action: str = "") -> str:
+        """Handle !governance-feed command: subscribe this channel to proposal changes"""
+        action = action.lower()
+        channel_id = ctx.channel.id
+        if action in ('on', 'subscribe'):
+            guild = getattr(ctx, 'guild', None)
+            if await self.governance_feed.subscribe(channel_id, getattr(guild, 'id', None)):
+                return "✅ This channel will get new governance proposals, status changes and closures."
+            return "This channel is already subscribed to the governance feed."
+        if action in ('off', 'unsubscribe'):
+            if await self.governance_feed.unsubscribe(channel_id):
+                return "✅ This channel is unsubscribed from the governance feed."
+            return "This channel isn't subscribed to the governance feed."
+        if action in ('', 'status'):
+            subscribed = "subscribed" if channel_id in self.governance_feed.channels else "not subscribed"
+            return (f"🏛️ This channel is **{subscribed}** to the governance feed "
+                    f"({len(self.governance_feed.proposals)} proposals tracked).\n"
+                    f"Usage: `!governance-feed on` or `!governance-feed off`")
+        return "❌ Usage: `!governance-feed on`, `!governance-feed off` or `!governance-feed status`"
+    
     async def handle_network_command(self, ctx) -> str:
         """Handle !network command"""
         try:
@@ -195,8 +295,9 @@ class BotCommands:
     
     async def handle_pnode_command(self, ctx) -> str:
         """Handle !pnode command"""
-        pnode_info = PROJECT_INFO.get('pnodes', {})
-        pnode_specs = PROJECT_INFO.get('pnode_specs', {})
+        project_info = knowledge.current.project_info
+        pnode_info = project_info.get('pnodes', {})
+        pnode_specs = project_info.get('pnode_specs', {})
         
         return f"""
 **pNode Information**
@@ -229,7 +330,8 @@ class BotCommands:
     
     async def handle_pnode_update_command(self, ctx) -> str:
         """Handle !pnode-update command"""
-        pnode_info = PROJECT_INFO.get('pnodes', {})
+        project_info = knowledge.current.project_info
+        pnode_info = project_info.get('pnodes', {})
         
         return f"""
 **pNode Update Guide**
@@ -251,24 +353,29 @@ class BotCommands:
     async def handle_pnode_ports_command(self, ctx, ip_address: str = "") -> str:
         """Handle !pnode-ports command"""
         if not ip_address:
-            return "Please provide an IP address. Example: `!pnode-ports 192.168.1.100`"
+            return "Please provide an IP address or hostname. Example: `!pnode-ports 45.76.10.20`"
         
-        # Validate IP address
-        if not self.port_checker.validate_ip_address(ip_address):
-            return "❌ Invalid IP address format. Please provide a valid IP address (e.g., 192.168.1.100)"
+        # Validate IP address or hostname
+        if not self.port_checker.validate_target(ip_address):
+            return "❌ Invalid address. Please provide a public IPv4/IPv6 address or hostname (e.g., 45.76.10.20 or node.example.com)"
         
         try:
             # Check all pNode ports
-            results = await self.port_checker.check_pnode_ports(ip_address)
-            return self.port_checker.format_port_results(ip_address, results, "pNode")
+            address, results = await self._run_probe(ctx, ip_address, self.port_checker.check_pnode_ports)
+            return self.port_checker.format_port_results(self.port_checker.describe_target(ip_address, address), results, "pNode")
             
+        except ResolutionError as e:
+            return f"❌ {e}"
+        except ProbeRejected as e:
+            return f"⏳ {e}"
         except Exception as e:
             return f"❌ Error checking ports: {str(e)}"
     
     async def handle_vnode_command(self, ctx) -> str:
         """Handle !vnode command"""
-        vnode_info = PROJECT_INFO.get('vnodes', {})
-        vnode_specs = PROJECT_INFO.get('vnode_specs', {})
+        project_info = knowledge.current.project_info
+        vnode_info = project_info.get('vnodes', {})
+        vnode_specs = project_info.get('vnode_specs', {})
         
         return f"""
 **vNode Information**
@@ -304,7 +411,8 @@ class BotCommands:
     
     async def handle_vnode_update_command(self, ctx) -> str:
         """Handle !vnode-update command"""
-        vnode_info = PROJECT_INFO.get('vnodes', {})
+        project_info = knowledge.current.project_info
+        vnode_info = project_info.get('vnodes', {})
         
         return f"""
 **vNode Update Guide**
@@ -324,31 +432,67 @@ class BotCommands:
 • Test on DevNet before mainnet
         """.strip()
     
-    async def handle_vnode_ports_command(self, ctx, ip_address: str = "") -> str:
+    async def handle_vnode_ports_command(self, ctx, ip_address: str = "", mode: str = "") -> str:
         """Handle !vnode-ports command"""
         if not ip_address:
-            return "Please provide an IP address. Example: `!vnode-ports 192.168.1.100`"
+            return "Please provide an IP address or hostname. Example: `!vnode-ports 45.76.10.20`"
+        
+        # Validate IP address or hostname
+        if not self.port_checker.validate_target(ip_address):
+            return "❌ Invalid address. Please provide a public IPv4/IPv6 address or hostname (e.g., 45.76.10.20 or node.example.com)"
         
-        # Validate IP address
-        if not self.port_checker.validate_ip_address(ip_address):
-            return "❌ Invalid IP address format. Please provide a valid IP address (e.g., 192.168.1.100)"
+        if mode and mode != "--latency":
+            return f"❌ Unknown option `{mode}`. Example: `!vnode-ports 45.76.10.20 --latency`"
         
         try:
+            if mode == "--latency":
+                # Timed connects against the TCP vNode ports
+                address, results = await self._run_probe(ctx, ip_address, self.port_checker.check_vnode_latency)
+                label = self.port_checker.describe_target(ip_address, address)
+                return self.port_checker.format_latency_results(label, results, "vNode")
+            
             # Check all vNode ports
-            results = await self.port_checker.check_vnode_ports(ip_address)
-            return self.port_checker.format_port_results(ip_address, results, "vNode")
+            address, results = await self._run_probe(ctx, ip_address, self.port_checker.check_vnode_ports)
+            return self.port_checker.format_port_results(self.port_checker.describe_target(ip_address, address), results, "vNode")
             
+        except ResolutionError as e:
+            return f"❌ {e}"
+        except ProbeRejected as e:
+            return f"⏳ {e}"
         except Exception as e:
             return f"❌ Error checking ports: {str(e)}"
     
+    async def handle_vnode_health_command(self, ctx, ip_address: str = "") -> str:
+        """Handle !vnode-health command"""
+        if not ip_address:
+            return "Please provide an IP address or hostname. Example: `!vnode-health 45.76.10.20`"
+        
+        # Validate IP address or hostname
+        if not self.port_checker.validate_target(ip_address):
+            return "❌ Invalid address. Please provide a public IPv4/IPv6 address or hostname (e.g., 45.76.10.20 or node.example.com)"
+        
+        try:
+            address, health = await self._run_probe(ctx, ip_address, self.port_checker.check_vnode_health)
+            return self.port_checker.format_health_results(self.port_checker.describe_target(ip_address, address), health)
+            
+        except ResolutionError as e:
+            return f"❌ {e}"
+        except ProbeRejected as e:
+            return f"⏳ {e}"
+        except asyncio.TimeoutError:
+            return f"❌ Timed out fetching validator metrics from {ip_address}:8002"
+        except Exception as e:
+            return f"❌ Error fetching validator metrics: {str(e)}"
+    
     async def handle_devnet_command(self, ctx) -> str:
         """Handle !devnet command"""
         return self.port_checker.get_devnet_info()
     
     async def handle_dao_command(self, ctx) -> str:
         """Handle !dao command"""
-        dao_info = PROJECT_INFO.get('dao', {})
-        dao_specs = PROJECT_INFO.get('dao_specs', {})
+        project_info = knowledge.current.project_info
+        dao_info = project_info.get('dao', {})
+        dao_specs = project_info.get('dao_specs', {})
         
         return f"""
 **Xandeum DAO Information**
@@ -374,7 +518,8 @@ class BotCommands:
     
     async def handle_dao_proposals_command(self, ctx) -> str:
         """Handle !dao-proposals command"""
-        dao_info = PROJECT_INFO.get('dao', {})
+        project_info = knowledge.current.project_info
+        dao_info = project_info.get('dao', {})
         
         return f"""
 **DAO Proposals**
@@ -402,7 +547,8 @@ class BotCommands:
     
     async def handle_dao_vote_command(self, ctx) -> str:
         """Handle !dao-vote command"""
-        dao_info = PROJECT_INFO.get('dao', {})
+        project_info = knowledge.current.project_info
+        dao_info = project_info.get('dao', {})
         
         return f"""
 **DAO Voting Information**
@@ -428,6 +574,63 @@ class BotCommands:
 🔗 **DAO Platform:** {dao_info.get('dao_platform', 'N/A')}
         """.strip()
     
+    async def handle_alert_command(self, ctx, args: str = "") -> str:
+        """Handle !alert command: add, list or remove price alerts"""
+        usage = "Usage: `!alert XAND above 0.30`, `!alert XAND below 0.20`, `!alert list` or `!alert remove <id>`"
+        user_id = ctx.author.id
+        parts = args.split()
+        
+        if not parts or parts[0].lower() == 'list':
+            alerts = self.price_alerts.book.for_user(user_id)
+            if not alerts:
+                return f"You have no price alerts.\n{usage}"
+            lines = [f"#{alert.id} {alert.symbol} {alert.direction} ${alert.threshold:,.4f}" for alert in alerts]
+            return "**Your price alerts**\n" + "\n".join(lines)
+        
+        if parts[0].lower() in ('remove', 'cancel', 'delete'):
+            if len(parts) != 2 or not parts[1].lstrip('#').isdigit():
+                return f"❌ {usage}"
+            alert_id = int(parts[1].lstrip('#'))
+            if await self.price_alerts.remove(user_id, alert_id):
+                return f"✅ Removed price alert #{alert_id}."
+            return f"❌ You have no price alert #{alert_id}. See `!alert list`."
+        
+        if len(parts) != 3 or parts[1].lower() not in DIRECTIONS:
+            return f"❌ {usage}"
+        symbol, direction = parts[0].upper(), parts[1].lower()
+        try:
+            threshold = float(parts[2].lstrip('$'))
+        except ValueError:
+            return f"❌ `{parts[2]}` is not a price. {usage}"
+        
+        current = self.price_alerts.last_price
+        if current is not None and (current >= threshold if direction == 'above' else current <= threshold):
+            return f"❌ XAND is already at ${current:,.4f}, which is {direction} ${threshold:,.4f}."
+        
+        guild = getattr(ctx, 'guild', None)
+        try:
+            alert = await self.price_alerts.add(user_id, ctx.channel.id, getattr(guild, 'id', None), symbol, direction, threshold)
+        except ValueError as e:
+            return f"❌ {e}"
+        return f"🔔 Alert #{alert.id} set: I'll ping you here when {symbol} goes {direction} ${threshold:,.4f}."
+    
+    async def handle_stats_command(self, ctx) -> str:
+        """Handle !stats command"""
+        return metrics.format_summary()
+    
+    async def handle_profile_command(self, ctx, seconds: float = 10.0) -> Tuple[str, Optional[str]]:
+        """Handle !profile command, returning a summary and the report to attach"""
+        if not 1 <= seconds <= 60:
+            return "Please choose a duration between 1 and 60 seconds. Example: `!profile 10`", None
+        
+        await outbound.send(ctx, f"🔬 Profiling the event loop for {seconds:g}s...")
+        try:
+            report = await self.profiler.profile(seconds)
+        except RuntimeError as e:
+            return f"❌ {e}", None
+        
+        return f"**Profile complete** ({seconds:g}s) - hot functions are in the attached report.", report
+    
     async def handle_ai_command(self, ctx, message: str) -> str:
         """Handle AI-powered responses"""
         # Remove the command prefix from the message
@@ -436,7 +639,27 @@ class BotCommands:
         if not clean_message:
             return "Please provide a question after !ai. For example: `!ai What is Xandeum?`"
         
-        return await self.ai_handler.get_ai_response(clean_message)
+        # Track the whole invocation, reply included, so shutdown waits for it before closing the HTTP session
+        task = asyncio.current_task()
+        if task is not None and task not in self._ai_commands:
+            self._ai_commands.add(task)
+            task.add_done_callback(self._ai_commands.discard)
+        
+        trigger = 'slash' if getattr(ctx, 'interaction', None) is not None else 'command'
+        return await self.ai_handler.get_ai_response(clean_message, trigger)
+    
+    async def drain_ai_commands(self, timeout: float):
+        """Wait for running !ai and /ai invocations, cancelling any still running at the deadline"""
+        tasks = set(self._ai_commands)
+        if not tasks:
+            return
+        logger.info(f"Waiting for {len(tasks)} AI command(s) to finish")
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning(f"Cancelling {len(pending)} AI command(s) still running at the deadline")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
     
     def get_command_handler(self, command: str):
         """Get the appropriate command handler"""
@@ -445,6 +668,7 @@ class BotCommands:
             '!stake': self.handle_stake_command,
             '!validators': self.handle_validators_command,
             '!governance': self.handle_governance_command,
+            '!governance-feed': self.handle_governance_feed_command,
             '!network': self.handle_network_command,
             '!help': self.handle_help_command,
             '!overview': self.handle_overview_command,
@@ -460,10 +684,13 @@ class BotCommands:
             '!vnode-setup': self.handle_vnode_setup_command,
             '!vnode-update': self.handle_vnode_update_command,
             '!vnode-ports': self.handle_vnode_ports_command,
+            '!vnode-health': self.handle_vnode_health_command,
             '!devnet': self.handle_devnet_command,
             '!dao': self.handle_dao_command,
             '!dao-proposals': self.handle_dao_proposals_command,
-            '!dao-vote': self.handle_dao_vote_command
+            '!dao-vote': self.handle_dao_vote_command,
+            '!alert': self.handle_alert_command,
+            '!stats': self.handle_stats_command
         }
         
         return command_handlers.get(command) 
\ No newline at end of file
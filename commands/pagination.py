@@ -0,0 +1,81 @@
+"""
+Pagination Module
+Sends long replies as a first page plus buttons that page through the cached remainder
+"""
+
+import os
+from typing import List, Optional
+
+import discord
+
+from utils.dispatcher import outbound
+from utils.formatting import split_message
+
+# Exposed through the 'pagination' metrics collector
+stats = {'paginated': 0, 'pages_cached': 0, 'page_turns': 0}
+
+
+class PaginatedView(discord.ui.View):
+    """Holds every page of one reply; buttons only swap cached text, nothing is recomputed"""
+
+    def __init__(self, pages: List[str], timeout: float):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.index = 0
+        self.message: Optional[discord.Message] = None
+        self._sync()
+
+    def _sync(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index == len(self.pages) - 1
+        self.page_counter.label = f"{self.index + 1}/{len(self.pages)}"
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        self.index = max(0, min(index, len(self.pages) - 1))
+        self._sync()
+        stats['page_turns'] += 1
+        await interaction.response.edit_message(content=self.pages[self.index], view=self)
+
+    @discord.ui.button(label='◀', style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label='1/1', style=discord.ButtonStyle.secondary, disabled=True)
+    async def page_counter(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+
+    @discord.ui.button(label='▶', style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self):
+        """Drop the buttons and the cached pages once the view expires"""
+        stats['pages_cached'] -= len(self.pages)
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
+async def send_paginated(destination, text: str, **kwargs):
+    """Send text that may exceed Discord's limit: the first page now, the rest behind buttons.
+
+    Interaction contexts reply through their webhook; channels and command contexts go through the
+    outbound dispatcher.
+    """
+    if getattr(destination, 'interaction', None) is not None:
+        send = destination.send
+    else:
+        async def send(content, **options):
+            return await outbound.send(destination, content, **options)
+
+    pages = split_message(text)
+    if len(pages) == 1:
+        return await send(text, **kwargs)
+
+    view = PaginatedView(pages, float(os.getenv('PAGINATION_TIMEOUT', '900')))
+    stats['paginated'] += 1
+    stats['pages_cached'] += len(pages)
+    view.message = await send(pages[0], view=view, **kwargs)
+    return view.message
@@ -0,0 +1,239 @@
+"""
+Slash Commands Module
+Exposes the BotCommands handlers as application commands with deferred responses
+"""
+
+import hashlib
+import io
+import json
+import os
+import time
+from typing import Callable, Optional
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from commands.pagination import send_paginated
+from utils.metrics import metrics
+from utils.shutdown import shutdown
+
+logger = logging.getLogger(__name__)
+
+# Slash command name -> (BotCommands handler, description) for handlers that take no arguments
+SIMPLE_COMMANDS = {
+    'price': ('handle_price_command', "Get current XAND price"),
+    'stake': ('handle_stake_command', "Get staking information"),
+    'validators': ('handle_validators_command', "Get validators information"),
+    'governance': ('handle_governance_command', "Get governance information"),
+    'network': ('handle_network_command', "Get network status"),
+    'help': ('handle_help_command', "Show help information"),
+    'overview': ('handle_overview_command', "Show project overview"),
+    'technical': ('handle_technical_command', "Show technical specifications"),
+    'token': ('handle_token_command', "Show token information"),
+    'eras': ('handle_eras_command', "Show innovation eras roadmap"),
+    'docs': ('handle_docs_command', "Show documentation links"),
+    'pnode': ('handle_pnode_command', "Show pNode information and setup guides"),
+    'pnode-setup': ('handle_pnode_setup_command', "Show pNode setup requirements and guide"),
+    'pnode-update': ('handle_pnode_update_command', "Show pNode update instructions"),
+    'vnode': ('handle_vnode_command', "Show vNode information and setup guides"),
+    'vnode-setup': ('handle_vnode_setup_command', "Show vNode setup requirements and guide"),
+    'vnode-update': ('handle_vnode_update_command', "Show vNode update instructions"),
+    'devnet': ('handle_devnet_command', "Show DevNet information and resources"),
+    'dao': ('handle_dao_command', "Show DAO information and governance platform"),
+    'dao-proposals': ('handle_dao_proposals_command', "Show current DAO proposals"),
+    'dao-vote': ('handle_dao_vote_command', "Show DAO voting information"),
+}
+
+
+def in_guild(interaction: discord.Interaction) -> bool:
+    """Runtime counterpart to guild_only, which Discord applies only to the command picker"""
+    if interaction.guild is None:
+        raise app_commands.NoPrivateMessage()
+    return True
+
+
+class InteractionContext:
+    """Minimal stand-in for commands.Context so prefix handlers can serve interactions"""
+
+    def __init__(self, interaction: discord.Interaction):
+        self.interaction = interaction
+        self.author = interaction.user
+        self.guild = interaction.guild
+        self.channel = interaction.channel
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        """Progress messages become follow-ups on the deferred interaction"""
+        return await self.interaction.followup.send(content, **kwargs)
+
+
+def register_slash_commands(bot: commands.Bot, get_handlers: Callable[[], object]):
+    """Add every handler to the bot's command tree; get_handlers returns the live BotCommands"""
+    tree = bot.tree
+
+    async def interaction_check(interaction: discord.Interaction) -> bool:
+        """Turn away new interactions while the bot is draining for a restart"""
+        if shutdown.draining:
+            await interaction.response.send_message("🔄 The bot is restarting, please try again in a moment.", ephemeral=True)
+            return False
+        interaction.extras['started_at'] = time.perf_counter()
+        return True
+
+    def record_latency(interaction: discord.Interaction, failed: bool):
+        """Record slash command latency under the same metric as prefix commands"""
+        started_at = interaction.extras.get('started_at')
+        if started_at is not None and interaction.command is not None:
+            metrics.observe('command', interaction.command.qualified_name, time.perf_counter() - started_at, failed)
+
+    async def on_app_command_completion(interaction: discord.Interaction, command):
+        """Record latency for slash commands that returned normally"""
+        record_latency(interaction, False)
+
+    async def on_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Refuse failed checks plainly and replace the deferred "thinking…" state with an error message"""
+        name = interaction.command.qualified_name if interaction.command else '?'
+        if isinstance(error, app_commands.NoPrivateMessage):
+            message = "This command can only be used in a server."
+        elif isinstance(error, app_commands.MissingPermissions):
+            message = "You don't have permission to use this command."
+        elif isinstance(error, app_commands.CheckFailure):
+            message = "You can't use this command here."
+        else:
+            record_latency(interaction, True)
+            logger.error(f"Slash command /{name} failed: {error}", exc_info=getattr(error, 'original', error))
+            message = "An error occurred while processing your command."
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException as e:
+            logger.warning(f"Could not report slash command error: {e}")
+
+    tree.interaction_check = interaction_check
+    tree.on_error = on_error
+    bot.add_listener(on_app_command_completion)
+
+    def simple_command(name: str, handler_name: str, description: str) -> app_commands.Command:
+        async def callback(interaction: discord.Interaction):
+            await interaction.response.defer(thinking=True)
+            response = await getattr(get_handlers(), handler_name)(InteractionContext(interaction))
+            await send_paginated(InteractionContext(interaction), response)
+        return app_commands.Command(name=name, description=description, callback=callback)
+
+    for name, (handler_name, description) in SIMPLE_COMMANDS.items():
+        tree.add_command(simple_command(name, handler_name, description))
+
+    @tree.command(name='pnode-ports', description="Test pNode port connectivity")
+    @app_commands.describe(address="Public IPv4/IPv6 address or hostname")
+    async def pnode_ports(interaction: discord.Interaction, address: str):
+        await interaction.response.defer(thinking=True)
+        response = await get_handlers().handle_pnode_ports_command(InteractionContext(interaction), address)
+        await send_paginated(InteractionContext(interaction), response)
+
+    @tree.command(name='vnode-ports', description="Test vNode port connectivity")
+    @app_commands.describe(address="Public IPv4/IPv6 address or hostname", latency="Report connect latency percentiles")
+    async def vnode_ports(interaction: discord.Interaction, address: str, latency: bool = False):
+        await interaction.response.defer(thinking=True)
+        mode = "--latency" if latency else ""
+        response = await get_handlers().handle_vnode_ports_command(InteractionContext(interaction), address, mode)
+        await send_paginated(InteractionContext(interaction), response)
+
+    @tree.command(name='vnode-health', description="Show validator metrics from TCP 8002")
+    @app_commands.describe(address="Public IPv4/IPv6 address or hostname")
+    async def vnode_health(interaction: discord.Interaction, address: str):
+        await interaction.response.defer(thinking=True)
+        response = await get_handlers().handle_vnode_health_command(InteractionContext(interaction), address)
+        await send_paginated(InteractionContext(interaction), response)
+
+    @tree.command(name='ai', description="Ask the AI a question about Xandeum")
+    @app_commands.describe(question="Your question")
+    async def ai(interaction: discord.Interaction, question: str):
+        await interaction.response.defer(thinking=True)
+        response = await get_handlers().handle_ai_command(InteractionContext(interaction), f"!ai {question}")
+        await send_paginated(InteractionContext(interaction), response)
+
+    @tree.command(name='governance-feed', description="Post governance proposal changes in this channel")
+    @app_commands.describe(action="on, off or status")
+    @app_commands.choices(action=[app_commands.Choice(name=choice, value=choice) for choice in ('on', 'off', 'status')])
+    @app_commands.default_permissions(manage_channels=True)
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_channels=True)
+    @app_commands.check(in_guild)
+    async def governance_feed(interaction: discord.Interaction, action: str = 'status'):
+        await interaction.response.defer(thinking=True)
+        response = await get_handlers().handle_governance_feed_command(InteractionContext(interaction), action)
+        await send_paginated(InteractionContext(interaction), response)
+
+    @tree.command(name='alert', description="Get pinged when the XAND price crosses a threshold")
+    @app_commands.describe(request="`XAND above 0.30`, `XAND below 0.20`, `list` or `remove <id>`")
+    async def alert(interaction: discord.Interaction, request: str = "list"):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        response = await get_handlers().handle_alert_command(InteractionContext(interaction), request)
+        await send_paginated(InteractionContext(interaction), response, ephemeral=True)
+
+    @tree.command(name='stats', description="Show command and upstream latency stats")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.check(in_guild)
+    async def stats(interaction: discord.Interaction):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        response = await get_handlers().handle_stats_command(InteractionContext(interaction))
+        await send_paginated(InteractionContext(interaction), response, ephemeral=True)
+
+    @tree.command(name='profile', description="Sample the event loop and attach the hottest functions")
+    @app_commands.describe(seconds="Sampling duration (1-60)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.check(in_guild)
+    async def profile(interaction: discord.Interaction, seconds: app_commands.Range[float, 1, 60] = 10.0):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        response, report = await get_handlers().handle_profile_command(InteractionContext(interaction), seconds)
+        if report is None:
+            await send_paginated(InteractionContext(interaction), response, ephemeral=True)
+            return
+        await interaction.followup.send(
+            response, file=discord.File(io.BytesIO(report.encode()), filename='profile.txt'), ephemeral=True
+        )
+
+
+def command_tree_hash(bot: commands.Bot, guild_id: Optional[int]) -> str:
+    """Stable hash of the command payloads that would be synced"""
+    payloads = []
+    for command in bot.tree.get_commands():
+        try:
+            payloads.append(command.to_dict(bot.tree))
+        except TypeError:  # discord.py < 2.4 takes no tree argument
+            payloads.append(command.to_dict())
+    payloads.sort(key=lambda payload: payload['name'])
+    blob = json.dumps({'guild': guild_id, 'commands': payloads}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+async def sync_command_tree(bot: commands.Bot):
+    """Sync application commands only when their definitions changed since the last sync"""
+    state_file = os.getenv('SLASH_SYNC_STATE', '.slash_commands.sha256')
+    guild_id = int(os.getenv('DISCORD_GUILD_ID')) if os.getenv('DISCORD_GUILD_ID', '').isdigit() else None
+    digest = command_tree_hash(bot, guild_id)
+
+    try:
+        with open(state_file) as f:
+            if f.read().strip() == digest:
+                logger.info("Slash commands unchanged, skipping sync")
+                return
+    except OSError:
+        pass
+
+    if guild_id is not None:
+        guild = discord.Object(id=guild_id)
+        bot.tree.copy_global_to(guild=guild)
+        synced = await bot.tree.sync(guild=guild)
+    else:
+        synced = await bot.tree.sync()
+
+    with open(state_file, 'w') as f:
+        f.write(digest)
+    logger.info(f"Synced {len(synced)} slash command(s)")
@@ -3,12 +3,13 @@ API Configuration and Utilities
 Handles external API calls for real-time project data
 """
 
-import aiohttp
 import asyncio
 import json
 from typing import Dict, Any, Optional
 import os
 from dotenv import load_dotenv
+from utils.metrics import metrics
+from utils.http_client import get_session
 
 load_dotenv()
 
@@ -19,13 +20,14 @@ class ProjectAPIClient:
         self.session = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Borrow the shared pooled session; it is closed on shutdown, not per request
+        self.session = await get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        self.session = None
     
+    @metrics.timed('project_api.status', is_error=lambda result: 'error' in result)
     async def get_network_status(self) -> Dict[str, Any]:
         """Get current network status"""
         try:
@@ -37,6 +39,7 @@ class ProjectAPIClient:
         except Exception as e:
             return {"error": str(e)}
     
+    @metrics.timed('project_api.price', is_error=lambda result: 'error' in result)
     async def get_price_data(self) -> Dict[str, Any]:
         """Get current token price data"""
         try:
@@ -48,6 +51,7 @@ class ProjectAPIClient:
         except Exception as e:
             return {"error": str(e)}
     
+    @metrics.timed('project_api.staking', is_error=lambda result: 'error' in result)
     async def get_staking_info(self) -> Dict[str, Any]:
         """Get current staking information"""
         try:
@@ -59,6 +63,7 @@ class ProjectAPIClient:
         except Exception as e:
             return {"error": str(e)}
     
+    @metrics.timed('project_api.validators', is_error=lambda result: 'error' in result)
     async def get_validators(self) -> Dict[str, Any]:
         """Get list of active validators"""
         try:
@@ -70,6 +75,7 @@ class ProjectAPIClient:
         except Exception as e:
             return {"error": str(e)}
     
+    @metrics.timed('project_api.governance', is_error=lambda result: 'error' in result)
     async def get_governance_proposals(self) -> Dict[str, Any]:
         """Get current governance proposals"""
         try:
@@ -0,0 +1,150 @@
+"""
+Knowledge Store
+Hot-reloadable project data with atomically swapped snapshots of derived artifacts
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Optional
+import logging
+
+try:
+    import yaml
+except ImportError:  # Optional: only needed for YAML project info files
+    yaml = None
+
+from config.project_info import PROJECT_INFO
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s-]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so trivially different questions match"""
+    return _WHITESPACE.sub(' ', _PUNCTUATION.sub(' ', text.lower())).strip()
+
+
+class KnowledgeSnapshot:
+    def __init__(self, project_info: Dict[str, Any], builders: Dict[str, Callable[[Dict[str, Any]], Any]]):
+        self.project_info = project_info
+        self.version = hashlib.sha256(
+            json.dumps(project_info, sort_keys=True, default=str).encode()
+        ).hexdigest()[:12]
+        self.faq_index = {
+            normalize_question(question): answer
+            for question, answer in project_info.get('faq', {}).items()
+        }
+        self._builders = builders
+        self._artifacts: Dict[str, Any] = {}
+
+    def artifact(self, name: str) -> Any:
+        """Return a derived artifact, rendering it on first use"""
+        if name not in self._artifacts:
+            self._artifacts[name] = self._builders[name](self.project_info)
+        return self._artifacts[name]
+
+    def build_all(self):
+        """Render every registered artifact up front"""
+        for name in self._builders:
+            self.artifact(name)
+
+
+class KnowledgeStore:
+    def __init__(self):
+        self.path = os.getenv('PROJECT_INFO_FILE') or None
+        self.poll_interval = float(os.getenv('PROJECT_INFO_POLL', '5'))
+        self._builders: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._mtime: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.current = KnowledgeSnapshot(self._load_initial(), self._builders)
+
+    def register_builder(self, name: str, builder: Callable[[Dict[str, Any]], Any]):
+        """Register a derived artifact that is rebuilt whenever the project data changes"""
+        self._builders[name] = builder
+
+    def _load_initial(self) -> Dict[str, Any]:
+        """Load the data file at startup, falling back to the bundled defaults"""
+        if not self.path:
+            return PROJECT_INFO
+        try:
+            self._mtime = os.stat(self.path).st_mtime
+            return self._read(self.path)
+        except Exception as e:
+            logger.error(f"Could not load {self.path}, using bundled project info: {e}")
+            return PROJECT_INFO
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        """Parse a JSON or YAML data file layered over the bundled defaults"""
+        is_yaml = path.endswith(('.yaml', '.yml'))
+        if is_yaml and yaml is None:
+            raise RuntimeError("PyYAML is not installed; run `pip install PyYAML` or use a JSON file")
+        with open(path, encoding='utf-8') as f:
+            if is_yaml:
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("project data must be a mapping at the top level")
+        return {**PROJECT_INFO, **data}
+
+    def _prepare(self, path: str) -> KnowledgeSnapshot:
+        """Parse the file and render every artifact, off the event loop"""
+        snapshot = KnowledgeSnapshot(self._read(path), self._builders)
+        snapshot.build_all()
+        return snapshot
+
+    def start(self):
+        """Load the configured data file and start watching it for changes"""
+        # The store is built at import, before bot.py loads .env; pick up settings made there
+        path = os.getenv('PROJECT_INFO_FILE') or None
+        self.poll_interval = float(os.getenv('PROJECT_INFO_POLL', '5'))
+        if path != self.path:
+            self.path = path
+            self._mtime = None
+            self.current = KnowledgeSnapshot(self._load_initial(), self._builders)
+        if self.path and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+            logger.info(f"Watching {self.path} for project info changes")
+
+    async def stop(self):
+        """Stop the file watcher"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self):
+        """Poll the file mtime and swap in a fully built snapshot when it changes"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                mtime = (await loop.run_in_executor(None, os.stat, self.path)).st_mtime
+            except OSError as e:
+                logger.warning(f"Cannot stat {self.path}: {e}")
+                continue
+            if mtime == self._mtime:
+                continue
+
+            try:
+                snapshot = await loop.run_in_executor(None, self._prepare, self.path)
+            except Exception as e:
+                logger.error(f"Ignoring invalid project info in {self.path}: {e}")
+                self._mtime = mtime
+                continue
+
+            self._mtime = mtime
+            if snapshot.version != self.current.version:
+                # Single reference assignment: readers see either the old or the new snapshot
+                self.current = snapshot
+                logger.info(f"Project info reloaded (version {snapshot.version})")
+
+
+# Shared store; readers should take `knowledge.current` once per request
+knowledge = KnowledgeStore()
@@ -213,12 +213,22 @@ API_ENDPOINTS = {
     "dao_proposals": "https://api.xandeum.network/dao/proposals"
 }
 
+# Validator metrics series reported by !vnode-health, mapped to display labels
+VALIDATOR_METRIC_SERIES = {
+    "validator_slot_height": "📦 Slot Height",
+    "validator_vote_lag": "🗳️ Vote Lag (slots)",
+    "validator_gossip_peers": "🌐 Gossip Peers",
+    "validator_rpc_peers": "🔗 RPC Peers"
+}
+
 # Commands that the bot can execute
 BOT_COMMANDS = {
     "!price": "Get current XAN price (when available)",
+    "!alert": "Get pinged when XAND crosses a price (e.g. !alert XAND above 0.30, !alert list, !alert remove <id>)",
     "!stake": "Get staking information (when available)",
     "!validators": "List active validators (when available)",
     "!governance": "Show current governance proposals (when available)",
+    "!governance-feed": "Post new proposals, status changes and closures in this channel (on/off, manage channels)",
     "!network": "Show network status (when available)",
     "!help": "Show all available commands",
     "!overview": "Show project overview",
@@ -229,11 +239,12 @@ BOT_COMMANDS = {
     "!pnode": "Show pNode information and setup guides",
     "!pnode-setup": "Show pNode setup requirements and guide",
     "!pnode-update": "Show pNode update instructions",
-    "!pnode-ports": "Test pNode port connectivity (requires IP address)",
+    "!pnode-ports": "Test pNode port connectivity (requires IP or hostname)",
     "!vnode": "Show vNode information and setup guides",
     "!vnode-setup": "Show vNode setup requirements and guide",
     "!vnode-update": "Show vNode update instructions",
-    "!vnode-ports": "Test vNode port connectivity (requires IP address)",
+    "!vnode-ports": "Test vNode port connectivity (requires IP or hostname, add --latency for timings)",
+    "!vnode-health": "Show validator metrics from TCP 8002 (requires IP or hostname)",
     "!devnet": "Show DevNet information and resources",
     "!dao": "Show DAO information and governance platform",
     "!dao-proposals": "Show current DAO proposals (when available)",
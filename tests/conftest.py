@@ -0,0 +1,9 @@
+"""
+Test Configuration
+Puts the repository root on sys.path so tests import the bot's packages directly
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
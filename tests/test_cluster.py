@@ -0,0 +1,91 @@
+"""
+Cluster Supervisor Tests
+Restart backoff, its reset after a healthy run, and that one crashing process never stalls the others
+"""
+
+import pytest
+
+import cluster
+
+
+class FakeProcess:
+    pid = 0
+
+    def __init__(self, clock, lifetime):
+        self.clock = clock
+        self.ends_at = clock[0] + lifetime
+        self.signals = []
+
+    def poll(self):
+        return 1 if self.clock[0] >= self.ends_at else None
+
+    def send_signal(self, signum):
+        self.signals.append(signum)
+        self.ends_at = self.clock[0]
+
+    def wait(self, timeout=None):
+        return 0
+
+
+class FakeStore:
+    def purge_expired(self):
+        pass
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    """Run supervise() on a fake clock; returns (spawns per index, clock when it returned)"""
+    def run(lifetimes, stop_at, restart_delay=5.0, healthy_after=300.0):
+        clock = [0.0]
+        handlers = {}
+        spawns = {index: [] for index in range(len(lifetimes))}
+
+        def spawn(index, env):
+            spawns[index].append(clock[0])
+            lifetime = lifetimes[index][min(len(spawns[index]), len(lifetimes[index])) - 1]
+            return FakeProcess(clock, lifetime)
+
+        def sleep(seconds):
+            clock[0] += seconds
+            if clock[0] >= stop_at and not handlers['stopped']:
+                handlers['stopped'] = True
+                handlers[cluster.signal.SIGTERM](cluster.signal.SIGTERM, None)
+
+        handlers['stopped'] = False
+        monkeypatch.setattr(cluster, 'spawn', spawn)
+        monkeypatch.setattr(cluster.time, 'sleep', sleep)
+        monkeypatch.setattr(cluster.time, 'monotonic', lambda: clock[0])
+        monkeypatch.setattr(cluster.signal, 'signal', lambda signum, handler: handlers.__setitem__(signum, handler))
+        cluster.supervise([{}] * len(lifetimes), restart_delay, healthy_after, FakeStore())
+        return spawns, clock[0]
+    return run
+
+
+def test_backoff_doubles_and_resets_after_a_healthy_run(supervisor):
+    spawns, _ = supervisor([[10, 10, 10, 400, 10, 1e9]], stop_at=1000)
+    downtime = [later - earlier - lifetime for earlier, later, lifetime in zip(spawns[0], spawns[0][1:], [10, 10, 10, 400, 10])]
+    # Each restart waits the backoff plus at most one polling tick
+    for waited, backoff in zip(downtime, [5, 10, 20, 5, 10]):
+        assert backoff <= waited <= backoff + 1
+
+
+def test_crash_looping_process_does_not_delay_the_others(supervisor):
+    spawns, _ = supervisor([[10] * 50, [30, 1e9]], stop_at=200)
+    # Process 1 dies at 30 and is due back after 5s, whatever process 0 is doing
+    assert len(spawns[1]) == 2
+    assert spawns[1][1] <= 30 + 5 + 1
+
+
+def test_stop_is_not_held_up_by_a_pending_restart(supervisor):
+    _, stopped_at = supervisor([[10] * 50], stop_at=60, restart_delay=60.0)
+    assert stopped_at <= 61
+
+
+def test_processes_get_their_own_knowledge_index(monkeypatch):
+    monkeypatch.delenv('KNOWLEDGE_INDEX_DIR', raising=False)
+
+    class Args:
+        store = 'cluster_state.db'
+
+    dirs = [cluster.cluster_env(index, [index], 2, Args())['KNOWLEDGE_INDEX_DIR'] for index in range(2)]
+    assert dirs == ['.knowledge_index.0', '.knowledge_index.1']
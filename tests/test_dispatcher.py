@@ -0,0 +1,118 @@
+"""
+Outbound Dispatcher Tests
+Which pending sends are merged, which are sent alone, and what happens on overflow
+"""
+
+import asyncio
+
+import pytest
+
+from utils.dispatcher import OutboundDispatcher
+from utils.formatting import MESSAGE_LIMIT
+
+
+class FakeChannel:
+    def __init__(self, channel_id=1):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+        return len(self.sent)
+
+
+class FakeContext:
+    """Command context: sends to its channel"""
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class FakeInteractionContext(FakeContext):
+    """Slash command context: follow-ups go to the interaction webhook, not the channel"""
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        self.interaction = object()
+        self.followups = []
+
+    async def send(self, content=None, **kwargs):
+        self.followups.append((content, kwargs))
+        return 'followup'
+
+
+@pytest.fixture(autouse=True)
+def outbound_settings(monkeypatch):
+    monkeypatch.setenv('OUTBOUND_COALESCE', '1')
+    monkeypatch.setenv('OUTBOUND_MAX_QUEUE', '50')
+
+
+def burst(sends):
+    """Queue every (destination, content, kwargs) before the channel worker runs; return the results"""
+    async def main():
+        dispatcher = OutboundDispatcher()
+        results = await asyncio.gather(*(dispatcher.send(d, c, **k) for d, c, k in sends))
+        return results, dispatcher.stats()
+    return asyncio.run(main())
+
+
+def test_plain_replies_in_one_channel_are_merged():
+    channel = FakeChannel()
+    results, stats = burst([(channel, 'one', {}), (channel, 'two', {}), (channel, 'three', {})])
+    assert channel.sent == [('one\n\ntwo\n\nthree', {})]
+    assert results == [1, 1, 1]
+    assert stats['coalesced'] == 2 and stats['sent_messages'] == 1
+
+
+def test_different_options_are_not_merged():
+    channel = FakeChannel()
+    burst([(channel, 'one', {}), (channel, 'two', {'allowed_mentions': None}), (channel, 'three', {'file': 'x'})])
+    assert [content for content, _ in channel.sent] == ['one', 'two', 'three']
+
+
+def test_attachments_are_never_merged():
+    channel = FakeChannel()
+    burst([(channel, 'one', {'file': 'a'}), (channel, 'two', {'file': 'a'})])
+    assert len(channel.sent) == 2
+
+
+def test_different_destination_types_are_not_merged():
+    channel = FakeChannel()
+    burst([(channel, 'notification', {}), (FakeContext(channel), 'reply', {})])
+    assert [content for content, _ in channel.sent] == ['notification', 'reply']
+
+
+def test_interaction_followups_bypass_the_channel_queue():
+    channel = FakeChannel()
+    interaction = FakeInteractionContext(channel)
+    results, stats = burst([(channel, 'public', {}), (interaction, 'private', {'ephemeral': True})])
+    assert channel.sent == [('public', {})]
+    assert interaction.followups == [('private', {'ephemeral': True})]
+    assert results == [1, 'followup']
+    assert stats['direct'] == 1 and stats['coalesced'] == 0
+
+
+def test_merging_stops_at_the_message_limit():
+    channel = FakeChannel()
+    half = 'x' * (MESSAGE_LIMIT // 2)
+    burst([(channel, half, {}), (channel, half, {}), (channel, 'tail', {})])
+    assert [len(content) for content, _ in channel.sent] == [len(half), len(half) + 2 + len('tail')]
+
+
+def test_overflow_drops_the_oldest_reply(monkeypatch):
+    monkeypatch.setenv('OUTBOUND_MAX_QUEUE', '2')
+    channel = FakeChannel()
+    results, stats = burst([(channel, 'one', {}), (channel, 'two', {}), (channel, 'three', {})])
+    assert results[0] is None
+    assert channel.sent == [('two\n\nthree', {})]
+    assert stats['dropped'] == 1
+
+
+def test_coalescing_can_be_turned_off(monkeypatch):
+    monkeypatch.setenv('OUTBOUND_COALESCE', '0')
+    channel = FakeChannel()
+    burst([(channel, 'one', {}), (channel, 'two', {})])
+    assert [content for content, _ in channel.sent] == ['one', 'two']
@@ -0,0 +1,158 @@
+"""
+Document Ingestion Tests
+Chunk overlap and coverage, incremental ingestion, stored term counts and compaction
+"""
+
+import os
+
+import pytest
+
+from utils import ingest
+from utils.ingest import DocumentIndex, stream_chunks
+from utils.local_answers import BM25Index
+
+WORDS = [f"word{i}" for i in range(400)]
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def chunk_words(chunks):
+    return [text.split() for _, text in chunks]
+
+
+@pytest.mark.parametrize('overlap', [-1, 50, 80])
+def test_overlap_must_stay_below_half_the_chunk(tmp_path, overlap):
+    path = write(tmp_path / 'doc.md', 'text')
+    with pytest.raises(ValueError):
+        list(stream_chunks(path, 100, overlap))
+
+
+@pytest.mark.parametrize('size, overlap', [(100, 0), (100, 20), (120, 49), (300, 60)])
+def test_chunks_cover_every_word_in_order(tmp_path, size, overlap):
+    path = write(tmp_path / 'doc.md', ' '.join(WORDS) + ' last')
+    chunks = chunk_words(stream_chunks(path, size, overlap))
+    assert chunks[-1][-1] == 'last'
+
+    rebuilt = list(chunks[0])
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # Each chunk starts with whole words from the end of the previous chunk, then continues the text
+        shared = next(n for n in range(len(chunk), -1, -1) if previous[len(previous) - n:] == chunk[:n])
+        assert len(' '.join(chunk[:shared])) <= overlap
+        rebuilt.extend(chunk[shared:])
+    assert rebuilt == WORDS + ['last']
+
+
+def test_text_already_in_the_last_chunk_is_not_emitted_twice(tmp_path):
+    path = write(tmp_path / 'doc.md', ' '.join(WORDS[:40]))
+    chunks = list(stream_chunks(path, 100, 30))
+    assert all(text for _, text in chunks)
+    assert not any(later in earlier for (_, earlier), (_, later) in zip(chunks, chunks[1:]))
+
+
+def test_chunks_carry_the_latest_heading(tmp_path):
+    path = write(tmp_path / 'doc.md', '# Intro\n' + 'alpha ' * 30 + '\n## Setup\n' + 'beta ' * 30 + '\n')
+    headings = [heading for heading, _ in stream_chunks(path, 100, 10)]
+    assert headings[0] == 'Intro' and headings[-1] == 'Setup'
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    monkeypatch.setenv('KNOWLEDGE_DIR', str(tmp_path / 'knowledge'))
+    monkeypatch.setenv('KNOWLEDGE_INDEX_DIR', str(tmp_path / 'index'))
+    monkeypatch.setenv('KNOWLEDGE_CHUNK_CHARS', '200')
+    monkeypatch.setenv('KNOWLEDGE_CHUNK_OVERLAP', '40')
+    write(tmp_path / 'knowledge' / 'pnode.md', '# pNode\n' + 'pnode storage setup guide ' * 20)
+    write(tmp_path / 'knowledge' / 'vnode.md', '# vNode\n' + 'validator voting rewards ' * 20)
+    return tmp_path / 'knowledge'
+
+
+def load(index):
+    added, removed, report = index.ingest()
+    index._apply(added, removed)
+    return added, removed, report
+
+
+def test_unchanged_files_are_not_reingested(docs):
+    index = DocumentIndex()
+    added, _, report = load(index)
+    assert report['files_changed'] == 2 and added
+
+    added, removed, report = load(index)
+    assert (added, removed, report['files_changed'], report['chunks_added']) == ({}, [], 0, 0)
+
+
+def test_edited_file_replaces_only_its_chunks(docs):
+    index = DocumentIndex()
+    load(index)
+    vnode_chunks = set(index._files['vnode.md']['chunks'])
+    old_pnode_chunks = set(index._files['pnode.md']['chunks'])
+
+    write(docs / 'pnode.md', '# pNode\n' + 'pnode firewall ports ' * 20)
+    added, removed, report = load(index)
+    assert report['files_changed'] == 1
+    assert set(removed) == old_pnode_chunks - vnode_chunks
+    assert set(added) == set(index._files['pnode.md']['chunks'])
+    assert index.search('firewall', 1)[0][1] == 'pNode'
+
+
+def test_deleted_file_drops_its_chunks(docs):
+    index = DocumentIndex()
+    load(index)
+    os.remove(docs / 'vnode.md')
+    _, removed, report = load(index)
+    assert report['files_removed'] == 1 and removed
+    assert index.search('validator', 3) == []
+
+
+def test_restart_reads_stored_term_counts_without_tokenizing(docs, monkeypatch):
+    first = DocumentIndex()
+    load(first)
+
+    def no_tokenizing(passage):
+        raise AssertionError('loading an existing index should not tokenize')
+
+    monkeypatch.setattr(BM25Index, 'term_counts', staticmethod(no_tokenizing))
+    restarted = DocumentIndex()
+    added, _, report = load(restarted)
+    assert report['chunks_added'] == 0
+    assert restarted.index.postings == first.index.postings
+    assert restarted.version == first.version
+
+
+def test_compaction_keeps_live_chunks_readable(docs):
+    index = DocumentIndex()
+    load(index)
+    write(docs / 'pnode.md', '# pNode\n' + 'pnode firewall ports ' * 20)
+    load(index)
+    size_before = os.path.getsize(index._data_path)
+
+    index._compact()
+    index._save_manifest()
+    assert os.path.getsize(index._data_path) < size_before
+
+    restarted = DocumentIndex()
+    load(restarted)
+    assert restarted.index.passages == index.index.passages
+    assert restarted.search('firewall', 1)[0][1] == 'pNode'
+
+
+def test_changed_chunk_settings_rebuild_the_index(docs, monkeypatch):
+    load(DocumentIndex())
+    monkeypatch.setenv('KNOWLEDGE_CHUNK_CHARS', '300')
+    _, _, report = load(DocumentIndex())
+    assert report['files_changed'] == 2 and report['chunks_added'] > 0
+
+
+def test_data_file_with_another_layout_is_rebuilt(docs, monkeypatch):
+    index = DocumentIndex()
+    load(index)
+    with open(index._data_path, 'r+b') as data:
+        data.write(b'XKC1')
+    _, _, report = load(DocumentIndex())
+    assert report['files_changed'] == 2
+    with open(index._data_path, 'rb') as data:
+        assert data.read(4) == ingest.MAGIC
@@ -0,0 +1,77 @@
+"""
+Model Router Tests
+Tier classification, fallback model selection and which failures are retried
+"""
+
+import asyncio
+
+import pytest
+
+from utils.model_router import ModelRouter
+
+SMALL = 'llama-3.1-8b-instant'
+LARGE = 'llama-3.3-70b-versatile'
+
+
+@pytest.fixture(autouse=True)
+def default_models(monkeypatch):
+    for name in ('AI_ROUTING', 'AI_FALLBACK_MODEL', 'AI_TIER_LIGHT_MODEL', 'AI_TIER_STANDARD_MODEL', 'AI_TIER_HEAVY_MODEL'):
+        monkeypatch.delenv(name, raising=False)
+
+
+def complete(router, question, results):
+    """Run complete() against a fake upstream that returns results in order; returns (answer, models called)"""
+    calls = []
+
+    async def call(model, max_tokens):
+        calls.append(model)
+        result = results[len(calls) - 1]
+        if result == 'hang':
+            await asyncio.sleep(10)
+        return result
+
+    answer, _, _ = asyncio.run(router.complete(question, call))
+    return answer, calls
+
+
+@pytest.mark.parametrize('question, tier', [
+    ("where are the docs?", 'light'),
+    ("what does xandeum do for smart contracts on solana?", 'standard'),
+    ("my pnode crashes with an error after the upgrade, how do i fix it?", 'heavy'),
+    ("here are my logs\n```\npanic: sync failed\n```", 'heavy'),
+])
+def test_classifies_questions_by_complexity(question, tier):
+    assert ModelRouter().classify(question).name == tier
+
+
+def test_default_fallback_is_the_other_model():
+    router = ModelRouter()
+    assert {name: router.fallback_for(tier) for name, tier in router.tiers.items()} == {
+        'light': LARGE, 'standard': LARGE, 'heavy': SMALL,
+    }
+
+
+def test_fallback_equal_to_the_tier_model_is_skipped(monkeypatch):
+    monkeypatch.setenv('AI_FALLBACK_MODEL', SMALL)
+    router = ModelRouter()
+    assert router.fallback_for(router.tiers['standard']) is None
+    answer, calls = complete(router, "what is a pnode and how does it store data?", [("❌ busy", {'error_status': 503})])
+    assert calls == [SMALL] and answer.startswith('❌')
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_transient_failures_retry_on_the_fallback(status):
+    answer, calls = complete(ModelRouter(), "where are the docs?", [("❌ failed", {'error_status': status}), ("ok", {})])
+    assert calls == [SMALL, LARGE] and answer == 'ok'
+
+
+@pytest.mark.parametrize('status', [400, 401, 404])
+def test_client_errors_are_not_retried(status):
+    answer, calls = complete(ModelRouter(), "where are the docs?", [("❌ failed", {'error_status': status})])
+    assert calls == [SMALL] and answer == '❌ failed'
+
+
+def test_timeouts_retry_on_the_fallback(monkeypatch):
+    monkeypatch.setenv('AI_TIER_LIGHT_TIMEOUT', '0.01')
+    answer, calls = complete(ModelRouter(), "where are the docs?", ['hang', ("ok", {})])
+    assert calls == [SMALL, LARGE] and answer == 'ok'
@@ -0,0 +1,79 @@
+"""
+Query Log Tests
+Size-based rotation, backup limits, the background writer and reading entries back across rotated files
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from utils.query_log import QueryLog, log_files, read_entries, top_questions
+
+
+@pytest.fixture
+def query_log(tmp_path, monkeypatch):
+    monkeypatch.setenv('QUERY_LOG_PATH', str(tmp_path / 'queries.log'))
+    monkeypatch.setenv('QUERY_LOG_MAX_BYTES', '300')
+    monkeypatch.setenv('QUERY_LOG_BACKUPS', '2')
+    return QueryLog()
+
+
+def entries(count, start=0):
+    return [{'t': 1.0, 'q': f"question {i:03d} about pnode setup", 'tr': 'command', 'src': 'groq', 'hit': False}
+            for i in range(start, start + count)]
+
+
+def test_rotates_before_a_write_would_pass_the_limit(query_log):
+    query_log._write(entries(3))
+    query_log._write(entries(3, start=3))
+    assert query_log.metrics['rotations'] == 1
+    assert [entry['q'][:12] for entry in read_entries([query_log.path + '.1'])] == [f"question 00{i}" for i in range(3)]
+    assert all(os.path.getsize(path) <= 300 for path in log_files(query_log.path))
+
+
+def test_keeps_at_most_the_configured_backups(query_log):
+    for batch in range(5):
+        query_log._write(entries(3, start=batch * 3))
+    names = sorted(os.path.basename(path) for path in log_files(query_log.path))
+    assert names == ['queries.log', 'queries.log.1', 'queries.log.2']
+    # The newest batch is live, the two before it are the backups, older ones are gone
+    questions = sorted(entry['q'] for entry in read_entries(log_files(query_log.path)))
+    assert questions[0].startswith('question 006') and len(questions) == 9
+
+
+def test_zero_backups_truncates_instead(query_log):
+    query_log.backups = 0
+    query_log._write(entries(3))
+    query_log._write(entries(3, start=3))
+    assert log_files(query_log.path) == [query_log.path]
+    assert len(list(read_entries([query_log.path]))) == 3
+
+
+def test_writer_thread_flushes_everything_on_close(query_log):
+    query_log.max_bytes = 0
+
+    async def main():
+        query_log.start()
+        for i in range(50):
+            query_log.record(f"what is a pnode {i % 5}", 'message', 'groq', latency=0.2)
+        await query_log.close()
+
+    asyncio.run(main())
+    assert query_log.metrics['written'] == 50
+    assert top_questions(read_entries([query_log.path]), 1)[0][1] == 10
+
+
+def test_log_files_finds_rotated_and_cluster_logs(tmp_path):
+    for name in ('queries.0.log', 'queries.0.log.1', 'queries.1.log', 'other.log'):
+        (tmp_path / name).write_text('')
+    found = [os.path.basename(path) for path in log_files(str(tmp_path / 'queries.0.log'))]
+    assert found == ['queries.0.log', 'queries.0.log.1', 'queries.1.log']
+
+
+def test_damaged_lines_are_skipped(query_log):
+    query_log._write(entries(1))
+    with open(query_log.path, 'a') as f:
+        f.write('{"t": 1.0, "q": "cut off\n')
+    query_log._write(entries(1, start=1))
+    assert len(list(read_entries([query_log.path]))) == 2
@@ -0,0 +1,124 @@
+"""
+DNS Resolver Tests
+Resolution through the real cache, request-sharing and shared-store paths with only getaddrinfo faked
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from utils import resolver as resolver_module
+from utils.resolver import DNSResolver, ResolutionError
+
+PUBLIC = '93.184.216.34'
+
+
+@pytest.fixture(autouse=True)
+def stock_lookup(monkeypatch):
+    """Use the getaddrinfo path so the fake below is the only DNS involved"""
+    monkeypatch.setattr(resolver_module, 'aiodns', None)
+    monkeypatch.delenv('SHARED_STORE_PATH', raising=False)
+
+
+def fake_getaddrinfo(answers, calls, delay=0.0):
+    async def getaddrinfo(host, port, type=0):
+        calls.append(host)
+        await asyncio.sleep(delay)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, 0)) for address in answers]
+    return getaddrinfo
+
+
+def run(coro_factory, answers, delay=0.0):
+    """Run coro_factory(resolver) on a fresh loop whose getaddrinfo returns answers"""
+    calls = []
+
+    async def main():
+        asyncio.get_running_loop().getaddrinfo = fake_getaddrinfo(answers, calls, delay)
+        return await coro_factory(DNSResolver())
+
+    return asyncio.run(main()), calls
+
+
+def test_resolves_hostname_and_caches_it():
+    async def twice(resolver):
+        first = await resolver.resolve('Example.com')
+        second = await resolver.resolve('example.com')
+        return first, second, resolver.metrics
+
+    (first, second, metrics), calls = run(twice, [PUBLIC])
+    assert first == second == PUBLIC
+    assert calls == ['example.com']
+    assert metrics['misses'] == 1 and metrics['hits'] == 1
+
+
+def test_skips_private_addresses():
+    address, _ = run(lambda resolver: resolver.resolve('example.com'), ['10.0.0.1', PUBLIC])
+    assert address == PUBLIC
+
+
+def test_private_only_host_is_negatively_cached():
+    async def twice(resolver):
+        errors = []
+        for _ in range(2):
+            with pytest.raises(ResolutionError):
+                await resolver.resolve('internal.example.com')
+            errors.append(resolver.metrics['negative_hits'])
+        return errors
+
+    negative_hits, calls = run(twice, ['192.168.1.10'])
+    assert negative_hits == [0, 1]
+    assert len(calls) == 1
+
+
+def test_concurrent_lookups_share_one_query():
+    async def burst(resolver):
+        return await asyncio.gather(*(resolver.resolve('example.com') for _ in range(5)))
+
+    addresses, calls = run(burst, [PUBLIC], delay=0.05)
+    assert addresses == [PUBLIC] * 5
+    assert calls == ['example.com']
+
+
+def test_literal_and_invalid_inputs_skip_dns():
+    async def inputs(resolver):
+        literal = await resolver.resolve('8.8.8.8')
+        with pytest.raises(ResolutionError):
+            await resolver.resolve('127.0.0.1')
+        with pytest.raises(ResolutionError):
+            await resolver.resolve('not a host')
+        return literal
+
+    literal, calls = run(inputs, [PUBLIC])
+    assert literal == '8.8.8.8'
+    assert calls == []
+
+
+def test_shared_store_serves_other_processes(monkeypatch, tmp_path):
+    monkeypatch.setenv('SHARED_STORE_PATH', str(tmp_path / 'cluster_state.db'))
+
+    async def two_processes(resolver):
+        first = await resolver.resolve('example.com')
+        second = await DNSResolver().resolve('example.com')
+        return first, second
+
+    (first, second), calls = run(two_processes, [PUBLIC])
+    assert first == second == PUBLIC
+    assert calls == ['example.com']
+
+
+def test_failure_after_lookup_reaches_every_waiter(monkeypatch):
+    def broken_store(self, host, address, ttl):
+        raise RuntimeError('cache write failed')
+
+    monkeypatch.setattr(DNSResolver, '_store', broken_store)
+
+    async def burst(resolver):
+        lookups = [resolver.resolve('example.com') for _ in range(3)]
+        results = await asyncio.wait_for(asyncio.gather(*lookups, return_exceptions=True), timeout=1)
+        return results, dict(resolver._inflight)
+
+    (results, inflight), calls = run(burst, [PUBLIC], delay=0.05)
+    assert [type(result) for result in results] == [RuntimeError] * 3
+    assert inflight == {}
+    assert calls == ['example.com']
@@ -0,0 +1,85 @@
+"""
+Semantic Cache Tests
+Question canonicalization, the same_question gate, and the hand-labelled pairs the threshold is calibrated on
+"""
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from benchmarks.semantic_pairs import PAIRS
+from utils.semantic_cache import HashingEmbedder, SemanticCache, same_question
+
+KEYWORDS = ('xandeum', 'xand', 'pnode', 'vnode', 'xandminer', 'devnet', 'validator', 'dao')
+
+
+@pytest.fixture(autouse=True)
+def cache_settings(monkeypatch):
+    for name in ('SEMANTIC_CACHE_SIZE', 'SEMANTIC_CACHE_THRESHOLD', 'SEMANTIC_CACHE_DIM'):
+        monkeypatch.delenv(name, raising=False)
+
+
+def served(cached, asked):
+    cache = SemanticCache(KEYWORDS)
+    cache.put(cached, 'v1', 'answer')
+    return cache.lookup(asked, 'v1') is not None
+
+
+def words(text):
+    return frozenset(HashingEmbedder.words(text))
+
+
+def test_filler_synonyms_and_phrases_are_folded():
+    assert words("how do I install xandminer?") == words("xandminer installation steps")
+    assert words("how do I set up a pnode?") == words("pnode setup guide")
+    assert words("how much memory does a pnode need") == words("pnode ram requirements")
+
+
+@pytest.mark.parametrize('a, b', [("pnode setup guide", "pnode setpu guide"), ("xandminer update", "xandmineer update")])
+def test_typos_still_ask_the_same_question(a, b):
+    assert same_question(words(a), words(b))
+
+
+@pytest.mark.parametrize('a, b', [
+    ("what port does pnode use for udp", "what port does pnode use for tcp"),
+    ("how do i install xandminer", "how do i uninstall xandminer"),
+    ("minimum ram for a pnode", "minimum disk for a pnode"),
+    ("how do i start my pnode", "how do i stop my pnode"),
+])
+def test_different_words_are_different_questions(a, b):
+    assert not same_question(words(a), words(b))
+
+
+@pytest.mark.parametrize('cached, asked', [(cached, asked) for cached, asked, label in PAIRS if not label])
+def test_labelled_different_questions_are_never_served(cached, asked):
+    assert not served(cached, asked)
+
+
+def test_labelled_paraphrases_are_mostly_served():
+    paraphrases = [(cached, asked) for cached, asked, label in PAIRS if label]
+    hits = sum(served(cached, asked) for cached, asked in paraphrases)
+    assert hits >= len(paraphrases) - 2
+
+
+def test_topic_keywords_keep_pnode_and_vnode_apart():
+    assert not served("pnode hardware requirements", "vnode hardware requirements")
+
+
+def test_new_prompt_version_drops_old_answers():
+    cache = SemanticCache(KEYWORDS)
+    cache.put("what is a pnode?", 'v1', 'answer')
+    assert cache.lookup("what is a pnode?", 'v2') is None
+    cache.put("what is a vnode?", 'v2', 'answer')
+    assert cache.size == 1
+
+
+def test_least_recently_used_answer_is_evicted(monkeypatch):
+    monkeypatch.setenv('SEMANTIC_CACHE_SIZE', '2')
+    cache = SemanticCache(KEYWORDS)
+    cache.put("what is a pnode?", 'v1', 'pnode')
+    cache.put("what is a vnode?", 'v1', 'vnode')
+    assert cache.lookup("what is a pnode?", 'v1')[0] == 'pnode'
+    cache.put("what is the dao?", 'v1', 'dao')
+    assert cache.lookup("what is a vnode?", 'v1') is None
+    assert cache.lookup("what is a pnode?", 'v1')[0] == 'pnode'
+    assert cache.metrics['evictions'] == 1
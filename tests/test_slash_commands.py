@@ -0,0 +1,70 @@
+"""
+Slash Command Tests
+Runtime permission checks on admin commands and the replies on_error gives when they fail
+"""
+
+import asyncio
+
+import discord
+import pytest
+from discord import app_commands
+from discord.ext import commands
+
+from commands.slash_commands import register_slash_commands
+
+ADMIN = {'administrator': True, 'manage_channels': True}
+
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    def is_done(self):
+        return False
+
+    async def send_message(self, content, ephemeral=False):
+        self.sent.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, command, guild, permissions):
+        self.command = command
+        self.guild = guild
+        self.permissions = discord.Permissions(**permissions)
+        self.response = FakeResponse()
+        self.extras = {}
+
+
+def check(name, guild, permissions):
+    """Run a command's checks and return (allowed, reply sent by on_error)"""
+    async def main():
+        bot = commands.Bot(command_prefix='!', intents=discord.Intents.none())
+        register_slash_commands(bot, lambda: None)
+        interaction = FakeInteraction(bot.tree.get_command(name), guild, permissions)
+        try:
+            return await interaction.command._check_can_run(interaction), None
+        except app_commands.AppCommandError as error:
+            await bot.tree.on_error(interaction, error)
+            return False, interaction.response.sent[0]
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('name', ['stats', 'profile', 'governance-feed'])
+def test_admin_commands_refuse_direct_messages(name):
+    assert check(name, None, ADMIN) == (False, "This command can only be used in a server.")
+
+
+@pytest.mark.parametrize('name', ['stats', 'profile', 'governance-feed'])
+def test_admin_commands_refuse_members_without_permission(name):
+    assert check(name, object(), {}) == (False, "You don't have permission to use this command.")
+
+
+@pytest.mark.parametrize('name', ['stats', 'profile', 'governance-feed'])
+def test_admin_commands_allow_admins(name):
+    assert check(name, object(), ADMIN) == (True, None)
+
+
+def test_manage_channels_is_enough_for_governance_feed():
+    assert check('governance-feed', object(), {'manage_channels': True}) == (True, None)
+    assert check('stats', object(), {'manage_channels': True})[0] is False
@@ -5,79 +5,23 @@ Manages AI-powered responses using Groq API
 
 import os
 import asyncio
-import aiohttp
-from typing import Dict, Any, Optional
-from config.project_info import PROJECT_INFO
+import hashlib
+import logging
+import time
+from typing import Dict, Any, Optional, Tuple
+from config.knowledge import knowledge, normalize_question
+from utils.metrics import metrics
+from utils.http_client import get_session
+from utils.answer_store import AnswerStore
+from utils.local_answers import LocalAnswerEngine, project_info_passages
+from utils.ingest import DocumentIndex
+from utils.semantic_cache import SemanticCache
+from utils.query_log import QueryLog, Prewarmer
+from utils.model_router import ModelRouter
 
-class AIHandler:
-    def __init__(self):
-        self.api_key = os.getenv('GROQ_API_KEY')
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
-        self.model = "llama-3.1-8b-instant"
-        
-        # Prepare newlines for join expressions to avoid f-string backslash errors
-        features = "\n".join([f"- {feature}" for feature in PROJECT_INFO.get('features', [])])
-        tech_specs = "\n".join([f"- {key}: {value}" for key, value in PROJECT_INFO.get('technical_specs', {}).items()])
-        token_uses = "\n".join([f"- {use_case}" for use_case in PROJECT_INFO.get('token', {}).get('use_cases', [])])
-        network_info = "\n".join([f"- {network}: {status}" for network, status in PROJECT_INFO.get('network', {}).items()])
-        dao_proposals = "\n".join([f"- {proposal_type}" for proposal_type in PROJECT_INFO.get('dao_specs', {}).get('proposal_types', [])])
-        dao_features = "\n".join([f"- {feature}" for feature in PROJECT_INFO.get('dao_specs', {}).get('features', [])])
-        innovation_eras = "\n".join([f"- {era}: {description}" for era, description in PROJECT_INFO.get('innovation_eras', {}).items()])
-        faq = "\n".join([f"Q: {question}\nA: {answer}\n" for question, answer in PROJECT_INFO.get('faq', {}).items()])
-        
-        self.context = f"""
-You are an AI assistant for the Xandeum blockchain project. You have access to comprehensive information about:
-
-**Project Overview:**
-- Xandeum is a decentralized blockchain platform with innovative consensus mechanisms
-- Website: {PROJECT_INFO.get('website', 'N/A')}
-- Documentation: {PROJECT_INFO.get('documentation', 'N/A')}
-- Greenpaper: {PROJECT_INFO.get('greenpaper', 'N/A')}
-
-**Key Features:**
-{features}
+logger = logging.getLogger(__name__)
 
-**Technical Specifications:**
-{tech_specs}
-
-**Token Information (XAND on Solana):**
-- Name: XAND
-- Symbol: XAND
-- Chain: Solana
-- Mint Address: XANDuUoVoUqniKkpcKhrxmvYJybpJvUxJLr21Gaj3Hx
-- Solscan: https://solscan.io/token/XANDuUoVoUqniKkpcKhrxmvYJybpJvUxJLr21Gaj3Hx
-{token_uses}
-
-**Network Information:**
-{network_info}
-
-**pNode Network:**
-- pNodes are storage provider nodes that store encrypted data
-- Setup guide: {PROJECT_INFO.get('pnodes', {}).get('setup_guide', 'N/A')}
-- Hardware requirements: {PROJECT_INFO.get('pnode_specs', {}).get('hardware_requirements', {})}
-- Required ports: UDP 5000, TCP 3000, TCP 4000
-
-**vNode Network:**
-- vNodes are validator nodes that participate in consensus
-- DevNet: {PROJECT_INFO.get('vnodes', {}).get('devnet_home', 'N/A')}
-- Hardware requirements: {PROJECT_INFO.get('vnode_specs', {}).get('hardware_requirements', {})}
-- Required ports: TCP 8000, TCP 8001, TCP 8002
-
-**DAO Governance:**
-- DAO Platform: {PROJECT_INFO.get('dao', {}).get('dao_platform', 'N/A')}
-- Governance type: {PROJECT_INFO.get('dao_specs', {}).get('governance_type', 'N/A')}
-- Voting power: {PROJECT_INFO.get('dao_specs', {}).get('voting_power', 'N/A')}
-- Platform: {PROJECT_INFO.get('dao_specs', {}).get('platform', 'N/A')}
-- Proposal types:
-{dao_proposals}
-- Features:
-{dao_features}
-
-**Innovation Eras:**
-{innovation_eras}
-
-**Common Questions and Answers:**
-{faq}
+SYSTEM_INSTRUCTIONS = """You are an AI assistant for the Xandeum blockchain project. Answer from the project reference and documents below.
 
 **Important Guidelines:**
 1. Always provide accurate, up-to-date information about Xandeum
@@ -97,46 +41,206 @@ You are an AI assistant for the Xandeum blockchain project. You have access to c
 - DAO, governance, voting, proposals, Realms, Solana
 - innovation eras, roadmap, development phases
 - technical specs, hardware requirements, ports
-- setup guides, troubleshooting, monitoring
-        """
+- setup guides, troubleshooting, monitoring"""
+
+class AIHandler:
+    def __init__(self):
+        self.api_key = os.getenv('GROQ_API_KEY')
+        self.base_url = os.getenv('GROQ_API_URL', "https://api.groq.com/openai/v1/chat/completions")
+        # Picks the model, max_tokens budget and timeout per question; the docs index scores retrieval confidence
+        self.router = ModelRouter(self._retrieval_score)
+        # groq: LLM answers with local fallback; local: answer only from the bundled docs
+        self.mode = os.getenv('AI_MODE', 'groq').lower()
+        if self.mode != 'local' and not self.api_key:
+            logger.warning("GROQ_API_KEY is not set, AI questions will be answered from the local docs")
+        self.metrics = {'local_fallbacks': 0}
+        
+        # Plain messages only get an AI reply when they look like a question about these topics
+        self.trigger_keywords = (
+            'xandeum', 'xand', 'pnode', 'vnode', 'xandminer', 'devnet', 'validator', 'dao'
+        )
+        self.question_words = (
+            'what', 'how', 'why', 'when', 'where', 'who', 'which', 'can', 'is', 'are', 'does', 'do'
+        )
+        
+        # Derived from project data and rebuilt by the knowledge store when it is reloaded
+        knowledge.register_builder('system_prompt', self._build_context)
+        knowledge.register_builder('responses', self._render_all_project_info)
+        knowledge.register_builder('prompt_version', self._prompt_version)
+        knowledge.register_builder('local_answers', LocalAnswerEngine.build)
+        
+        # Chunks ingested from the knowledge/ directory, retrieved per question
+        self.documents = DocumentIndex()
+        self.context_chunks = int(os.getenv('KNOWLEDGE_CONTEXT_CHUNKS', '4'))
+        
+        # Past answers survive restarts; keyed by prompt version so edits to the prompt invalidate them
+        self.answers = AnswerStore()
+        # Paraphrases of answered questions; hits must mention the same topic keywords
+        self.semantic_cache = SemanticCache(self.trigger_keywords)
+        # What people ask and how it was answered; the top questions are re-answered in quiet hours
+        self.query_log = QueryLog()
+        self.prewarmer = Prewarmer(self.query_log, lambda question: self.get_ai_response(question, trigger='prewarm'), self.is_cached)
+        self._start_task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start document ingestion, then warm the answer store once the documents version is known"""
+        self.documents.start()
+        self.query_log.start()
+        self._start_task = asyncio.create_task(self._start_answers())
+    
+    async def _start_answers(self):
+        """Open the answer store after the first ingestion pass"""
+        await self.documents.ready.wait()
+        self.answers.start(lambda: self.prompt_version)
+        # Pre-warmed answers live in the store; without it every run would re-ask Groq and keep nothing
+        if self.answers.enabled and self.mode != 'local' and self.api_key:
+            self.prewarmer.start()
+    
+    @property
+    def context(self) -> str:
+        """System prompt for the current project data, rendered on first use"""
+        return knowledge.current.artifact('system_prompt')
+    
+    @property
+    def prompt_version(self) -> str:
+        """Hash of the model, system prompt and ingested documents currently in use"""
+        return f"{knowledge.current.artifact('prompt_version')}{self.documents.version[:8]}"
     
-    async def get_ai_response(self, user_message: str) -> str:
-        """Get AI response using Groq API"""
-        if not self.api_key:
-            return "❌ AI service not configured. Please set GROQ_API_KEY environment variable."
+    def _prompt_version(self, info: Dict[str, Any]) -> str:
+        """Hash the model and rendered system prompt for a project data snapshot"""
+        return hashlib.sha256(f"{self.router.signature}\n{self._build_context(info)}".encode()).hexdigest()[:12]
+    
+    def _build_context(self, info: Dict[str, Any]) -> str:
+        """Render the system prompt from the project data sections"""
+        sections = "\n\n".join(f"**{title}:**\n{text}" for _, title, text in project_info_passages(info))
+        return f"{SYSTEM_INSTRUCTIONS}\n\n**Project Reference:**\n\n{sections}"
+    
+    def context_for(self, question: str) -> str:
+        """System prompt plus the knowledge/ chunks most relevant to the question"""
+        chunks = self.documents.search(question, self.context_chunks)
+        if not chunks:
+            return self.context
+        documents = "\n\n".join(f"[{source} - {title}]\n{text}" for source, title, text in chunks)
+        return f"{self.context}\n\n**Reference Documents:**\n\n{documents}"
+    
+    def _retrieval_score(self, question: str) -> float:
+        """Best BM25 score for the question in the local docs"""
+        hits = knowledge.current.artifact('local_answers').index.search(question, 1)
+        return hits[0][0] if hits else 0.0
+    
+    def should_respond_to_message(self, content: str) -> bool:
+        """Decide whether a plain (non-command) message is a question for the AI"""
+        text = content.strip().lower()
+        if not text or text.startswith(os.getenv('BOT_PREFIX', '!')):
+            return False
+        
+        if not any(keyword in text for keyword in self.trigger_keywords):
+            return False
+        
+        return '?' in text or text.split(None, 1)[0] in self.question_words
+    
+    def local_answer(self, user_message: str) -> str:
+        """Answer from the BM25 index over the bundled docs and project data"""
+        return knowledge.current.artifact('local_answers').answer(user_message)
+    
+    async def is_cached(self, question: str) -> bool:
+        """Whether a question would be answered without calling Groq"""
+        question = normalize_question(question)
+        if question in knowledge.current.faq_index:
+            return True
+        return await self.answers.get(question, self.prompt_version) is not None
+    
+    async def get_ai_response(self, user_message: str, trigger: str = 'message') -> str:
+        """Answer from the FAQ, stored answers or Groq, falling back to the local docs"""
+        # Exact FAQ questions are answered from the knowledge store without an upstream call
+        question = normalize_question(user_message)
+        faq_answer = knowledge.current.faq_index.get(question)
+        if faq_answer is not None:
+            self.query_log.record(question, trigger, 'faq')
+            return faq_answer
+        
+        if self.mode == 'local' or not self.api_key:
+            self.query_log.record(question, trigger, 'local')
+            return self.local_answer(user_message)
+        
+        # Answers from previous runs are reused until the prompt or model changes
+        prompt_version = self.prompt_version
+        cached = await self.answers.get(question, prompt_version)
+        if cached is not None:
+            self.query_log.record(question, trigger, 'store')
+            return cached
+        
+        similar = self.semantic_cache.lookup(user_message, prompt_version)
+        if similar is not None:
+            self.query_log.record(question, trigger, 'semantic')
+            return similar[0]
         
+        started = time.perf_counter()
+        answer, usage, tier = await self.router.complete(
+            user_message, lambda model, max_tokens: self._groq_response(user_message, model, max_tokens)
+        )
+        latency = time.perf_counter() - started
+        if answer.startswith('❌'):
+            logger.warning(f"Falling back to local docs: {answer[:200]}")
+            self.metrics['local_fallbacks'] += 1
+            self.query_log.record(question, trigger, 'fallback', latency, tier=tier)
+            return self.local_answer(user_message)
+        
+        self.query_log.record(question, trigger, 'groq', latency, usage.get('prompt_tokens'), usage.get('completion_tokens'), tier)
+        self.answers.put(question, prompt_version, answer)
+        self.semantic_cache.put(user_message, prompt_version, answer)
+        return answer
+    
+    @metrics.timed('groq', is_error=lambda result: result[0].startswith('❌'))
+    async def _groq_response(self, user_message: str, model: str, max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """Get AI response and token usage using Groq API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                data = {
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": self.context},
-                        {"role": "user", "content": user_message}
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 1000
-                }
-                
-                async with session.post(self.base_url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result['choices'][0]['message']['content']
-                    else:
-                        error_text = await response.text()
-                        return f"❌ AI service error: {response.status} - {error_text}"
-                        
+            session = await get_session()
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            data = {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": self.context_for(user_message)},
+                    {"role": "user", "content": user_message}
+                ],
+                "temperature": 0.7,
+                "max_tokens": max_tokens
+            }
+            
+            async with session.post(self.base_url, headers=headers, json=data) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result['choices'][0]['message']['content'], result.get('usage') or {}
+                else:
+                    error_text = await response.text()
+                    # The status tells the model router whether a retry on the fallback model can help
+                    return f"❌ AI service error: {response.status} - {error_text}", {'error_status': response.status}
+                    
+        except asyncio.TimeoutError:
+            return "❌ AI service timed out", {'error_status': 408}
         except Exception as e:
-            return f"❌ Error connecting to AI service: {str(e)}"
+            return f"❌ Error connecting to AI service: {str(e)}", {}
     
     def format_project_info(self, info_type: str) -> str:
         """Format project information for specific types"""
+        responses = knowledge.current.artifact('responses')
+        return responses.get(info_type, "❌ Unknown information type. Use: overview, technical, token, eras, or docs")
+    
+    def _render_all_project_info(self, info: Dict[str, Any]) -> Dict[str, str]:
+        """Pre-render every project information response"""
+        return {
+            info_type: self._render_project_info(info, info_type)
+            for info_type in ("overview", "technical", "token", "eras", "docs")
+        }
+    
+    def _render_project_info(self, info: Dict[str, Any], info_type: str) -> str:
+        """Render project information for a specific type"""
         if info_type == "overview":
-            features = "\n".join([f"• {feature}" for feature in PROJECT_INFO.get('features', [])])
+            features = "\n".join([f"• {feature}" for feature in info.get('features', [])])
             return f"""
 **Xandeum Project Overview**
 
@@ -144,10 +248,10 @@ You are an AI assistant for the Xandeum blockchain project. You have access to c
 Xandeum is a decentralized blockchain platform that focuses on innovation, cross-chain interoperability, and sustainable blockchain technology.
 
 🔗 **Official Resources:**
-• Website: {PROJECT_INFO.get('website', 'N/A')}
-• Documentation: {PROJECT_INFO.get('documentation', 'N/A')}
-• Greenpaper: {PROJECT_INFO.get('greenpaper', 'N/A')}
-• Innovation Eras: {PROJECT_INFO.get('innovation_eras', 'N/A')}
+• Website: {info.get('website', 'N/A')}
+• Documentation: {info.get('documentation', 'N/A')}
+• Greenpaper: {info.get('greenpaper', 'N/A')}
+• Innovation Eras: {info.get('innovation_eras', 'N/A')}
 
 🌟 **Key Features:**
 {features}
@@ -168,7 +272,7 @@ Xandeum is a decentralized blockchain platform that focuses on innovation, cross
             """.strip()
         
         elif info_type == "technical":
-            specs = PROJECT_INFO.get('technical_specs', {})
+            specs = info.get('technical_specs', {})
             return f"""
 **Technical Specifications**
 
@@ -185,7 +289,7 @@ Xandeum is a decentralized blockchain platform that focuses on innovation, cross
             """.strip()
         
         elif info_type == "token":
-            token_info = PROJECT_INFO.get('token', {})
+            token_info = info.get('token', {})
             uses = "\n".join([f"• {use_case}" for use_case in token_info.get('use_cases', [])])
             return f"""
 **XAND Token Information (Solana)**
@@ -204,7 +308,7 @@ Xandeum is a decentralized blockchain platform that focuses on innovation, cross
             """.strip()
         
         elif info_type == "eras":
-            eras = PROJECT_INFO.get('innovation_eras', {})
+            eras = info.get('innovation_eras', {})
             era_lines = "\n".join([f"• **{era.replace('_', ' ').title()}:** {description}" for era, description in eras.items()])
             return f"""
 **Innovation Eras Roadmap**
@@ -212,7 +316,7 @@ Xandeum is a decentralized blockchain platform that focuses on innovation, cross
 📅 **Development Phases:**
 {era_lines}
 
-🔗 **Learn More:** {PROJECT_INFO.get('innovation_eras', 'N/A')}
+🔗 **Learn More:** {info.get('innovation_eras', 'N/A')}
             """.strip()
         
         elif info_type == "docs":
@@ -220,20 +324,20 @@ Xandeum is a decentralized blockchain platform that focuses on innovation, cross
 **Documentation Resources**
 
 📚 **Official Documentation:**
-• Website: {PROJECT_INFO.get('website', 'N/A')}
-• Documentation: {PROJECT_INFO.get('documentation', 'N/A')}
-• Greenpaper: {PROJECT_INFO.get('greenpaper', 'N/A')}
-• Innovation Eras: {PROJECT_INFO.get('innovation_eras', 'N/A')}
+• Website: {info.get('website', 'N/A')}
+• Documentation: {info.get('documentation', 'N/A')}
+• Greenpaper: {info.get('greenpaper', 'N/A')}
+• Innovation Eras: {info.get('innovation_eras', 'N/A')}
 
 🔧 **Technical Resources:**
-• pNode Setup: {PROJECT_INFO.get('pnodes', {}).get('setup_guide', 'N/A')}
-• vNode DevNet: {PROJECT_INFO.get('vnodes', {}).get('devnet_home', 'N/A')}
-• DAO Platform: {PROJECT_INFO.get('dao', {}).get('dao_platform', 'N/A')}
+• pNode Setup: {info.get('pnodes', {}).get('setup_guide', 'N/A')}
+• vNode DevNet: {info.get('vnodes', {}).get('devnet_home', 'N/A')}
+• DAO Platform: {info.get('dao', {}).get('dao_platform', 'N/A')}
 
 🌐 **Community:**
-• Discord: {PROJECT_INFO.get('discord', 'N/A')}
-• Twitter: {PROJECT_INFO.get('twitter', 'N/A')}
-• GitHub: {PROJECT_INFO.get('github', 'N/A')}
+• Discord: {info.get('discord', 'N/A')}
+• Twitter: {info.get('twitter', 'N/A')}
+• GitHub: {info.get('github', 'N/A')}
             """.strip()
         
         else:
@@ -0,0 +1,164 @@
+"""
+AI Work Queue Module
+Bounded queue and worker pool that decouples AI calls from Discord event handling
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+import logging
+
+from utils.dispatcher import outbound
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('drop_oldest', 'reject_newest', 'coalesce')
+
+
+class AIJob:
+    __slots__ = ('message', 'content', 'channel_id', 'enqueued_at', 'done', 'dropped')
+
+    def __init__(self, message, content: str):
+        self.message = message
+        self.content = content
+        self.channel_id = getattr(message.channel, 'id', None)
+        self.enqueued_at = time.perf_counter()
+        self.done = asyncio.Event()
+        self.dropped = False
+
+
+class AIWorkQueue:
+    def __init__(self, ai_handler, send: Optional[Callable[..., Awaitable]] = None):
+        self.ai_handler = ai_handler
+        # How replies are delivered; bot.py passes a sender that paginates long answers
+        self.send = send or outbound.send
+        self.workers = int(os.getenv('AI_WORKERS', '2'))
+        self.maxsize = int(os.getenv('AI_QUEUE_SIZE', '50'))
+        self.policy = os.getenv('AI_QUEUE_POLICY', 'coalesce')
+        if self.policy not in OVERFLOW_POLICIES:
+            logger.warning(f"Unknown AI_QUEUE_POLICY '{self.policy}', using 'coalesce'")
+            self.policy = 'coalesce'
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._typing_tasks = set()
+        self._pending_by_channel: Dict[int, AIJob] = {}
+        self.queue_latency = deque(maxlen=1024)
+        self.metrics = {
+            'enqueued': 0,
+            'completed': 0,
+            'failed': 0,
+            'dropped_oldest': 0,
+            'rejected_newest': 0,
+            'coalesced': 0,
+        }
+
+    def start(self):
+        """Start the worker pool on the running loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"AI work queue started with {self.workers} worker(s), size {self.maxsize}, policy {self.policy}")
+
+    async def stop(self):
+        """Cancel the worker pool"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self, timeout: float):
+        """Let queued jobs finish within the timeout, then cancel the workers and drop the rest"""
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"AI queue drain timed out with {self._queue.qsize()} job(s) still queued")
+        await self.stop()
+        while self._queue is not None and not self._queue.empty():
+            self._drop(self._queue.get_nowait())
+            self._queue.task_done()
+
+    def submit(self, message, content: str) -> bool:
+        """Queue an AI job without awaiting it, returning False if it was rejected"""
+        if self._queue is None:
+            self.start()
+
+        if self._queue.full():
+            pending = self._pending_by_channel.get(getattr(message.channel, 'id', None))
+            if self.policy == 'coalesce' and pending is not None:
+                # Full, but a reply is already queued for this channel; answer the newest message instead
+                pending.message = message
+                pending.content = content
+                self.metrics['coalesced'] += 1
+                return True
+            if self.policy == 'drop_oldest':
+                self._drop(self._queue.get_nowait())
+                self._queue.task_done()
+                self.metrics['dropped_oldest'] += 1
+            else:
+                self.metrics['rejected_newest'] += 1
+                return False
+
+        job = AIJob(message, content)
+        self._queue.put_nowait(job)
+        self._pending_by_channel[job.channel_id] = job
+        self.metrics['enqueued'] += 1
+        typing_task = asyncio.create_task(self._typing(job))
+        self._typing_tasks.add(typing_task)
+        typing_task.add_done_callback(self._typing_tasks.discard)
+        return True
+
+    def _drop(self, job: AIJob):
+        """Discard a queued job and release its typing indicator"""
+        job.dropped = True
+        job.done.set()
+        if self._pending_by_channel.get(job.channel_id) is job:
+            del self._pending_by_channel[job.channel_id]
+
+    async def _typing(self, job: AIJob):
+        """Show a typing indicator in the job's channel until it is answered"""
+        try:
+            async with job.message.channel.typing():
+                await job.done.wait()
+        except Exception as e:
+            logger.debug(f"Typing indicator failed: {e}")
+
+    async def _worker(self, index: int):
+        """Drain jobs from the queue and send AI replies"""
+        while True:
+            job = await self._queue.get()
+            try:
+                if self._pending_by_channel.get(job.channel_id) is job:
+                    del self._pending_by_channel[job.channel_id]
+                self.queue_latency.append(time.perf_counter() - job.enqueued_at)
+
+                response = await self.ai_handler.get_ai_response(job.content)
+                await self.send(job.message.channel, response)
+                self.metrics['completed'] += 1
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics['failed'] += 1
+                logger.error(f"Error processing AI response: {e}")
+                try:
+                    await self.send(job.message.channel, "Sorry, I encountered an error processing your request.")
+                except Exception:
+                    pass
+            finally:
+                job.done.set()
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth, counters and queue latency percentiles in milliseconds"""
+        stats = dict(self.metrics)
+        stats['depth'] = self._queue.qsize() if self._queue else 0
+        if self.queue_latency:
+            ordered = sorted(self.queue_latency)
+            stats['queue_latency_p50_ms'] = ordered[len(ordered) // 2] * 1000
+            stats['queue_latency_p95_ms'] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+        return stats
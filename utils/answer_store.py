@@ -0,0 +1,214 @@
+"""
+Answer Store Module
+SQLite (WAL) store of AI answers keyed by normalized question and prompt version, warmed at boot
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    question TEXT NOT NULL,
+    version TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_hit REAL NOT NULL,
+    PRIMARY KEY (question, version)
+);
+CREATE INDEX IF NOT EXISTS answers_hot ON answers (version, hits DESC);
+"""
+
+
+class AnswerStore:
+    def __init__(self):
+        self.path = os.getenv('ANSWER_STORE_PATH', 'answers.db')
+        self.preload_count = int(os.getenv('ANSWER_STORE_PRELOAD', '500'))
+        self.memory_size = int(os.getenv('ANSWER_CACHE_SIZE', '2000'))
+        self.max_age = float(os.getenv('ANSWER_STORE_MAX_AGE', str(7 * 86400)))
+        self.compact_interval = float(os.getenv('ANSWER_STORE_COMPACT_INTERVAL', '3600'))
+
+        # (question, version) -> answer, most recently used last
+        self._memory: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        # Writes and hit counts are batched and applied by a single writer thread
+        self._pending_answers: List[Tuple[str, str, str]] = []
+        self._pending_hits: Dict[Tuple[str, str], int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._tasks = []
+        self.metrics = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'written': 0, 'preloaded': 0, 'compacted': 0}
+
+    @property
+    def enabled(self) -> bool:
+        """ANSWER_STORE_PATH set to an empty string disables the store"""
+        return bool(self.path)
+
+    def start(self, current_version):
+        """Open the database, preload the hottest answers for the current version and start background jobs"""
+        if not self.enabled or self._tasks:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='answer-store')
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._warm(current_version)),
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._compactor(current_version)),
+        ]
+
+    async def close(self):
+        """Stop background jobs, flush pending writes and close the database"""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._run(self._flush_sync, *self._take_pending())
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def get(self, question: str, version: str) -> Optional[str]:
+        """Look up an answer in memory, then on disk"""
+        if not self._tasks:
+            return None
+        key = (question, version)
+        answer = self._memory.get(key)
+        if answer is not None:
+            self._memory.move_to_end(key)
+            self.metrics['memory_hits'] += 1
+        else:
+            answer = await self._run(self._get_sync, question, version)
+            if answer is None:
+                self.metrics['misses'] += 1
+                return None
+            self.metrics['disk_hits'] += 1
+            self._remember(key, answer)
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        return answer
+
+    def put(self, question: str, version: str, answer: str):
+        """Cache an answer in memory and queue it for the background writer"""
+        if not self._tasks:
+            return
+        self._remember((question, version), answer)
+        self._pending_answers.append((question, version, answer))
+        self._wakeup.set()
+
+    def _remember(self, key: Tuple[str, str], answer: str):
+        """Insert into the in-memory LRU"""
+        self._memory[key] = answer
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _take_pending(self):
+        """Swap out the pending write batches"""
+        answers, hits = self._pending_answers, self._pending_hits
+        self._pending_answers, self._pending_hits = [], {}
+        return answers, hits
+
+    async def _run(self, fn, *args):
+        """Run a database call on the store's own thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _warm(self, current_version):
+        """Preload the most-hit answers for the prompt version in use"""
+        try:
+            version = current_version()
+            rows = await self._run(self._hottest_sync, version, self.preload_count)
+        except Exception as e:
+            logger.error(f"Could not preload answers from {self.path}: {e}")
+            return
+        for question, answer in reversed(rows):
+            self._memory.setdefault((question, version), answer)
+        self.metrics['preloaded'] = len(rows)
+        logger.info(f"Preloaded {len(rows)} cached answer(s) for prompt version {version}")
+
+    async def _writer(self):
+        """Apply batched inserts and hit counts off the event loop"""
+        while True:
+            await self._wakeup.wait()
+            # Let a burst of answers accumulate into one transaction
+            await asyncio.sleep(1)
+            self._wakeup.clear()
+            answers, hits = self._take_pending()
+            try:
+                await self._run(self._flush_sync, answers, hits)
+            except Exception as e:
+                logger.error(f"Answer store write failed: {e}")
+
+    async def _compactor(self, current_version):
+        """Periodically delete answers from old prompt versions and answers past their max age"""
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            if self._pending_hits:
+                self._wakeup.set()
+            try:
+                removed = await self._run(self._compact_sync, current_version())
+            except Exception as e:
+                logger.error(f"Answer store compaction failed: {e}")
+                continue
+            self.metrics['compacted'] += removed
+            if removed:
+                logger.info(f"Compacted {removed} stale answer(s)")
+
+    def _db(self) -> sqlite3.Connection:
+        """Connection owned by the store thread"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _get_sync(self, question: str, version: str) -> Optional[str]:
+        row = self._db().execute(
+            'SELECT answer FROM answers WHERE question = ? AND version = ?', (question, version)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _hottest_sync(self, version: str, limit: int) -> List[Tuple[str, str]]:
+        return self._db().execute(
+            'SELECT question, answer FROM answers WHERE version = ? ORDER BY hits DESC LIMIT ?', (version, limit)
+        ).fetchall()
+
+    def _flush_sync(self, answers: List[Tuple[str, str, str]], hits: Dict[Tuple[str, str], int]):
+        if not answers and not hits:
+            return
+        now = time.time()
+        db = self._db()
+        with db:
+            db.executemany(
+                'INSERT INTO answers (question, version, answer, hits, created, last_hit) VALUES (?, ?, ?, 0, ?, ?) '
+                'ON CONFLICT (question, version) DO UPDATE SET answer = excluded.answer, created = excluded.created',
+                [(question, version, answer, now, now) for question, version, answer in answers],
+            )
+            db.executemany(
+                'UPDATE answers SET hits = hits + ?, last_hit = ? WHERE question = ? AND version = ?',
+                [(count, now, question, version) for (question, version), count in hits.items()],
+            )
+        self.metrics['written'] += len(answers)
+
+    def _compact_sync(self, version: str) -> int:
+        db = self._db()
+        with db:
+            removed = db.execute(
+                'DELETE FROM answers WHERE version != ? OR created < ?', (version, time.time() - self.max_age)
+            ).rowcount
+        db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return removed
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,191 @@
+"""
+Outbound Dispatcher Module
+Per-channel send queues that pace messages under Discord's rate limits and coalesce short pending replies
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+
+from utils.formatting import MESSAGE_LIMIT
+from utils.metrics import metrics
+from utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Sends with any of these carry more than text and are never merged
+_UNMERGEABLE = frozenset({'file', 'files', 'embed', 'embeds', 'view', 'reference', 'tts', 'delete_after'})
+
+
+class _Outgoing:
+    __slots__ = ('destination', 'content', 'kwargs', 'future', 'enqueued_at')
+
+    def __init__(self, destination, content: Optional[str], kwargs: Dict[str, Any]):
+        self.destination = destination
+        self.content = content
+        self.kwargs = kwargs
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.perf_counter()
+
+    def mergeable_with(self, other: '_Outgoing') -> bool:
+        """Plain text sends of the same kind of destination with the same options can share one message"""
+        return (
+            self.content is not None and other.content is not None
+            and type(self.destination) is type(other.destination)
+            and not _UNMERGEABLE.intersection(self.kwargs) and self.kwargs == other.kwargs
+        )
+
+
+class OutboundDispatcher:
+    def __init__(self):
+        self._configured = False
+        self._queues: Dict[int, Deque[_Outgoing]] = {}
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._global: Optional[TokenBucket] = None
+        self._global_lock: Optional[asyncio.Lock] = None
+        self.metrics = {'queued': 0, 'sent_messages': 0, 'coalesced': 0, 'dropped': 0, 'failed': 0, 'direct': 0}
+
+    def _configure(self):
+        """Read the pacing settings on first use; the shared dispatcher is built before bot.py loads .env"""
+        # Discord allows about 5 messages per 5 seconds per channel and 50 requests per second per bot
+        self.channel_rate = float(os.getenv('OUTBOUND_CHANNEL_RATE', '1'))
+        self.channel_burst = float(os.getenv('OUTBOUND_CHANNEL_BURST', '5'))
+        self.global_rate = float(os.getenv('OUTBOUND_GLOBAL_RATE', '40'))
+        self.coalesce = os.getenv('OUTBOUND_COALESCE', '1') != '0'
+        self.max_queue = int(os.getenv('OUTBOUND_MAX_QUEUE', '50'))
+        self._global = TokenBucket(self.global_rate, self.global_rate)
+        self._configured = True
+
+    def stats(self) -> Dict[str, float]:
+        """Counters plus current queue depth and the share of sends folded into another message"""
+        queued = self.metrics['queued']
+        return dict(
+            self.metrics,
+            coalescing_rate=round(self.metrics['coalesced'] / queued, 3) if queued else 0.0,
+            queue_depth=sum(len(pending) for pending in self._queues.values()),
+            channels=len(self._workers),
+        )
+
+    async def send(self, destination, content: Optional[str] = None, **kwargs):
+        """Queue a message for a channel (or anything with .channel) and wait until it is sent"""
+        if getattr(destination, 'interaction', None) is not None:
+            # Interaction follow-ups go through the interaction's webhook, which may be ephemeral;
+            # queueing them with channel sends could merge them into a public channel message
+            self.metrics['direct'] += 1
+            return await destination.send(content, **kwargs)
+        if not self._configured:
+            self._configure()
+        channel = getattr(destination, 'channel', destination)
+        key = getattr(channel, 'id', None) or id(channel)
+        pending = self._queues.setdefault(key, deque())
+        if len(pending) >= self.max_queue:
+            # A channel this far behind is better served by dropping the oldest reply than growing forever
+            dropped = pending.popleft()
+            dropped.future.set_result(None)
+            self.metrics['dropped'] += 1
+            logger.debug(f"Dropped a reply queued {time.perf_counter() - dropped.enqueued_at:.1f}s ago for channel {key}")
+
+        item = _Outgoing(destination, content, kwargs)
+        pending.append(item)
+        self.metrics['queued'] += 1
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._worker(key))
+        return await asyncio.shield(item.future)
+
+    def _bucket(self, key: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= 4096:
+                now = time.monotonic()
+                for idle in [k for k, b in self._buckets.items() if b.is_idle(now) and k not in self._workers]:
+                    del self._buckets[idle]
+            bucket = self._buckets[key] = TokenBucket(self.channel_rate, self.channel_burst)
+        return bucket
+
+    async def _take(self, bucket: TokenBucket):
+        """Wait for a token from a bucket"""
+        while not bucket.consume():
+            await asyncio.sleep(bucket.retry_after())
+
+    async def _worker(self, key: int):
+        """Send a channel's queue in order, pacing by the channel and global buckets"""
+        pending = self._queues[key]
+        bucket = self._bucket(key)
+        if self._global_lock is None:
+            self._global_lock = asyncio.Lock()
+        try:
+            while pending:
+                await self._take(bucket)
+                async with self._global_lock:
+                    await self._take(self._global)
+                if not pending:
+                    break
+                batch = self._next_batch(pending)
+                await self._deliver(batch)
+        finally:
+            del self._workers[key]
+            if not pending:
+                self._queues.pop(key, None)
+            else:
+                # Cancelled with sends still queued (shutdown); fail them instead of leaving callers hanging
+                while pending:
+                    item = pending.popleft()
+                    if not item.future.done():
+                        item.future.cancel()
+
+    def _next_batch(self, pending: Deque[_Outgoing]) -> List[_Outgoing]:
+        """Pop the head of the queue plus any following replies that fit in the same message"""
+        batch = [pending.popleft()]
+        if not self.coalesce:
+            return batch
+        length = len(batch[0].content or '')
+        while pending and pending[0].mergeable_with(batch[0]):
+            extra = len(pending[0].content) + 2
+            if length + extra > MESSAGE_LIMIT:
+                break
+            length += extra
+            batch.append(pending.popleft())
+        return batch
+
+    async def _deliver(self, batch: List[_Outgoing]):
+        head = batch[0]
+        now = time.perf_counter()
+        for item in batch:
+            metrics.observe('outbound', 'queue_delay', now - item.enqueued_at)
+        content = head.content if len(batch) == 1 else '\n\n'.join(item.content for item in batch)
+        try:
+            message = await head.destination.send(content, **head.kwargs)
+        except Exception as e:
+            self.metrics['failed'] += 1
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+                    # Callers that gave up (shielded and cancelled) must not trigger 'exception never retrieved'
+                    item.future.exception()
+            return
+        self.metrics['sent_messages'] += 1
+        self.metrics['coalesced'] += len(batch) - 1
+        for item in batch:
+            if not item.future.done():
+                item.future.set_result(message)
+
+    async def close(self, timeout: Optional[float] = None):
+        """Let queued messages go out until the timeout (or until cancelled), then drop what is left"""
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        try:
+            await asyncio.wait(workers, timeout=timeout)
+        finally:
+            still_running = [task for task in workers if not task.done()]
+            for task in still_running:
+                task.cancel()
+            if still_running:
+                logger.warning(f"Dropped outbound messages for {len(still_running)} channel(s) at shutdown")
+
+
+outbound = OutboundDispatcher()
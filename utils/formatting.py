@@ -0,0 +1,97 @@
+"""
+Formatting Module
+Splits long replies into Discord-sized pages on markdown-safe boundaries
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+MESSAGE_LIMIT = 2000
+
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})")
+
+
+def _blocks(text: str) -> List[Tuple[str, Optional[str]]]:
+    """Paragraphs and whole code blocks as (text, opening fence line or None), in one pass over the lines"""
+    blocks: List[Tuple[str, Optional[str]]] = []
+    current: List[str] = []
+    fence: Optional[str] = None
+    marker = ''
+    for line in text.split('\n'):
+        match = _FENCE.match(line)
+        if fence is not None:
+            current.append(line)
+            if match and line.strip() == marker:
+                blocks.append(('\n'.join(current), fence))
+                current, fence = [], None
+        elif match:
+            if current:
+                blocks.append(('\n'.join(current), None))
+            current, fence, marker = [line], line, match.group(1)
+        elif line.strip():
+            current.append(line)
+        elif current:
+            blocks.append(('\n'.join(current), None))
+            current = []
+    if current:
+        blocks.append(('\n'.join(current), fence))
+    return blocks
+
+
+def _split_line(line: str, limit: int) -> List[str]:
+    """Cut an overlong line at spaces, or hard when a word is longer than the limit"""
+    pieces = []
+    while len(line) > limit:
+        cut = line.rfind(' ', limit // 2, limit)
+        if cut == -1:
+            cut = limit
+        pieces.append(line[:cut].rstrip())
+        line = line[cut:].lstrip()
+    if line:
+        pieces.append(line)
+    return pieces
+
+
+def _pack_lines(lines: List[str], limit: int) -> List[str]:
+    """Greedily join lines into pieces of at most `limit` characters"""
+    pieces, current = [], ''
+    for line in lines:
+        for part in _split_line(line, limit) if len(line) > limit else [line]:
+            if current and len(current) + 1 + len(part) <= limit:
+                current += '\n' + part
+            else:
+                if current:
+                    pieces.append(current)
+                current = part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_block(block: str, fence: Optional[str], limit: int) -> List[str]:
+    """Split a block larger than a page; code blocks are closed and re-opened around every piece"""
+    if fence is None:
+        return _pack_lines(block.split('\n'), limit)
+    lines = block.split('\n')
+    closer = _FENCE.match(fence).group(1)
+    body = lines[1:-1] if len(lines) > 1 and lines[-1].strip() == closer else lines[1:]
+    budget = limit - len(fence) - len(closer) - 2
+    return [f"{fence}\n{piece}\n{closer}" for piece in _pack_lines(body, budget)]
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Pages of at most `limit` characters, breaking between paragraphs, then lines, then words"""
+    if len(text) <= limit:
+        return [text]
+    pages, current = [], ''
+    for block, fence in _blocks(text):
+        for piece in [block] if len(block) <= limit else _split_block(block, fence, limit):
+            if current and len(current) + 2 + len(piece) <= limit:
+                current += '\n\n' + piece
+            else:
+                if current:
+                    pages.append(current)
+                current = piece
+    if current:
+        pages.append(current)
+    return pages
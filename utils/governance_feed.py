@@ -0,0 +1,205 @@
+"""
+Governance Feed Module
+Polls governance proposals and pushes only new proposals, status changes and closures to subscribed channels
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED_STATUSES = frozenset({'passed', 'rejected', 'executed', 'closed', 'cancelled', 'canceled', 'expired', 'failed'})
+
+# (kind, proposal id, title, old status, new status); kind is 'new', 'status' or 'closed'
+Change = Tuple[str, str, str, Optional[str], Optional[str]]
+
+
+def proposal_digest(proposal: dict) -> str:
+    """Content hash of a proposal, independent of key order"""
+    return hashlib.blake2b(json.dumps(proposal, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+def format_changes(changes: List[Change], limit: int = 1900) -> List[str]:
+    """Render changes as messages that each fit Discord's length limit"""
+    icons = {'new': '🆕', 'status': '🔄', 'closed': '🏁'}
+    messages, current = [], "🏛️ **Governance update**"
+    for kind, proposal_id, title, old, new in changes:
+        if kind == 'new':
+            line = f"\n{icons[kind]} New proposal **{title}** (ID {proposal_id}) - {new or 'unknown'}"
+        elif kind == 'status':
+            line = f"\n{icons[kind]} **{title}** (ID {proposal_id}): {old or 'unknown'} → {new or 'unknown'}"
+        elif new:
+            line = f"\n{icons[kind]} **{title}** (ID {proposal_id}) closed: {new}"
+        else:
+            line = f"\n{icons[kind]} **{title}** (ID {proposal_id}) is no longer listed"
+        if len(current) + len(line) > limit:
+            messages.append(current)
+            current = "🏛️ **Governance update** (continued)"
+        current += line
+    messages.append(current)
+    return messages
+
+
+class GovernanceFeed:
+    def __init__(self, send: Callable[[int, str], Awaitable[None]], fetch: Callable[[], Awaitable[Optional[List[dict]]]],
+                 owns: Optional[Callable[[Optional[int]], bool]] = None):
+        self.path = os.getenv('GOVERNANCE_FEED_STATE', 'governance_feed.json')
+        self.poll_interval = float(os.getenv('GOVERNANCE_POLL_INTERVAL', '300'))
+
+        # proposal id -> (content digest, title, status); only proposals whose digest moved are inspected
+        self.proposals: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        # channel id -> guild id
+        self.channels: Dict[int, Optional[int]] = {}
+        self._seeded = False
+        self._feed_digest: Optional[str] = None
+        self._send = send
+        self._fetch = fetch
+        self._owns = owns or (lambda guild_id: True)
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.metrics = {'polls': 0, 'changes': 0, 'messages': 0, 'send_failures': 0, 'proposals': 0, 'channels': 0}
+
+    def diff(self, proposals: List[dict]) -> List[Change]:
+        """Apply a fresh proposal list to the snapshot and return what changed"""
+        # An unchanged feed (the common case) is settled by one hash comparison
+        feed_digest = proposal_digest({'proposals': proposals})
+        if feed_digest == self._feed_digest:
+            return []
+        self._feed_digest = feed_digest
+
+        changes: List[Change] = []
+        seen = set()
+        for proposal in proposals:
+            proposal_id = str(proposal.get('id'))
+            seen.add(proposal_id)
+            digest = proposal_digest(proposal)
+            known = self.proposals.get(proposal_id)
+            if known is not None and known[0] == digest:
+                continue
+
+            title, status = str(proposal.get('title', 'Untitled')), proposal.get('status')
+            self.proposals[proposal_id] = (digest, title, status)
+            if known is None:
+                changes.append(('new', proposal_id, title, None, status))
+            elif known[2] != status:
+                kind = 'closed' if str(status).lower() in CLOSED_STATUSES else 'status'
+                changes.append((kind, proposal_id, title, known[2], status))
+
+        # Proposals that vanished from the feed are treated as closed
+        for proposal_id in [proposal_id for proposal_id in self.proposals if proposal_id not in seen]:
+            _, title, status = self.proposals.pop(proposal_id)
+            if str(status).lower() not in CLOSED_STATUSES:
+                changes.append(('closed', proposal_id, title, status, None))
+        self.metrics['proposals'] = len(self.proposals)
+        return changes
+
+    async def start(self):
+        """Load the snapshot and subscriptions, then start polling"""
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        state = await loop.run_in_executor(None, self._load_sync)
+        if state:
+            self.proposals = {proposal_id: tuple(entry) for proposal_id, entry in state.get('proposals', {}).items()}
+            self.channels = {int(channel_id): guild_id for channel_id, guild_id in state.get('channels', {}).items()}
+            self._seeded = bool(state.get('seeded'))
+        self.metrics.update(proposals=len(self.proposals), channels=len(self.channels))
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        """Stop polling and save state"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._save()
+
+    async def subscribe(self, channel_id: int, guild_id: Optional[int]) -> bool:
+        """Send governance changes to a channel; False if it was already subscribed"""
+        if channel_id in self.channels:
+            return False
+        self.channels[channel_id] = guild_id
+        self.metrics['channels'] = len(self.channels)
+        await self._save()
+        return True
+
+    async def unsubscribe(self, channel_id: int) -> bool:
+        """Stop sending governance changes to a channel"""
+        if channel_id not in self.channels:
+            return False
+        del self.channels[channel_id]
+        self.metrics['channels'] = len(self.channels)
+        await self._save()
+        return True
+
+    async def poll_once(self) -> List[Change]:
+        """Fetch proposals, diff them and push the changes"""
+        async with self._lock:
+            proposals = await self._fetch()
+            if proposals is None:
+                return []
+            self.metrics['polls'] += 1
+            changes = self.diff(proposals)
+            if not self._seeded:
+                # The first snapshot is a baseline, not a burst of 'new proposal' messages
+                self._seeded = True
+                await self._save()
+                return []
+            if not changes:
+                return []
+            self.metrics['changes'] += len(changes)
+            await self._save()
+
+        logger.info(f"Governance feed: {len(changes)} change(s) for {len(self.channels)} channel(s)")
+        messages = format_changes(changes)
+        targets = [channel_id for channel_id, guild_id in self.channels.items() if self._owns(guild_id)]
+        results = await asyncio.gather(
+            *(self._send(channel_id, content) for channel_id in targets for content in messages),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.metrics['send_failures'] += 1
+                logger.warning(f"Could not deliver governance update: {result}")
+            else:
+                self.metrics['messages'] += 1
+        return changes
+
+    async def _poll(self):
+        """Poll while any channel is subscribed"""
+        while True:
+            if self.channels:
+                try:
+                    await self.poll_once()
+                except Exception as e:
+                    logger.warning(f"Governance poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _save(self):
+        state = {
+            'seeded': self._seeded,
+            'proposals': {proposal_id: list(entry) for proposal_id, entry in self.proposals.items()},
+            'channels': {str(channel_id): guild_id for channel_id, guild_id in self.channels.items()},
+        }
+        await asyncio.get_running_loop().run_in_executor(None, self._save_sync, state)
+
+    def _save_sync(self, state: dict):
+        """Write the state file atomically"""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def _load_sync(self) -> Optional[dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable governance feed state {self.path}: {e}")
+            return None
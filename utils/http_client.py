@@ -0,0 +1,40 @@
+"""
+HTTP Client Module
+Shared pooled aiohttp session for outbound API calls
+"""
+
+import asyncio
+from typing import Optional
+import aiohttp
+from utils.runtime import runtime_settings
+
+_session: Optional[aiohttp.ClientSession] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on first use"""
+    global _session, _lock
+    if _session is not None and not _session.closed:
+        return _session
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _session is None or _session.closed:
+            settings = runtime_settings()
+            connector = aiohttp.TCPConnector(
+                limit=settings['http_limit'],
+                limit_per_host=settings['http_limit_per_host'],
+                ttl_dns_cache=300,
+            )
+            _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_session():
+    """Close the shared session and its pooled connections"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
@@ -0,0 +1,285 @@
+"""
+Document Ingestion Module
+Streams knowledge/ docs into overlapping, content-hashed chunks stored in a memory-mappable index
+
+Usage: python -m utils.ingest   # run one ingestion pass and print what changed
+"""
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from utils.local_answers import BM25Index, Passage
+
+logger = logging.getLogger(__name__)
+
+DOC_EXTENSIONS = ('.md', '.markdown', '.txt')
+# Bump when the record layout changes; a data file with another magic starts a fresh index
+MAGIC = b'XKC2'
+# Bump when stream_chunks changes how text is cut, so existing indexes are rebuilt
+CHUNKER_VERSION = 2
+# digest (16 bytes), title length, text length, term counts length; term counts are stored as JSON
+# so loading an index needs no tokenizing
+RECORD = struct.Struct('<16sHII')
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+_WHITESPACE = re.compile(r"\s")
+
+
+def stream_chunks(path: str, size: int, overlap: int) -> Iterator[Tuple[str, str]]:
+    """Yield (heading, text) chunks of about `size` characters, each sharing `overlap` characters with the previous"""
+    if not 0 <= overlap < size // 2:
+        raise ValueError(f"chunk overlap must be at least 0 and below half the chunk size ({size // 2}), got {overlap}")
+    heading = ''
+    buffer = ''
+    # Length of the buffer's prefix that the previous chunk already contains
+    emitted = 0
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = _HEADING.match(line)
+            if match:
+                heading = match.group(1).strip()
+            buffer += line
+            while len(buffer) >= size:
+                # Prefer to cut at a line break, then at a space, in the second half of the window
+                cut = buffer.rfind('\n', size // 2, size)
+                if cut == -1:
+                    cut = buffer.rfind(' ', size // 2, size)
+                if cut == -1:
+                    cut = size
+                yield heading, buffer[:cut].strip()
+                start = max(0, cut - overlap)
+                # Start the overlap at a word boundary; drop it rather than begin mid-word
+                boundary = _WHITESPACE.search(buffer, start, cut)
+                keep = boundary.end() if boundary else cut
+                buffer = buffer[keep:]
+                emitted = cut - keep
+    if buffer[emitted:].strip():
+        yield heading, buffer.strip()
+
+
+def chunk_digest(title: str, text: str) -> bytes:
+    """Content hash identifying a chunk"""
+    return hashlib.blake2b(f"{title}\0{text}".encode(), digest_size=16).digest()
+
+
+class DocumentIndex:
+    def __init__(self):
+        self.directory = os.getenv('KNOWLEDGE_DIR', 'knowledge')
+        self.index_dir = os.getenv('KNOWLEDGE_INDEX_DIR', '.knowledge_index')
+        self.chunk_size = int(os.getenv('KNOWLEDGE_CHUNK_CHARS', '1200'))
+        self.overlap = int(os.getenv('KNOWLEDGE_CHUNK_OVERLAP', '200'))
+        if not 0 <= self.overlap < self.chunk_size // 2:
+            logger.warning(
+                f"KNOWLEDGE_CHUNK_OVERLAP={self.overlap} must be below half of KNOWLEDGE_CHUNK_CHARS={self.chunk_size}, "
+                f"using {self.chunk_size // 6}"
+            )
+            self.overlap = self.chunk_size // 6
+        self.poll_interval = float(os.getenv('KNOWLEDGE_POLL', '30'))
+
+        # Chunks made with other settings are stale; a manifest recording different ones is discarded
+        self._chunking = [CHUNKER_VERSION, self.chunk_size, self.overlap]
+        self._data_path = os.path.join(self.index_dir, 'chunks.bin')
+        self._manifest_path = os.path.join(self.index_dir, 'manifest.json')
+        # relative path -> {'size', 'mtime_ns', 'chunks': [hex digest]}
+        self._files: Dict[str, dict] = {}
+        # hex digest -> (offset, record length)
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._dead_bytes = 0
+        self.index = BM25Index()
+        self.version = ''
+        self._task: Optional[asyncio.Task] = None
+        self.ready: Optional[asyncio.Event] = None
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Find ingestible files, skipping hidden files and directories"""
+        found = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in files:
+                if name.startswith('.') or not name.lower().endswith(DOC_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                found[os.path.relpath(path, self.directory)] = os.stat(path)
+        return found
+
+    def _load_manifest(self):
+        """Read the manifest; a missing, unreadable or differently chunked one starts a fresh index"""
+        try:
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('chunking') != self._chunking:
+                raise ValueError("index was built with different chunk settings")
+            with open(self._data_path, 'rb') as data:
+                if data.read(len(MAGIC)) != MAGIC:
+                    raise ValueError("index data file has another record layout")
+            self._files = manifest['files']
+            self._offsets = {digest: tuple(entry) for digest, entry in manifest['offsets'].items()}
+            self._dead_bytes = manifest.get('dead_bytes', 0)
+        except (OSError, ValueError, KeyError):
+            self._files, self._offsets, self._dead_bytes = {}, {}, 0
+            if os.path.exists(self._data_path):
+                os.remove(self._data_path)
+
+    def _save_manifest(self):
+        """Write the manifest atomically"""
+        tmp = self._manifest_path + '.tmp'
+        manifest = {'chunking': self._chunking, 'files': self._files, 'offsets': self._offsets, 'dead_bytes': self._dead_bytes}
+        with open(tmp, 'w') as f:
+            # dumps uses the C encoder; dump streams through the pure-Python one
+            f.write(json.dumps(manifest))
+        os.replace(tmp, self._manifest_path)
+
+    def _read_chunks(self, digests: List[str]) -> Dict[str, Tuple[Passage, Counter]]:
+        """Read stored chunks and their term counts through a memory map of the data file"""
+        chunks: Dict[str, Tuple[Passage, Counter]] = {}
+        if not digests or not os.path.exists(self._data_path):
+            return chunks
+        sources: Dict[str, str] = {}
+        for path, entry in self._files.items():
+            for digest in entry['chunks']:
+                sources.setdefault(digest, path)
+        with open(self._data_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for digest in digests:
+                offset, _ = self._offsets[digest]
+                _, title_len, text_len, terms_len = RECORD.unpack_from(data, offset)
+                start = offset + RECORD.size
+                text_start = start + title_len
+                terms_start = text_start + text_len
+                title = data[start:text_start].decode()
+                text = data[text_start:terms_start].decode()
+                counts = Counter(json.loads(data[terms_start:terms_start + terms_len]))
+                chunks[digest] = ((sources.get(digest, self.directory), title, text), counts)
+        return chunks
+
+    def _append(self, data, title: str, text: str, counts: Optional[Counter] = None) -> str:
+        """Append a chunk record with its term counts, returning its hex digest"""
+        digest = chunk_digest(title, text)
+        if counts is None:
+            counts = BM25Index.term_counts(('', title, text))
+        title_bytes, text_bytes = title.encode()[:65535], text.encode()
+        terms_bytes = json.dumps(counts, separators=(',', ':')).encode()
+        offset = data.tell()
+        data.write(RECORD.pack(digest, len(title_bytes), len(text_bytes), len(terms_bytes)) + title_bytes + text_bytes + terms_bytes)
+        self._offsets[digest.hex()] = (offset, RECORD.size + len(title_bytes) + len(text_bytes) + len(terms_bytes))
+        return digest.hex()
+
+    def _compact(self):
+        """Rewrite the data file with live chunks only once dead records dominate it"""
+        live = {digest for entry in self._files.values() for digest in entry['chunks']}
+        chunks = self._read_chunks(sorted(live))
+        tmp = self._data_path + '.tmp'
+        self._offsets = {}
+        with open(tmp, 'wb') as data:
+            data.write(MAGIC)
+            for digest, ((_, title, text), counts) in chunks.items():
+                self._append(data, title, text, counts)
+        os.replace(tmp, self._data_path)
+        self._dead_bytes = 0
+
+    def ingest(self) -> Tuple[Dict[str, Tuple[Passage, Counter]], List[str], Dict[str, int]]:
+        """Bring the on-disk index up to date with the directory.
+
+        Returns (added chunks with their term counts, removed digests, report); only changed files are
+        re-read and only chunks with new hashes are tokenized and stored. Blocking, so run it in an executor.
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        if not self._files and not self._offsets:
+            self._load_manifest()
+        before = {digest for entry in self._files.values() for digest in entry['chunks']}
+        report = {'files_scanned': 0, 'files_changed': 0, 'files_removed': 0, 'chunks_added': 0}
+
+        current = self._scan() if os.path.isdir(self.directory) else {}
+        for path in [path for path in self._files if path not in current]:
+            del self._files[path]
+            report['files_removed'] += 1
+
+        with open(self._data_path, 'ab') as data:
+            if data.tell() == 0:
+                data.write(MAGIC)
+            for path, stat in current.items():
+                report['files_scanned'] += 1
+                entry = self._files.get(path)
+                if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                    continue
+                report['files_changed'] += 1
+                digests = []
+                for heading, text in stream_chunks(os.path.join(self.directory, path), self.chunk_size, self.overlap):
+                    title = heading or path
+                    digest = chunk_digest(title, text).hex()
+                    if digest not in self._offsets:
+                        self._append(data, title, text)
+                        report['chunks_added'] += 1
+                    digests.append(digest)
+                self._files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'chunks': digests}
+
+        after = {digest for entry in self._files.values() for digest in entry['chunks']}
+        removed = sorted(before - after)
+        for digest in removed:
+            self._dead_bytes += self._offsets.pop(digest)[1]
+        live_bytes = sum(length for _, length in self._offsets.values())
+        if self._dead_bytes > max(live_bytes, 1 << 20):
+            self._compact()
+        self._save_manifest()
+
+        # Chunks new to the in-memory index: everything on first load, only changes afterwards
+        added = self._read_chunks(sorted(digest for digest in after if digest not in self.index.passages))
+        report['chunks_live'] = len(after)
+        return added, removed, report
+
+    def _apply(self, added: Dict[str, Tuple[Passage, Counter]], removed: List[str]):
+        """Update the search index on the event loop; only dict updates, no tokenizing"""
+        for digest in removed:
+            self.index.remove(digest)
+        for digest, (passage, counts) in added.items():
+            self.index.add(digest, passage, counts)
+        if added or removed or not self.version:
+            self.version = hashlib.sha256(''.join(sorted(self.index.passages)).encode()).hexdigest()[:12]
+
+    async def refresh(self) -> Dict[str, int]:
+        """Run one incremental ingestion pass"""
+        loop = asyncio.get_running_loop()
+        added, removed, report = await loop.run_in_executor(None, self.ingest)
+        self._apply(added, removed)
+        if report['files_changed'] or report['files_removed']:
+            logger.info(f"Knowledge docs reindexed: {report}")
+        return report
+
+    def start(self):
+        """Load the index and keep it in sync with the directory"""
+        if self._task is None:
+            self.ready = asyncio.Event()
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Stop watching the directory"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self):
+        """Refresh now and then every poll interval"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Knowledge ingestion failed: {e}")
+            self.ready.set()
+            await asyncio.sleep(self.poll_interval)
+
+    def search(self, question: str, limit: int) -> List[Passage]:
+        """Chunks most relevant to a question"""
+        return [self.index.passages[doc_id] for _, doc_id in self.index.search(question, limit)]
+
+
+if __name__ == '__main__':
+    documents = DocumentIndex()
+    added, removed, report = documents.ingest()
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,206 @@
+"""
+Local Answer Engine
+BM25 retrieval over README.md, AI_BOT_LOG.md and PROJECT_INFO for answering without the LLM
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOC_FILES = ('README.md', 'AI_BOT_LOG.md')
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_URL = re.compile(r"https?://[^\s)\]>'\"`]+")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_MARKUP = re.compile(r"[*_`]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its of on or "
+    "so that the their there this to was what when where which who why will with you your".split()
+)
+
+# (source, title, text)
+Passage = Tuple[str, str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_markdown(source: str, text: str, max_chars: int = 700) -> List[Passage]:
+    """Split markdown into passages by section, packing paragraphs up to max_chars"""
+    passages: List[Passage] = []
+    title = source
+    paragraphs: List[str] = []
+    current: List[str] = []
+
+    def flush_section():
+        chunk = ''
+        for paragraph in paragraphs:
+            if chunk and len(chunk) + len(paragraph) > max_chars:
+                passages.append((source, title, chunk))
+                chunk = ''
+            chunk = f"{chunk}\n\n{paragraph}" if chunk else paragraph
+        if chunk:
+            passages.append((source, title, chunk))
+
+    for line in text.splitlines() + ['']:
+        heading = _HEADING.match(line)
+        if heading or not line.strip():
+            if current:
+                paragraphs.append('\n'.join(current))
+                current = []
+            if heading:
+                flush_section()
+                paragraphs = []
+                title = _MARKUP.sub('', heading.group(2)).strip()
+            continue
+        current.append(line.rstrip())
+    flush_section()
+    return passages
+
+
+def _flatten(value: Any, prefix: str = '') -> List[str]:
+    """Render nested project data as 'path: value' lines"""
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, dict):
+                lines.extend(_flatten(item, f"{prefix}{key} "))
+            elif isinstance(item, list):
+                lines.append(f"{prefix}{key}: {', '.join(str(entry) for entry in item)}")
+            else:
+                lines.append(f"{prefix}{key}: {item}")
+        return lines
+    if isinstance(value, list):
+        return [f"{prefix}- {item}" for item in value]
+    return [f"{prefix}{value}"]
+
+
+def project_info_passages(info: Dict[str, Any]) -> List[Passage]:
+    """One passage per FAQ entry and per structured section; scalar fields become a links passage"""
+    passages: List[Passage] = []
+    scalars = []
+    for key, value in info.items():
+        if key == 'faq':
+            passages.extend(('PROJECT_INFO', question, answer) for question, answer in value.items())
+        elif isinstance(value, (dict, list)):
+            passages.append(('PROJECT_INFO', key.replace('_', ' '), '\n'.join(_flatten(value))))
+        else:
+            scalars.append(f"{key}: {value}")
+    if scalars:
+        passages.append(('PROJECT_INFO', 'Project links', '\n'.join(scalars)))
+    return passages
+
+
+class BM25Index:
+    def __init__(self, passages: Iterable[Passage] = (), k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.passages: Dict[Hashable, Passage] = {}
+        # term -> {passage id: term frequency}
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.lengths: Dict[Hashable, int] = {}
+        self._terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self._total_length = 0
+        for doc_id, passage in enumerate(passages):
+            self.add(doc_id, passage)
+
+    @staticmethod
+    def term_counts(passage: Passage) -> Counter:
+        """Term frequencies for a passage; titles are weighted by counting them twice"""
+        _, title, text = passage
+        return Counter(tokenize(f"{title} {title} {text}"))
+
+    def add(self, doc_id: Hashable, passage: Passage, counts: Optional[Counter] = None):
+        """Index a passage; counts may be precomputed off the event loop"""
+        if doc_id in self.passages:
+            return
+        counts = self.term_counts(passage) if counts is None else counts
+        self.passages[doc_id] = passage
+        self.lengths[doc_id] = length = sum(counts.values())
+        self._total_length += length
+        self._terms[doc_id] = tuple(counts)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: Hashable):
+        """Drop a passage from the index"""
+        if self.passages.pop(doc_id, None) is None:
+            return
+        self._total_length -= self.lengths.pop(doc_id)
+        for term in self._terms.pop(doc_id):
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[float, Hashable]]:
+        """Top passages as (score, passage id), best first"""
+        count = len(self.passages)
+        if not count:
+            return []
+        scores: Dict[Hashable, float] = {}
+        k1, b, lengths = self.k1, self.b, self.lengths
+        avg_length = self._total_length / count or 1.0
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, doc_id) for doc_id, score in best]
+
+
+class LocalAnswerEngine:
+    def __init__(self, passages: List[Passage], docs_url: str = '', min_score: Optional[float] = None):
+        self.index = BM25Index(passages)
+        self.docs_url = docs_url
+        self.min_score = float(os.getenv('LOCAL_ANSWER_MIN_SCORE', '2.0')) if min_score is None else min_score
+
+    @classmethod
+    def build(cls, info: Dict[str, Any], root: str = ROOT) -> 'LocalAnswerEngine':
+        """Index the bundled docs and the given project data"""
+        passages = project_info_passages(info)
+        for name in DOC_FILES:
+            try:
+                with open(os.path.join(root, name), encoding='utf-8') as f:
+                    passages.extend(chunk_markdown(name, f.read()))
+            except OSError as e:
+                logger.warning(f"Skipping {name} for the local answer index: {e}")
+        return cls(passages, docs_url=info.get('documentation', ''))
+
+    def answer(self, question: str, limit: int = 2) -> str:
+        """Compose a reply from the best-matching passages and their links"""
+        hits = [doc_id for score, doc_id in self.index.search(question, limit * 2) if score >= self.min_score]
+        if not hits:
+            return f"I couldn't find that in the local docs. Try `!help`, or see {self.docs_url or 'the official documentation'}."
+
+        sections, links, seen = [], [], set()
+        for doc_id in hits:
+            source, title, text = self.index.passages[doc_id]
+            # README.md and AI_BOT_LOG.md repeat some sections verbatim
+            if text in seen:
+                continue
+            seen.add(text)
+            if len(sections) == limit:
+                break
+            snippet = text if len(text) <= 500 else text[:500].rsplit(' ', 1)[0] + '…'
+            sections.append(f"**{title}** ({source})\n{snippet}")
+            for url in _URL.findall(text):
+                if url not in links:
+                    links.append(url)
+
+        reply = '\n\n'.join(sections)
+        if links:
+            reply += '\n\n🔗 ' + '\n🔗 '.join(links[:3])
+        return reply + "\n\n_Answered from the local docs._"
@@ -0,0 +1,125 @@
+"""
+Logging Setup Module
+Queue-based, non-blocking logging with JSON output, rotation and duplicate-traceback suppression
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        """Render a record as a single JSON line"""
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ThreadQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge args now but leave traceback formatting to the listener thread"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class DuplicateTracebackFilter(logging.Filter):
+    def __init__(self, window: float):
+        super().__init__()
+        self.window = window
+        # signature -> (window start, suppressed count)
+        self._seen: Dict[Tuple, Tuple[float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Let the first traceback of a kind through per window and count the repeats"""
+        if not record.exc_info or record.exc_info[1] is None:
+            return True
+
+        exc_type, _, tb = record.exc_info
+        while tb is not None and tb.tb_next is not None:
+            tb = tb.tb_next
+        origin = (tb.tb_frame.f_code.co_filename, tb.tb_lineno) if tb is not None else None
+        signature = (record.name, record.msg, exc_type, origin)
+
+        now = time.monotonic()
+        started, suppressed = self._seen.get(signature, (0.0, 0))
+        if now - started < self.window:
+            self._seen[signature] = (started, suppressed + 1)
+            return False
+
+        if len(self._seen) > 1024:
+            self._seen.clear()
+        self._seen[signature] = (now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} [{suppressed} identical tracebacks suppressed]"
+        return True
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a background listener thread"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+    if os.getenv('LOG_FORMAT', 'text').lower() == 'json':
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    handlers = [logging.StreamHandler(sys.stdout)]
+    # Off by default: deployments usually redirect stdout to a file already (nohup python bot.py > bot.log)
+    log_file = os.getenv('LOG_FILE', '')
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv('LOG_BACKUPS', '5')),
+            encoding='utf-8',
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = ThreadQueueHandler(log_queue)
+    queue_handler.addFilter(DuplicateTracebackFilter(float(os.getenv('LOG_DUPLICATE_WINDOW', '60'))))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
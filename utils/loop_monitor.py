@@ -0,0 +1,169 @@
+"""
+Event Loop Monitor Module
+Loop-lag sampling, stall detection with stack capture, and an on-demand sampling profiler
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    def __init__(self):
+        self.interval = float(os.getenv('LOOP_LAG_INTERVAL', '0.1'))
+        self.stall_threshold = float(os.getenv('LOOP_STALL_THRESHOLD', '0.25'))
+        self.samples = deque(maxlen=600)
+        self.stalls = 0
+        self.max_lag = 0.0
+
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop = None
+        self._loop_thread_id = None
+
+    def start(self):
+        """Start sampling on the running loop and the stall watchdog thread"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        """Stop sampling and the watchdog"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sample(self):
+        """Measure scheduled-vs-actual wakeup drift"""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self):
+        """Detect stalls while they happen and log the stack that is blocking the loop"""
+        reported = False
+        while not self._stop.wait(self.stall_threshold / 2):
+            stalled_for = time.monotonic() - self._heartbeat - self.interval
+            if stalled_for < self.stall_threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+
+            reported = True
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<unavailable>'
+            task_name = self._current_task_name()
+            logger.warning(
+                f"Event loop blocked for {stalled_for * 1000:.0f} ms in task {task_name}:\n{stack}"
+            )
+
+    def _current_task_name(self) -> str:
+        """Name of the task the loop is running, read from another thread"""
+        # asyncio.current_task() only works on the loop's own thread, so peek at asyncio's private map;
+        # it is not guaranteed to exist on every interpreter, so degrade instead of killing the watchdog
+        current_tasks = getattr(asyncio.tasks, '_current_tasks', None)
+        if current_tasks is None:
+            return '<unknown>'
+        try:
+            task = current_tasks.get(self._loop)
+        except Exception:
+            return '<unknown>'
+        return task.get_name() if task is not None else '<callback>'
+
+    def stats(self) -> Dict[str, float]:
+        """Lag percentiles in milliseconds plus stall count"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {'stalls': self.stalls}
+        return {
+            'lag_p50_ms': round(ordered[len(ordered) // 2] * 1000, 2),
+            'lag_p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+            'lag_max_ms': round(self.max_lag * 1000, 2),
+            'stalls': self.stalls,
+        }
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._running = threading.Lock()
+
+    def _collect(self, thread_id: int, duration: float) -> Tuple[Counter, Counter, int]:
+        """Sample one thread's stack until the duration elapses"""
+        own = Counter()
+        total = Counter()
+        samples = 0
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                samples += 1
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    key = f"{code.co_name} ({os.path.relpath(code.co_filename)}:{code.co_firstlineno})"
+                    if leaf:
+                        own[key] += 1
+                        leaf = False
+                    if key not in seen:
+                        total[key] += 1
+                        seen.add(key)
+                    frame = frame.f_back
+            time.sleep(self.interval)
+
+        return own, total, samples
+
+    async def profile(self, seconds: float, top: int = 25) -> str:
+        """Sample the event loop thread for a number of seconds and render a hot-function report"""
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            thread_id = threading.get_ident()
+            loop = asyncio.get_running_loop()
+            collector = loop.run_in_executor(None, self._collect, thread_id, seconds)
+            own, total, samples = await collector
+        finally:
+            self._running.release()
+
+        lines = [
+            f"Sampling profile of the event loop thread: {seconds:g}s, {samples} samples every {self.interval * 1000:g} ms",
+            "Idle time shows up under the selector's select/poll call.",
+            "",
+            f"Top {top} by own time:",
+            f"{'own%':>7}  {'total%':>7}  function",
+        ]
+        for key, count in own.most_common(top):
+            lines.append(f"{count / max(samples, 1) * 100:>6.1f}%  {total[key] / max(samples, 1) * 100:>6.1f}%  {key}")
+
+        lines += ["", f"Top {top} by total time:", f"{'total%':>7}  function"]
+        for key, count in total.most_common(top):
+            lines.append(f"{count / max(samples, 1) * 100:>6.1f}%  {key}")
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,187 @@
+"""
+Metrics Module
+Latency histograms, counters and a local Prometheus-style HTTP endpoint
+"""
+
+import asyncio
+import functools
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, shared by every histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count', 'errors')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        """Record one timed call"""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket that contains it"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.counts):
+            running += bucket_count
+            if running >= target:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        # (kind, name) -> Histogram, where kind is "command" or "upstream"
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._server = None
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        """Record a latency sample for a command or upstream call"""
+        key = (kind, name)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds, error)
+
+    def register_collector(self, prefix: str, collector: Callable[[], Dict[str, float]]):
+        """Expose a component's counters as gauges, read on each scrape"""
+        self.collectors[prefix] = collector
+
+    def timed(self, name: str, is_error: Optional[Callable[[object], bool]] = None):
+        """Decorator timing an upstream coroutine; is_error flags failures reported via return value"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                error = True
+                try:
+                    result = await func(*args, **kwargs)
+                    error = bool(is_error and is_error(result))
+                    return result
+                finally:
+                    self.observe('upstream', name, time.perf_counter() - start, error)
+            return wrapper
+        return decorator
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = [
+            '# TYPE xandbot_latency_seconds histogram',
+        ]
+        for (kind, name), histogram in sorted(self.histograms.items()):
+            labels = f'kind="{kind}",name="{name}"'
+            running = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.counts):
+                running += bucket_count
+                lines.append(f'xandbot_latency_seconds_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f'xandbot_latency_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'xandbot_latency_seconds_sum{{{labels}}} {histogram.total}')
+            lines.append(f'xandbot_latency_seconds_count{{{labels}}} {histogram.count}')
+
+        lines.append('# TYPE xandbot_errors_total counter')
+        for (kind, name), histogram in sorted(self.histograms.items()):
+            lines.append(f'xandbot_errors_total{{kind="{kind}",name="{name}"}} {histogram.errors}')
+
+        for prefix, collector in self.collectors.items():
+            try:
+                values = collector()
+            except Exception as e:
+                logger.error(f"Metrics collector {prefix} failed: {e}")
+                continue
+            for key, value in values.items():
+                metric = f'xandbot_{prefix}_{key}'
+                lines.append(f'# TYPE {metric} gauge')
+                lines.append(f'{metric} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def format_summary(self) -> str:
+        """Format a short latency and error summary for Discord"""
+        if not self.histograms:
+            return "**Bot Stats**\n\nNo calls recorded yet."
+
+        formatted = "**Bot Stats**\n\n```\n"
+        formatted += f"{'name':<24}{'calls':>7}{'err%':>7}{'avg ms':>9}{'p95 ms':>9}\n"
+        for (kind, name), histogram in sorted(self.histograms.items()):
+            avg = histogram.total / histogram.count * 1000 if histogram.count else 0.0
+            error_rate = histogram.errors / histogram.count * 100 if histogram.count else 0.0
+            label = f"{'!' if kind == 'command' else ''}{name}"[:23]
+            formatted += f"{label:<24}{histogram.count:>7}{error_rate:>7.1f}{avg:>9.1f}{histogram.quantile(0.95) * 1000:>9.0f}\n"
+        formatted += "```"
+
+        for prefix, collector in self.collectors.items():
+            try:
+                values = collector()
+            except Exception:
+                continue
+            shown = ', '.join(f"{key}={value:g}" if isinstance(value, float) else f"{key}={value}" for key, value in values.items())
+            formatted += f"\n**{prefix}:** {shown}"
+
+        return formatted
+
+    async def start_http_server(self):
+        """Serve /metrics on a local port; METRICS_PORT=0 disables it"""
+        port = int(os.getenv('METRICS_PORT', '9108'))
+        if not port or self._server is not None:
+            return
+        host = os.getenv('METRICS_HOST', '127.0.0.1')
+        self._server = await asyncio.start_server(self._handle_http, host, port)
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+
+    async def stop_http_server(self):
+        """Close the metrics endpoint"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def write_snapshot(self):
+        """Write the final metrics to METRICS_SNAPSHOT_FILE so the last scrape interval is not lost"""
+        path = os.getenv('METRICS_SNAPSHOT_FILE')
+        if not path:
+            return
+        with open(path, 'w') as f:
+            f.write(self.render_prometheus())
+        logger.info(f"Wrote metrics snapshot to {path}")
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.0 responder for metrics scrapes"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            path = request_line.split(b' ')[1] if request_line.count(b' ') >= 2 else b''
+            if path.split(b'?')[0] == b'/metrics':
+                status, body = b'200 OK', self.render_prometheus().encode()
+            else:
+                status, body = b'404 Not Found', b'not found\n'
+            writer.write(
+                b'HTTP/1.0 ' + status + b'\r\nContent-Type: text/plain; version=0.0.4\r\n'
+                b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+
+# Shared registry used by bot.py and the instrumented clients
+metrics = MetricsRegistry()
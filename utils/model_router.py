@@ -0,0 +1,154 @@
+"""
+Model Router Module
+Routes each AI question to a model tier and token budget by cheap complexity signals, with per-tier timeouts and a fallback model
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TIERS = ('light', 'standard', 'heavy')
+# Budget every question got before routing; token savings are reported against it
+BASELINE_MAX_TOKENS = 1000
+
+_DEFAULTS = {
+    'light': ('llama-3.1-8b-instant', 300, 10.0),
+    'standard': ('llama-3.1-8b-instant', 700, 20.0),
+    'heavy': ('llama-3.3-70b-versatile', 1000, 40.0),
+}
+
+_WORD = re.compile(r"[a-z0-9']+")
+# Troubleshooting and multi-step requests need the larger model and budget
+_COMPLEX = frozenset(
+    "error errors fail fails failed failing failure crash crashes crashing stuck broken troubleshoot troubleshooting "
+    "debug logs log exception panic timeout timeouts sync syncing fork restart restarts compare difference tradeoffs "
+    "explain configure configuration migrate upgrade".split()
+)
+_COMPLEX_PHRASES = ('not working', "doesn't work", "won't start", 'step by step', 'walk me through', 'how do i fix', 'what went wrong')
+# Lookups that a short answer covers
+_LOOKUP = frozenset("website link links url docs documentation address mint twitter discord telegram github when where who ticker".split())
+
+# (answer, usage) from one upstream call; failed calls carry the HTTP status as usage['error_status']
+Completion = Tuple[str, Dict[str, int]]
+# Timeouts, rate limiting and server errors may succeed on another model; bad keys and requests will not
+RETRYABLE_STATUSES = frozenset({408, 429})
+
+
+class Tier:
+    __slots__ = ('name', 'model', 'max_tokens', 'timeout')
+
+    def __init__(self, name: str):
+        model, max_tokens, timeout = _DEFAULTS[name]
+        prefix = f"AI_TIER_{name.upper()}"
+        self.name = name
+        self.model = os.getenv(f"{prefix}_MODEL", model)
+        self.max_tokens = int(os.getenv(f"{prefix}_MAX_TOKENS", str(max_tokens)))
+        self.timeout = float(os.getenv(f"{prefix}_TIMEOUT", str(timeout)))
+
+
+class ModelRouter:
+    def __init__(self, retrieval_score: Optional[Callable[[str], float]] = None):
+        self.enabled = os.getenv('AI_ROUTING', '1') != '0'
+        self.tiers = {name: Tier(name) for name in TIERS}
+        # Empty: each tier falls back to whichever default model it is not using
+        self.fallback_model = os.getenv('AI_FALLBACK_MODEL', '')
+        self.fallback_timeout = float(os.getenv('AI_FALLBACK_TIMEOUT', '20'))
+        # A question the local docs answer this well only needs the light tier to phrase it
+        self.confident_score = float(os.getenv('AI_ROUTING_CONFIDENT_SCORE', '8.0'))
+        self._retrieval_score = retrieval_score
+
+        self.stats: Dict[str, Dict[str, float]] = {
+            name: {'requests': 0, 'failures': 0, 'fallbacks': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'budget_saved': 0}
+            for name in TIERS
+        }
+
+    @property
+    def signature(self) -> str:
+        """Models in use, part of the prompt version so cached answers follow model changes"""
+        tiers = [self.tiers[name] for name in TIERS] if self.enabled else [self.tiers['standard']]
+        return ','.join([tier.model for tier in tiers] + [self.fallback_for(tier) or '' for tier in tiers])
+
+    def fallback_for(self, tier: Tier) -> Optional[str]:
+        """Secondary model for a tier, or None when it would be the tier's own model"""
+        model = self.fallback_model
+        if not model:
+            model = _DEFAULTS['light'][0] if tier.model != _DEFAULTS['light'][0] else _DEFAULTS['heavy'][0]
+        return model if model != tier.model else None
+
+    def classify(self, question: str) -> Tier:
+        """Pick a tier from length, keywords, pasted code or logs, and retrieval confidence"""
+        if not self.enabled:
+            return self.tiers['standard']
+        text = question.lower()
+        words = _WORD.findall(text)
+        complex_hits = sum(word in _COMPLEX for word in words) + sum(phrase in text for phrase in _COMPLEX_PHRASES)
+        pasted = '```' in question or question.count('\n') >= 3
+        sentences = len(re.findall(r"[.?!](?:\s|$)", question))
+
+        if pasted or len(words) > 60 or (complex_hits and (len(words) > 25 or sentences > 1)) or complex_hits >= 2:
+            return self.tiers['heavy']
+        if complex_hits or len(words) > 20:
+            return self.tiers['standard']
+        if any(word in _LOOKUP for word in words) and len(words) <= 12:
+            return self.tiers['light']
+        if self._retrieval_score is not None and len(words) <= 15:
+            try:
+                if self._retrieval_score(question) >= self.confident_score:
+                    return self.tiers['light']
+            except Exception as e:
+                logger.debug(f"Retrieval score unavailable for routing: {e}")
+        return self.tiers['standard']
+
+    async def complete(self, question: str, call: Callable[[str, int], Awaitable[Completion]]) -> Tuple[str, Dict[str, int], str]:
+        """Answer with the question's tier, retrying once on the fallback model; returns (answer, usage, tier)"""
+        tier = self.classify(question)
+        stats = self.stats[tier.name]
+        stats['requests'] += 1
+        stats['budget_saved'] += BASELINE_MAX_TOKENS - tier.max_tokens
+
+        answer, usage = await self._attempt(f"groq.{tier.name}", call, tier.model, tier.max_tokens, tier.timeout)
+        if answer.startswith('❌'):
+            stats['failures'] += 1
+            fallback = self.fallback_for(tier)
+            if fallback is not None and self._retryable(usage):
+                logger.warning(f"{tier.name} tier ({tier.model}) failed, retrying on {fallback}: {answer[:120]}")
+                stats['fallbacks'] += 1
+                answer, usage = await self._attempt('groq.fallback', call, fallback, tier.max_tokens, self.fallback_timeout)
+
+        stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+        stats['completion_tokens'] += usage.get('completion_tokens', 0)
+        return answer, usage, tier.name
+
+    async def _attempt(self, name: str, call, model: str, max_tokens: int, timeout: float) -> Completion:
+        """One upstream call under a deadline, timed into the per-tier latency histogram"""
+        started = time.perf_counter()
+        try:
+            answer, usage = await asyncio.wait_for(call(model, max_tokens), timeout)
+        except asyncio.TimeoutError:
+            answer, usage = f"❌ AI service timed out after {timeout:g}s", {'error_status': 408}
+        metrics.observe('upstream', name, time.perf_counter() - started, answer.startswith('❌'))
+        return answer, usage
+
+    @staticmethod
+    def _retryable(usage: Dict[str, int]) -> bool:
+        """Whether a failed call is transient: a timeout, rate limiting or a server error"""
+        status = usage.get('error_status', 0)
+        return status in RETRYABLE_STATUSES or status >= 500
+
+    def report(self) -> Dict[str, float]:
+        """Flat per-tier counters for the metrics collector"""
+        flat: Dict[str, float] = {}
+        for name, stats in self.stats.items():
+            for key, value in stats.items():
+                flat[f"{name}_{key}"] = value
+            if stats['requests']:
+                flat[f"{name}_avg_completion_tokens"] = round(stats['completion_tokens'] / stats['requests'], 1)
+        return flat
+
@@ -4,10 +4,17 @@ Tests required ports for pNode and vNode operation
 """
 
 import asyncio
-import subprocess
-import re
+import os
+import time
+from array import array
 from typing import Dict, List, Tuple
 import logging
+import aiohttp
+from utils.metrics import metrics
+from utils.http_client import get_session
+from utils.prometheus_parser import PrometheusStreamParser
+from utils.resolver import DNSResolver, is_hostname, parse_public_address
+from config.project_info import VALIDATOR_METRIC_SERIES
 
 logger = logging.getLogger(__name__)
 
@@ -24,24 +31,32 @@ class PortChecker:
             'tcp_8001': 'TCP 8001 - Validator P2P port',
             'tcp_8002': 'TCP 8002 - Validator metrics port'
         }
+        
+        self.resolver = DNSResolver()
     
+    @metrics.timed('port_checker.check_port', is_error=lambda result: result[1].startswith('❌ Error'))
     async def check_port(self, ip_address: str, port: int, protocol: str = 'tcp') -> Tuple[bool, str]:
         """Check if a specific port is open on the given IP address"""
         try:
             # Use netcat to test port connectivity
             if protocol.lower() == 'udp':
-                cmd = f"timeout 10 nc -zu {ip_address} {port}"
+                cmd = ["timeout", "10", "nc", "-zu", ip_address, str(port)]
             else:
-                cmd = f"timeout 10 nc -zv {ip_address} {port}"
+                cmd = ["timeout", "10", "nc", "-zv", ip_address, str(port)]
             
-            # Run the command
-            process = await asyncio.create_subprocess_shell(
-                cmd,
+            # Run the command without a shell, since targets may now come from DNS
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await process.communicate()
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                # Don't leave an orphaned nc behind when shutdown cancels the probe
+                process.kill()
+                raise
             
             if process.returncode == 0:
                 return True, f"✅ {protocol.upper()} {port} is OPEN on {ip_address}"
@@ -82,6 +97,122 @@ class PortChecker:
         
         return results
     
+    @metrics.timed('port_checker.measure_latency')
+    async def measure_latency(self, ip_address: str, port: int, samples: int = 5, timeout: float = 3.0) -> Tuple[array, int]:
+        """Take timed TCP connects to a port, returning RTTs in ms and the number of lost attempts"""
+        rtts = array('d')
+        lost = 0
+        
+        for _ in range(samples):
+            start = time.perf_counter()
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(ip_address, port), timeout)
+            except (OSError, asyncio.TimeoutError):
+                lost += 1
+                continue
+            rtts.append((time.perf_counter() - start) * 1000.0)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        
+        return rtts, lost
+    
+    def summarize_latency(self, rtts: array, lost: int) -> Dict[str, float]:
+        """Reduce latency samples to min, p50, p95 and loss percentage"""
+        total = len(rtts) + lost
+        summary = {'loss': (lost / total * 100.0) if total else 0.0}
+        if not rtts:
+            return summary
+        
+        ordered = sorted(rtts)
+        summary['min'] = ordered[0]
+        summary['p50'] = self._percentile(ordered, 50)
+        summary['p95'] = self._percentile(ordered, 95)
+        return summary
+    
+    @staticmethod
+    def _percentile(ordered: List[float], pct: float) -> float:
+        """Nearest-rank percentile over an already sorted sequence"""
+        rank = max(1, -(-len(ordered) * pct // 100))
+        return ordered[int(rank) - 1]
+    
+    async def check_vnode_latency(self, ip_address: str, samples: int = 5) -> Dict[str, Dict[str, float]]:
+        """Measure connect latency for all TCP vNode ports"""
+        ports = {'tcp_8000': 8000, 'tcp_8001': 8001, 'tcp_8002': 8002}
+        measurements = await asyncio.gather(
+            *(self.measure_latency(ip_address, port, samples) for port in ports.values())
+        )
+        
+        return {
+            port_name: self.summarize_latency(rtts, lost)
+            for port_name, (rtts, lost) in zip(ports, measurements)
+        }
+    
+    def format_latency_results(self, ip_address: str, results: Dict[str, Dict[str, float]], node_type: str = "vNode") -> str:
+        """Format latency results for Discord message"""
+        formatted = f"**Port Latency for {ip_address} ({node_type})**\n\n"
+        port_labels = {**self.pnode_ports, **self.vnode_ports}
+        
+        for port_name, stats in results.items():
+            label = port_labels.get(port_name, port_name)
+            if 'min' not in stats:
+                formatted += f"❌ {label}: unreachable (loss {stats['loss']:.0f}%)\n"
+                continue
+            formatted += (
+                f"⏱️ {label}: min {stats['min']:.1f} ms · p50 {stats['p50']:.1f} ms · "
+                f"p95 {stats['p95']:.1f} ms · loss {stats['loss']:.0f}%\n"
+            )
+        
+        return formatted.strip()
+    
+    @metrics.timed('port_checker.vnode_health')
+    async def check_vnode_health(self, ip_address: str) -> Dict[str, object]:
+        """Fetch the validator metrics endpoint on TCP 8002 and extract whitelisted series"""
+        host = f"[{ip_address}]" if ':' in ip_address else ip_address
+        url = os.getenv('VALIDATOR_METRICS_URL', 'http://{host}:8002/metrics').format(host=host)
+        max_bytes = int(os.getenv('VALIDATOR_METRICS_MAX_BYTES', str(8 * 1024 * 1024)))
+        timeout = aiohttp.ClientTimeout(total=float(os.getenv('VALIDATOR_METRICS_TIMEOUT', '5')))
+        parser = PrometheusStreamParser(VALIDATOR_METRIC_SERIES)
+        truncated = False
+        
+        session = await get_session()
+        async with session.get(url, timeout=timeout) as response:
+            if response.status != 200:
+                return {'error': f"HTTP {response.status}", 'samples': {}}
+            
+            # Stream the body so large payloads are never held in memory at once
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                if parser.bytes_seen + len(chunk) > max_bytes:
+                    parser.feed(chunk[:max_bytes - parser.bytes_seen])
+                    truncated = True
+                    break
+                parser.feed(chunk)
+        
+        return {'samples': parser.close(), 'bytes': parser.bytes_seen, 'truncated': truncated}
+    
+    def format_health_results(self, ip_address: str, health: Dict[str, object]) -> str:
+        """Format validator health metrics for Discord message"""
+        formatted = f"**Validator Health for {ip_address} (vNode)**\n\n"
+        
+        if 'error' in health:
+            return formatted + f"❌ Metrics endpoint returned {health['error']}"
+        
+        samples = health['samples']
+        for series, label in VALIDATOR_METRIC_SERIES.items():
+            values = [value for key, value in samples.items() if key == series or key.startswith(series + '{')]
+            if values:
+                shown = ', '.join(f"{value:g}" for value in values)
+                formatted += f"{label}: {shown}\n"
+            else:
+                formatted += f"{label}: N/A\n"
+        
+        if health.get('truncated'):
+            formatted += "\n⚠️ Metrics payload exceeded the size limit; results may be partial."
+        
+        return formatted.strip()
+    
     def format_port_results(self, ip_address: str, results: Dict[str, Tuple[bool, str]], node_type: str = "pNode") -> str:
         """Format port check results for Discord message"""
         formatted = f"**Port Check Results for {ip_address} ({node_type})**\n\n"
@@ -105,10 +236,20 @@ class PortChecker:
         return formatted
     
     def validate_ip_address(self, ip_address: str) -> bool:
-        """Basic IP address validation"""
-        # Simple regex for IP validation
-        ip_pattern = r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
-        return bool(re.match(ip_pattern, ip_address))
+        """Check for a public IPv4 or IPv6 address, rejecting private and reserved ranges"""
+        return parse_public_address(ip_address) is not None
+    
+    def validate_target(self, target: str) -> bool:
+        """Check for a public IP address or a well-formed hostname"""
+        return self.validate_ip_address(target) or is_hostname(target)
+    
+    async def resolve_target(self, target: str) -> str:
+        """Resolve an IP address or hostname to the public address to probe"""
+        return await self.resolver.resolve(target)
+    
+    def describe_target(self, target: str, address: str) -> str:
+        """Label a probe target, showing the resolved address for hostnames"""
+        return target if target == address else f"{target} ({address})"
     
     def get_pnode_requirements(self) -> str:
         """Get pNode hardware and software requirements"""
@@ -0,0 +1,297 @@
+"""
+Price Alerts Module
+Persistent price threshold subscriptions, evaluated by bisecting sorted thresholds on each price tick
+"""
+
+import asyncio
+import bisect
+import os
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SYMBOLS = ('XAND',)
+DIRECTIONS = ('above', 'below')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    guild_id INTEGER,
+    symbol TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+class PriceAlert:
+    __slots__ = ('id', 'user_id', 'channel_id', 'guild_id', 'symbol', 'direction', 'threshold')
+
+    def __init__(self, alert_id: int, user_id: int, channel_id: int, guild_id: Optional[int], symbol: str, direction: str, threshold: float):
+        self.id = alert_id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.symbol = symbol
+        self.direction = direction
+        self.threshold = threshold
+
+
+class AlertBook:
+    """In-memory alerts with thresholds kept sorted per direction"""
+
+    def __init__(self):
+        self.alerts: Dict[int, PriceAlert] = {}
+        # Parallel lists sorted by (threshold, id)
+        self._above: Tuple[List[float], List[int]] = ([], [])
+        self._below: Tuple[List[float], List[int]] = ([], [])
+        self._per_user: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def _side(self, direction: str) -> Tuple[List[float], List[int]]:
+        return self._above if direction == 'above' else self._below
+
+    def count_for(self, user_id: int) -> int:
+        """Number of active alerts a user has"""
+        return self._per_user[user_id]
+
+    def for_user(self, user_id: int) -> List[PriceAlert]:
+        """A user's alerts, oldest first"""
+        return sorted((alert for alert in self.alerts.values() if alert.user_id == user_id), key=lambda alert: alert.id)
+
+    def add(self, alert: PriceAlert):
+        """Insert an alert at its sorted position"""
+        thresholds, ids = self._side(alert.direction)
+        position = bisect.bisect_right(thresholds, alert.threshold)
+        thresholds.insert(position, alert.threshold)
+        ids.insert(position, alert.id)
+        self.alerts[alert.id] = alert
+        self._per_user[alert.user_id] += 1
+
+    def load(self, alerts: List[PriceAlert]):
+        """Bulk insert with one sort per direction instead of an insort per alert"""
+        for alert in alerts:
+            self.alerts[alert.id] = alert
+            self._per_user[alert.user_id] += 1
+        for direction in DIRECTIONS:
+            thresholds, ids = self._side(direction)
+            merged = sorted(
+                list(zip(thresholds, ids))
+                + [(alert.threshold, alert.id) for alert in alerts if alert.direction == direction]
+            )
+            thresholds[:] = [threshold for threshold, _ in merged]
+            ids[:] = [alert_id for _, alert_id in merged]
+
+    def remove(self, alert_id: int) -> Optional[PriceAlert]:
+        """Delete one alert, locating it by bisecting on its threshold"""
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+        thresholds, ids = self._side(alert.direction)
+        start = bisect.bisect_left(thresholds, alert.threshold)
+        end = bisect.bisect_right(thresholds, alert.threshold, start)
+        position = ids.index(alert_id, start, end)
+        del thresholds[position]
+        del ids[position]
+        self._per_user[alert.user_id] -= 1
+        return alert
+
+    def crossed(self, price: float) -> List[PriceAlert]:
+        """Remove and return every alert the price satisfies; two bisects, no full scan"""
+        above_thresholds, above_ids = self._above
+        end = bisect.bisect_right(above_thresholds, price)
+        fired = above_ids[:end]
+        del above_thresholds[:end], above_ids[:end]
+
+        below_thresholds, below_ids = self._below
+        start = bisect.bisect_left(below_thresholds, price)
+        fired += below_ids[start:]
+        del below_thresholds[start:], below_ids[start:]
+
+        # map() keeps the per-alert bookkeeping in C; this is the only O(fired) part of a tick
+        alerts = list(map(self.alerts.pop, fired))
+        self._per_user.subtract(map(attrgetter('user_id'), alerts))
+        return alerts
+
+
+def format_notifications(price: float, alerts: List[PriceAlert], limit: int = 1900) -> Dict[int, List[str]]:
+    """Group fired alerts by channel into as few messages as fit Discord's length limit"""
+    by_channel: Dict[int, List[PriceAlert]] = {}
+    for alert in alerts:
+        by_channel.setdefault(alert.channel_id, []).append(alert)
+
+    messages: Dict[int, List[str]] = {}
+    for channel_id, channel_alerts in by_channel.items():
+        header = f"🔔 **XAND price alert** - now ${price:,.4f}"
+        current = header
+        for alert in channel_alerts:
+            line = f"\n• <@{alert.user_id}> {alert.direction} ${alert.threshold:,.4f} (#{alert.id})"
+            if len(current) + len(line) > limit:
+                messages.setdefault(channel_id, []).append(current)
+                current = header + " (continued)"
+            current += line
+        messages.setdefault(channel_id, []).append(current)
+    return messages
+
+
+class PriceAlertMonitor:
+    def __init__(self, send: Callable[[int, str], Awaitable[None]], fetch_price: Callable[[], Awaitable[Optional[float]]],
+                 owns: Optional[Callable[[Optional[int]], bool]] = None):
+        self.path = os.getenv('ALERTS_DB', 'alerts.db')
+        self.poll_interval = float(os.getenv('ALERT_POLL_INTERVAL', '60'))
+        self.max_per_user = int(os.getenv('ALERT_MAX_PER_USER', '10'))
+        self.send_concurrency = int(os.getenv('ALERT_SEND_CONCURRENCY', '5'))
+
+        self.book = AlertBook()
+        self.last_price: Optional[float] = None
+        self._send = send
+        self._fetch_price = fetch_price
+        # In a sharded cluster every process shares the database but only fires alerts for its own guilds
+        self._owns = owns or (lambda guild_id: True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='price-alerts')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ticks = set()
+        self.metrics = {'active': 0, 'fired': 0, 'messages': 0, 'send_failures': 0, 'last_tick_ms': 0.0}
+
+    async def start(self):
+        """Load persisted alerts and start polling the price"""
+        if self._task is not None:
+            return
+        rows = await self._run(self._load_sync)
+        self.book.load([PriceAlert(*row) for row in rows if self._owns(row[3])])
+        self.metrics['active'] = len(self.book)
+        logger.info(f"Loaded {len(self.book)} price alert(s)")
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        """Stop polling, finish in-flight ticks and close the database"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._ticks, return_exceptions=True)
+        await self._run(self._close_sync)
+
+    async def add(self, user_id: int, channel_id: int, guild_id: Optional[int], symbol: str, direction: str, threshold: float) -> PriceAlert:
+        """Persist and activate an alert; raises ValueError for invalid or excess alerts"""
+        if symbol not in SYMBOLS:
+            raise ValueError(f"Unknown symbol {symbol}. Supported: {', '.join(SYMBOLS)}")
+        if direction not in DIRECTIONS:
+            raise ValueError("Direction must be `above` or `below`")
+        if not threshold > 0:
+            raise ValueError("Price must be a positive number")
+        if self.book.count_for(user_id) >= self.max_per_user:
+            raise ValueError(f"You already have {self.max_per_user} alerts. Remove one with `!alert remove <id>`")
+
+        alert_id = await self._run(self._insert_sync, user_id, channel_id, guild_id, symbol, direction, threshold)
+        alert = PriceAlert(alert_id, user_id, channel_id, guild_id, symbol, direction, threshold)
+        self.book.add(alert)
+        self.metrics['active'] = len(self.book)
+        return alert
+
+    async def remove(self, user_id: int, alert_id: int) -> bool:
+        """Cancel one of the user's alerts"""
+        alert = self.book.alerts.get(alert_id)
+        if alert is None or alert.user_id != user_id:
+            return False
+        self.book.remove(alert_id)
+        self.metrics['active'] = len(self.book)
+        await self._run(self._delete_sync, [alert_id])
+        return True
+
+    def observe(self, price: float):
+        """Evaluate a price fetched elsewhere (e.g. by !price) without blocking the caller"""
+        task = asyncio.create_task(self.on_price(price))
+        self._ticks.add(task)
+        task.add_done_callback(self._ticks.discard)
+
+    async def on_price(self, price: float):
+        """Fire every crossed alert and deliver one batched message per channel"""
+        self.last_price = price
+        started = time.perf_counter()
+        fired = self.book.crossed(price)
+        self.metrics['last_tick_ms'] = (time.perf_counter() - started) * 1000
+        if not fired:
+            return
+
+        self.metrics['fired'] += len(fired)
+        self.metrics['active'] = len(self.book)
+        await self._run(self._delete_sync, [alert.id for alert in fired])
+
+        semaphore = asyncio.Semaphore(self.send_concurrency)
+
+        async def deliver(channel_id: int, content: str):
+            async with semaphore:
+                try:
+                    await self._send(channel_id, content)
+                    self.metrics['messages'] += 1
+                except Exception as e:
+                    self.metrics['send_failures'] += 1
+                    logger.warning(f"Could not deliver price alerts to channel {channel_id}: {e}")
+
+        messages = format_notifications(price, fired)
+        await asyncio.gather(*(
+            deliver(channel_id, content) for channel_id, contents in messages.items() for content in contents
+        ))
+        logger.info(f"Fired {len(fired)} price alert(s) at ${price} in {len(messages)} channel(s)")
+
+    async def _poll(self):
+        """Fetch the price periodically while any alert is active"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not len(self.book):
+                continue
+            try:
+                price = await self._fetch_price()
+            except Exception as e:
+                logger.warning(f"Price poll failed: {e}")
+                continue
+            if price is not None:
+                await self.on_price(price)
+
+    async def _run(self, fn, *args):
+        """Run a database call on the alert store's own thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _load_sync(self) -> List[tuple]:
+        return self._db().execute(
+            'SELECT id, user_id, channel_id, guild_id, symbol, direction, threshold FROM alerts ORDER BY id'
+        ).fetchall()
+
+    def _insert_sync(self, user_id: int, channel_id: int, guild_id: Optional[int], symbol: str, direction: str, threshold: float) -> int:
+        db = self._db()
+        with db:
+            cursor = db.execute(
+                'INSERT INTO alerts (user_id, channel_id, guild_id, symbol, direction, threshold, created) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (user_id, channel_id, guild_id, symbol, direction, threshold, time.time()),
+            )
+        return cursor.lastrowid
+
+    def _delete_sync(self, alert_ids: List[int]):
+        db = self._db()
+        with db:
+            db.executemany('DELETE FROM alerts WHERE id = ?', [(alert_id,) for alert_id in alert_ids])
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
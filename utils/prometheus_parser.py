@@ -0,0 +1,95 @@
+"""
+Prometheus Text Parser
+Incremental parser that extracts whitelisted series from the Prometheus text format
+"""
+
+from typing import Dict, Iterable, Optional
+
+
+class PrometheusStreamParser:
+    def __init__(self, series: Iterable[str], max_line: int = 64 * 1024):
+        # Whitelisted names are bucketed by first byte so most lines are
+        # rejected with one dict lookup and never decoded
+        self._names: Dict[int, tuple] = {}
+        for name in series:
+            encoded = name.encode()
+            self._names[encoded[0]] = self._names.get(encoded[0], ()) + (encoded,)
+        self.max_line = max_line
+        self.samples: Dict[str, float] = {}
+        self.bytes_seen = 0
+        self._tail = b''
+        self._skipping = False
+
+    def feed(self, chunk: bytes):
+        """Consume a chunk of the response body"""
+        self.bytes_seen += len(chunk)
+        data = self._tail + chunk if self._tail else chunk
+        start = 0
+
+        while True:
+            end = data.find(b'\n', start)
+            if end == -1:
+                break
+            if self._skipping:
+                # Finish discarding an over-long line
+                self._skipping = False
+            else:
+                self._parse_line(data, start, end)
+            start = end + 1
+
+        self._tail = data[start:]
+        if len(self._tail) > self.max_line:
+            self._tail = b''
+            self._skipping = True
+
+    def close(self) -> Dict[str, float]:
+        """Flush any trailing line and return the collected samples"""
+        if self._tail and not self._skipping:
+            self._parse_line(self._tail, 0, len(self._tail))
+        self._tail = b''
+        return self.samples
+
+    def _parse_line(self, data: bytes, start: int, end: int):
+        """Record a single sample line if its metric name is whitelisted"""
+        if start >= end:
+            return
+        candidates = self._names.get(data[start])
+        if candidates is None:
+            return
+
+        name = self._match(data, start, end, candidates)
+        if name is None:
+            return
+
+        cursor = start + len(name)
+        if data[cursor] == 0x7B:  # '{'
+            close = data.find(b'}', cursor, end)
+            if close == -1:
+                return
+            key = data[start:close + 1].decode('utf-8', 'replace')
+            cursor = close + 1
+        else:
+            key = name.decode()
+
+        value_end = data.find(b' ', cursor + 1, end)
+        raw = data[cursor:value_end if value_end != -1 else end].strip()
+        try:
+            self.samples[key] = float(raw)
+        except ValueError:
+            return
+
+    @staticmethod
+    def _match(data: bytes, start: int, end: int, candidates: tuple) -> Optional[bytes]:
+        """Return the whitelisted name that starts this line, if any"""
+        for name in candidates:
+            stop = start + len(name)
+            if stop < end and data.startswith(name, start) and data[stop] in (0x20, 0x7B, 0x09):
+                return name
+        return None
+
+
+def parse_metrics(body: bytes, series: Iterable[str]) -> Dict[str, float]:
+    """Parse a complete metrics payload in one call"""
+    parser = PrometheusStreamParser(series)
+    parser.feed(body)
+    return parser.close()
@@ -0,0 +1,291 @@
+"""
+Query Log Module
+Append-only log of AI questions written by a buffered background thread, with offline analytics and cache pre-warming
+
+Usage: python -m utils.query_log [--top 20] [--days 7] [paths...]   # report on the query log
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Answers served without an upstream call
+HIT_SOURCES = frozenset({'faq', 'store', 'semantic'})
+
+
+class QueryLog:
+    def __init__(self):
+        self.path = os.getenv('QUERY_LOG_PATH', 'queries.log')
+        self.max_bytes = int(os.getenv('QUERY_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+        self.backups = int(os.getenv('QUERY_LOG_BACKUPS', '5'))
+        self.flush_interval = float(os.getenv('QUERY_LOG_FLUSH_INTERVAL', '2'))
+        self.batch_size = int(os.getenv('QUERY_LOG_BATCH', '500'))
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.metrics = {'recorded': 0, 'written': 0, 'rotations': 0, 'write_errors': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def start(self):
+        """Start the writer thread"""
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name='query-log', daemon=True)
+            self._thread.start()
+
+    async def close(self):
+        """Write out buffered records and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+            self._thread = None
+
+    def record(self, question: str, trigger: str, source: str, latency: Optional[float] = None,
+               prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None, tier: Optional[str] = None):
+        """Queue one query; never blocks the event loop"""
+        if self._thread is None:
+            return
+        entry = {'t': round(time.time(), 3), 'q': question, 'tr': trigger, 'src': source, 'hit': source in HIT_SOURCES}
+        if latency is not None:
+            entry['ms'] = round(latency * 1000, 1)
+        if prompt_tokens is not None:
+            entry['pt'] = prompt_tokens
+        if completion_tokens is not None:
+            entry['ct'] = completion_tokens
+        if tier is not None:
+            entry['tier'] = tier
+        self._queue.put(entry)
+        self.metrics['recorded'] += 1
+
+    def _writer(self):
+        """Batch queued records into one write per flush interval or batch"""
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[dict]):
+        data = ''.join(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n' for entry in batch).encode()
+        try:
+            if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self.metrics['written'] += len(batch)
+        except OSError as e:
+            self.metrics['write_errors'] += 1
+            logger.warning(f"Could not write {len(batch)} query log record(s): {e}")
+
+    def _rotate(self):
+        """Shift queries.log -> .1 -> .2 ..., dropping the oldest backup"""
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.metrics['rotations'] += 1
+
+
+def log_files(path: str) -> List[str]:
+    """The log, its rotated backups and the per-process logs of a cluster"""
+    stem, ext = os.path.splitext(path)
+    # queries.0.log in a cluster also finds queries.1.log and friends
+    stem = re.sub(r'\.\d+$', '', stem)
+    return sorted(glob.glob(f"{stem}*{ext}*"))
+
+
+def read_entries(paths: List[str], since: float = 0.0) -> Iterator[dict]:
+    """Parse log records newer than `since`, skipping damaged lines"""
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('t', 0) >= since:
+                        yield entry
+        except OSError as e:
+            logger.warning(f"Skipping {path}: {e}")
+
+
+def top_questions(entries: Iterator[dict], limit: int) -> List[Tuple[str, int]]:
+    """Most asked questions from real users (pre-warm runs are not counted)"""
+    counts = Counter(entry['q'] for entry in entries if entry.get('tr') != 'prewarm' and entry.get('q'))
+    return counts.most_common(limit)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def build_report(entries: Iterator[dict], top: int = 20) -> str:
+    """Top questions, hit rates and upstream latency and token distributions"""
+    total = hits = 0
+    by_source: Counter = Counter()
+    by_trigger: Counter = Counter()
+    questions: Counter = Counter()
+    question_hits: Counter = Counter()
+    latencies: List[float] = []
+    prompt_tokens: List[int] = []
+    completion_tokens: List[int] = []
+    # tier -> latencies and completion tokens of its Groq calls
+    tiers: Dict[str, Tuple[List[float], List[int]]] = {}
+    for entry in entries:
+        if entry.get('tr') == 'prewarm':
+            continue
+        total += 1
+        hits += entry.get('hit', False)
+        by_source[entry.get('src', '?')] += 1
+        by_trigger[entry.get('tr', '?')] += 1
+        questions[entry.get('q', '')] += 1
+        question_hits[entry.get('q', '')] += entry.get('hit', False)
+        if 'ms' in entry:
+            latencies.append(entry['ms'])
+        if 'pt' in entry:
+            prompt_tokens.append(entry['pt'])
+        if 'ct' in entry:
+            completion_tokens.append(entry['ct'])
+        if 'tier' in entry and 'ms' in entry:
+            tier_latencies, tier_tokens = tiers.setdefault(entry['tier'], ([], []))
+            tier_latencies.append(entry['ms'])
+            tier_tokens.append(entry.get('ct', 0))
+
+    if not total:
+        return "No queries logged."
+
+    lines = [f"Queries: {total:,}  hit rate: {hits / total:.1%}"]
+    lines.append("By source:  " + "  ".join(f"{source} {count:,} ({count / total:.0%})" for source, count in by_source.most_common()))
+    lines.append("By trigger: " + "  ".join(f"{trigger} {count:,}" for trigger, count in by_trigger.most_common()))
+    if latencies:
+        latencies.sort()
+        lines.append(
+            f"Upstream latency ms: p50 {_percentile(latencies, 0.5):.0f}  p90 {_percentile(latencies, 0.9):.0f}  "
+            f"p99 {_percentile(latencies, 0.99):.0f}  max {latencies[-1]:.0f}  (n={len(latencies):,})"
+        )
+    if prompt_tokens or completion_tokens:
+        lines.append(
+            f"Tokens: prompt {sum(prompt_tokens):,} (avg {sum(prompt_tokens) / max(len(prompt_tokens), 1):.0f})  "
+            f"completion {sum(completion_tokens):,} (avg {sum(completion_tokens) / max(len(completion_tokens), 1):.0f})"
+        )
+    for tier, (tier_latencies, tier_tokens) in sorted(tiers.items()):
+        tier_latencies.sort()
+        lines.append(
+            f"Tier {tier}: {len(tier_latencies):,} calls  p50 {_percentile(tier_latencies, 0.5):.0f} ms  "
+            f"p99 {_percentile(tier_latencies, 0.99):.0f} ms  avg completion {sum(tier_tokens) / len(tier_tokens):.0f} tokens"
+        )
+    lines.append(f"\nTop {top} questions (count, hit rate):")
+    for question, count in questions.most_common(top):
+        lines.append(f"{count:>7,}  {question_hits[question] / count:>5.0%}  {question}")
+    return '\n'.join(lines)
+
+
+class Prewarmer:
+    """Answers the most asked questions during quiet hours so they are cache hits at peak"""
+
+    def __init__(self, query_log: QueryLog, answer: Callable[[str], Awaitable[str]], is_cached: Callable[[str], Awaitable[bool]]):
+        self.query_log = query_log
+        self.top = int(os.getenv('QUERY_PREWARM_TOP', '50'))
+        self.window_days = float(os.getenv('QUERY_PREWARM_DAYS', '7'))
+        self.delay = float(os.getenv('QUERY_PREWARM_DELAY', '2'))
+        # Local hours, start inclusive and end exclusive, e.g. 3-6; wraps past midnight for 22-4
+        start, _, end = os.getenv('QUERY_PREWARM_HOURS', '3-6').partition('-')
+        self.hours = (int(start), int(end or start))
+
+        self._answer = answer
+        self._is_cached = is_cached
+        self._task: Optional[asyncio.Task] = None
+        self._last_run_day: Optional[str] = None
+        self.metrics = {'runs': 0, 'warmed': 0, 'already_cached': 0, 'not_stored': 0}
+
+    def in_quiet_hours(self, hour: int) -> bool:
+        start, end = self.hours
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def start(self):
+        if self.top > 0 and self.query_log.enabled and self._task is None:
+            self._task = asyncio.create_task(self._schedule())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _schedule(self):
+        """Run at most once a day, inside the quiet hours"""
+        while True:
+            now = time.localtime()
+            today = time.strftime('%Y-%m-%d', now)
+            if self.in_quiet_hours(now.tm_hour) and self._last_run_day != today:
+                self._last_run_day = today
+                try:
+                    await self.run()
+                except Exception as e:
+                    logger.error(f"Query pre-warm failed: {e}")
+            await asyncio.sleep(600)
+
+    async def run(self) -> int:
+        """Answer the top questions that are not cached yet, one at a time, returning how many were stored"""
+        since = time.time() - self.window_days * 86400
+        paths = log_files(self.query_log.path)
+        questions = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: top_questions(read_entries(paths, since), self.top)
+        )
+        self.metrics['runs'] += 1
+        warmed = 0
+        for question, _ in questions:
+            if await self._is_cached(question):
+                self.metrics['already_cached'] += 1
+                continue
+            await self._answer(question)
+            if await self._is_cached(question):
+                warmed += 1
+                self.metrics['warmed'] += 1
+            else:
+                # Served by the semantic cache or the local-docs fallback, so nothing was stored for peak time
+                self.metrics['not_stored'] += 1
+            # Spread upstream calls out instead of bursting into the rate limit
+            await asyncio.sleep(self.delay)
+        logger.info(f"Pre-warmed {warmed} of the top {len(questions)} questions")
+        return warmed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report on the AI query log")
+    parser.add_argument('paths', nargs='*', help="Log files (default: QUERY_LOG_PATH, its backups and cluster logs)")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--days', type=float, default=0, help="Only include the last N days")
+    args = parser.parse_args()
+
+    paths = args.paths or log_files(os.getenv('QUERY_LOG_PATH', 'queries.log'))
+    since = time.time() - args.days * 86400 if args.days else 0.0
+    print(build_report(read_entries(paths, since), args.top))
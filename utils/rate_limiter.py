@@ -0,0 +1,184 @@
+"""
+Rate Limiting Utility for Port Probes
+Global probe budget plus per-user and per-guild token buckets
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+from utils.shared_store import get_shared_store
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeRejected(Exception):
+    """Raised when a probe cannot be admitted"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """Add tokens accrued since the last update"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, now: Optional[float] = None) -> bool:
+        """Take one token if available"""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def refund(self):
+        """Give back a token taken for an attempt that was turned away later"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+    
+    def retry_after(self) -> float:
+        """Seconds until the next token is available"""
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else float('inf')
+
+    def is_idle(self, now: float) -> bool:
+        """Whether the bucket would be full again, so it can be dropped"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class ProbeBudget:
+    def __init__(self):
+        self.max_concurrent = int(os.getenv('PROBE_MAX_CONCURRENT', '4'))
+        self.max_queue = int(os.getenv('PROBE_MAX_QUEUE', '10'))
+        self.user_rate = float(os.getenv('PROBE_USER_RATE', '0.1'))
+        self.user_burst = float(os.getenv('PROBE_USER_BURST', '3'))
+        self.guild_rate = float(os.getenv('PROBE_GUILD_RATE', '0.5'))
+        self.guild_burst = float(os.getenv('PROBE_GUILD_BURST', '10'))
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._waiting = 0
+        self._active = set()
+        self._user_buckets: Dict[int, TokenBucket] = {}
+        self._guild_buckets: Dict[int, TokenBucket] = {}
+        # Clustered processes share user/guild buckets; the concurrency budget stays per process
+        self._store = get_shared_store()
+
+        self.metrics = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected_user': 0,
+            'rejected_guild': 0,
+            'rejected_queue_full': 0,
+        }
+
+    def _bucket(self, buckets: Dict[int, TokenBucket], key: int, rate: float, burst: float) -> TokenBucket:
+        """Get or create the bucket for a key, pruning idle buckets as the map grows"""
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= 1024:
+                now = time.monotonic()
+                for idle_key in [k for k, b in buckets.items() if b.is_idle(now)]:
+                    del buckets[idle_key]
+            bucket = buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    async def _take(self, scope: str, key: int, buckets: Dict[int, TokenBucket], rate: float, burst: float) -> Tuple[bool, float]:
+        """Consume a token from the local bucket, or from the shared store when clustered"""
+        if self._store is not None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._store.take_token, f"probe:{scope}:{key}", rate, burst)
+        bucket = self._bucket(buckets, key, rate, burst)
+        allowed = bucket.consume()
+        return allowed, 0.0 if allowed else bucket.retry_after()
+
+    async def _give_back(self, scope: str, key: int, buckets: Dict[int, TokenBucket], burst: float):
+        """Return a token to the local bucket, or to the shared store when clustered"""
+        if self._store is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._store.refund_token, f"probe:{scope}:{key}", burst)
+        elif key in buckets:
+            buckets[key].refund()
+
+    async def check_rate(self, user_id: Optional[int], guild_id: Optional[int]):
+        """Charge the user and guild buckets, raising ProbeRejected when either is empty"""
+        if user_id is not None:
+            allowed, retry_after = await self._take('user', user_id, self._user_buckets, self.user_rate, self.user_burst)
+            if not allowed:
+                self.metrics['rejected_user'] += 1
+                raise ProbeRejected(f"You're checking ports too often. Try again in {retry_after:.0f}s.")
+
+        if guild_id is not None:
+            allowed, retry_after = await self._take('guild', guild_id, self._guild_buckets, self.guild_rate, self.guild_burst)
+            if not allowed:
+                self.metrics['rejected_guild'] += 1
+                # The probe never ran, so it should not also count against the user
+                await self.refund(user_id, None)
+                raise ProbeRejected(f"This server is running too many port checks. Try again in {retry_after:.0f}s.")
+
+    async def refund(self, user_id: Optional[int], guild_id: Optional[int]):
+        """Give back the tokens charged by check_rate for a probe that was rejected later"""
+        if user_id is not None:
+            await self._give_back('user', user_id, self._user_buckets, self.user_burst)
+        if guild_id is not None:
+            await self._give_back('guild', guild_id, self._guild_buckets, self.guild_burst)
+
+    @asynccontextmanager
+    async def slot(self, on_queued: Optional[Callable[[int], Awaitable[None]]] = None):
+        """Hold one unit of the global probe budget, queueing when it is exhausted"""
+        task = asyncio.current_task()
+        self._active.add(task)
+        try:
+            async with self._acquire(on_queued):
+                yield
+        finally:
+            self._active.discard(task)
+
+    @asynccontextmanager
+    async def _acquire(self, on_queued: Optional[Callable[[int], Awaitable[None]]]):
+        """Take a semaphore slot, rejecting when the wait queue is full"""
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                self.metrics['rejected_queue_full'] += 1
+                logger.warning(f"Probe queue full ({self._waiting} waiting), rejecting request")
+                raise ProbeRejected("The port checker is busy right now. Please try again shortly.")
+
+            self._waiting += 1
+            self.metrics['queued'] += 1
+            try:
+                if on_queued is not None:
+                    await on_queued(self._waiting)
+                await self._semaphore.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.metrics['admitted'] += 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    async def drain(self, timeout: float):
+        """Wait for admitted and queued probes, cancelling any still running at the deadline"""
+        tasks = set(self._active)
+        if not tasks:
+            return
+        logger.info(f"Waiting for {len(tasks)} port probe(s) to finish")
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning(f"Cancelling {len(pending)} port probe(s) still running at the deadline")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of probes currently waiting for a slot"""
+        return self._waiting
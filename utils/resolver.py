@@ -0,0 +1,163 @@
+"""
+DNS Resolver Utility
+Async hostname resolution with a TTL-respecting positive and negative cache
+"""
+
+import asyncio
+import ipaddress
+import os
+import re
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+try:
+    import aiodns
+except ImportError:  # Optional: falls back to the loop's getaddrinfo
+    aiodns = None
+
+from utils.metrics import metrics
+from utils.shared_store import get_shared_store
+
+logger = logging.getLogger(__name__)
+
+HOSTNAME_PATTERN = re.compile(r'^(?=.{1,253}$)(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,63}$')
+
+
+class ResolutionError(Exception):
+    """Raised when a host cannot be resolved to a public address"""
+
+
+def parse_public_address(value: str) -> Optional[str]:
+    """Return the normalized address if value is a public IPv4/IPv6 literal, else None"""
+    try:
+        address = ipaddress.ip_address(value.strip('[]'))
+    except ValueError:
+        return None
+    # is_global rejects private, loopback, link-local, multicast, reserved and documentation ranges
+    return str(address) if address.is_global else None
+
+
+def is_hostname(value: str) -> bool:
+    """Syntactic check for a fully qualified hostname"""
+    return bool(HOSTNAME_PATTERN.match(value))
+
+
+class DNSResolver:
+    def __init__(self):
+        self.default_ttl = float(os.getenv('DNS_CACHE_TTL', '300'))
+        self.min_ttl = float(os.getenv('DNS_MIN_TTL', '30'))
+        self.negative_ttl = float(os.getenv('DNS_NEGATIVE_TTL', '60'))
+        self.max_entries = int(os.getenv('DNS_CACHE_SIZE', '4096'))
+
+        # host -> (expires_at, address or None for a cached failure)
+        self._cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._aiodns = None
+        self._shared = get_shared_store()
+        self.metrics = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'shared_hits': 0}
+
+    async def resolve(self, host: str) -> str:
+        """Resolve a hostname or literal to a single public address"""
+        literal = parse_public_address(host)
+        if literal is not None:
+            return literal
+        if not is_hostname(host):
+            raise ResolutionError(f"{host} is not a public IP address or hostname")
+
+        host = host.lower()
+        now = time.monotonic()
+        cached = self._cache.get(host)
+        if cached is not None and cached[0] > now:
+            if cached[1] is None:
+                self.metrics['negative_hits'] += 1
+                raise ResolutionError(f"Could not resolve {host} to a public address")
+            self.metrics['hits'] += 1
+            return cached[1]
+
+        # Coalesce concurrent lookups of the same name during fleet scans
+        pending = self._inflight.get(host)
+        if pending is not None:
+            address = await asyncio.shield(pending)
+            if address is None:
+                raise ResolutionError(f"Could not resolve {host} to a public address")
+            return address
+
+        self.metrics['misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[host] = future
+        try:
+            try:
+                address, ttl = await self._lookup_shared(host)
+            except Exception as e:
+                logger.info(f"DNS lookup failed for {host}: {e}")
+                address, ttl = None, self.negative_ttl
+            self._store(host, address, ttl)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Callers sharing this lookup get the same error instead of waiting forever
+            future.set_exception(e)
+            future.exception()  # Retrieved here so a lookup nobody shared does not log it twice
+            raise
+        else:
+            future.set_result(address)
+        finally:
+            del self._inflight[host]
+
+        if address is None:
+            raise ResolutionError(f"Could not resolve {host} to a public address")
+        return address
+
+    async def _lookup_shared(self, host: str) -> Tuple[Optional[str], float]:
+        """Consult the cluster-wide cache before querying DNS, and publish fresh results to it"""
+        if self._shared is None:
+            return await self._lookup(host)
+
+        loop = asyncio.get_running_loop()
+        key = f"dns:{host}"
+        found, entry = await loop.run_in_executor(None, self._shared.get, key)
+        if found:
+            self.metrics['shared_hits'] += 1
+            address, expires_at = entry
+            return address, max(1.0, expires_at - time.time())
+
+        address, ttl = await self._lookup(host)
+        await loop.run_in_executor(None, self._shared.set, key, [address, time.time() + ttl], ttl)
+        return address, ttl
+
+    @metrics.timed('dns')
+    async def _lookup(self, host: str) -> Tuple[Optional[str], float]:
+        """Query DNS, returning the first public address and its cache lifetime"""
+        if aiodns is not None:
+            if self._aiodns is None:
+                self._aiodns = aiodns.DNSResolver()
+            records: List = []
+            for qtype in ('A', 'AAAA'):
+                try:
+                    records.extend(await self._aiodns.query(host, qtype))
+                except aiodns.error.DNSError:
+                    continue
+            candidates = [(record.host, float(record.ttl)) for record in records]
+        else:
+            # getaddrinfo does not expose record TTLs, so the configured default applies
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+            candidates = [(info[4][0], self.default_ttl) for info in infos]
+
+        for address, ttl in candidates:
+            public = parse_public_address(address)
+            if public is not None:
+                return public, max(self.min_ttl, ttl)
+        return None, self.negative_ttl
+
+    def _store(self, host: str, address: Optional[str], ttl: float):
+        """Cache a lookup result, evicting expired then oldest entries when full"""
+        if len(self._cache) >= self.max_entries:
+            now = time.monotonic()
+            for key in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+                del self._cache[key]
+            while len(self._cache) >= self.max_entries:
+                del self._cache[next(iter(self._cache))]
+        self._cache[host] = (time.monotonic() + ttl, address)
@@ -0,0 +1,59 @@
+"""
+Runtime Tuning Module
+Opt-in high-performance mode: uvloop, default executor size and HTTP connector limits
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def performance_mode() -> bool:
+    """Whether BOT_RUNTIME=performance was requested"""
+    return os.getenv('BOT_RUNTIME', 'default').lower() == 'performance'
+
+
+def install_event_loop() -> str:
+    """Install uvloop as the loop policy in performance mode, returning the loop in use"""
+    if not performance_mode():
+        return 'asyncio'
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("BOT_RUNTIME=performance but uvloop is not installed; using the default asyncio loop")
+        return 'asyncio'
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return 'uvloop'
+
+
+def runtime_settings() -> Dict[str, int]:
+    """Executor and connector sizes for the current mode, each overridable by env"""
+    cpus = os.cpu_count() or 1
+    if performance_mode():
+        # Never below the stock size, which small hosts would otherwise get under cpus * 4
+        defaults = {'executor_workers': min(64, max(cpus * 4, cpus + 4)), 'http_limit': 200, 'http_limit_per_host': 50}
+    else:
+        # Matches the stock ThreadPoolExecutor and aiohttp TCPConnector defaults
+        defaults = {'executor_workers': min(32, cpus + 4), 'http_limit': 100, 'http_limit_per_host': 0}
+
+    return {
+        'executor_workers': int(os.getenv('EXECUTOR_WORKERS', defaults['executor_workers'])),
+        'http_limit': int(os.getenv('HTTP_POOL_LIMIT', defaults['http_limit'])),
+        'http_limit_per_host': int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', defaults['http_limit_per_host'])),
+    }
+
+
+def tune_loop(loop: asyncio.AbstractEventLoop):
+    """Size the default executor used by run_in_executor and getaddrinfo"""
+    settings = runtime_settings()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=settings['executor_workers'], thread_name_prefix='bot-executor')
+    )
+    logger.info(
+        f"Runtime: {type(loop).__module__} loop, {settings['executor_workers']} executor workers, "
+        f"HTTP pool {settings['http_limit']} ({settings['http_limit_per_host'] or 'unlimited'} per host)"
+    )
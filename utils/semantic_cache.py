@@ -0,0 +1,247 @@
+"""
+Semantic Cache Module
+Paraphrase-tolerant answer cache using feature-hashed n-gram embeddings in a NumPy matrix
+"""
+
+import os
+import time
+import zlib
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the semantic cache is disabled without NumPy
+    np = None
+
+from config.knowledge import normalize_question
+from utils.local_answers import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Nearest cached questions checked word by word before giving up on a lookup
+CANDIDATES = 3
+
+
+# Words that change how a question is phrased but not what it asks
+_FILLER = frozenset(
+    "s me my please tell explain show see list view link info information guide tutorial step steps "
+    "instruction instructions way much exactly current currently".split()
+)
+# Domain synonyms folded to one word, so 'install a pnode' and 'pnode setup' ask the same thing.
+# Opposites ('uninstall', 'unstake', 'stop') are deliberately left alone.
+_SYNONYMS = {
+    'install': 'setup', 'installation': 'setup', 'installing': 'setup', 'run': 'setup', 'deploy': 'setup',
+    'upgrade': 'update', 'updating': 'update', 'upgrading': 'update',
+    'memory': 'ram',
+    'disk': 'storage', 'space': 'storage', 'ssd': 'storage',
+    'worth': 'price', 'cost': 'price',
+    'need': 'requirement', 'needed': 'requirement', 'require': 'requirement', 'required': 'requirement',
+    'minimum': 'requirement', 'spec': 'requirement', 'specification': 'requirement',
+    'voting': 'vote', 'staking': 'stake', 'reboot': 'restart', 'verify': 'check',
+    'documentation': 'doc', 'configuration': 'config', 'configure': 'config', 'setting': 'config',
+}
+# Two-word forms of a single word
+_PHRASES = {('set', 'up'): 'setup', ('back', 'up'): 'backup'}
+
+
+def _stem(word: str) -> str:
+    """Strip a plural 's' so 'pnodes' and 'pnode' share features"""
+    return word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+
+
+def _typo(a: str, b: str) -> bool:
+    """One swapped pair of letters, or one edit in a word long enough that it cannot be another word"""
+    if len(a) != len(b):
+        if min(len(a), len(b)) < 7 or abs(len(a) - len(b)) > 1:
+            return False
+        short, long_ = (a, b) if len(a) < len(b) else (b, a)
+        return any(long_[:i] + long_[i + 1:] == short for i in range(len(long_)))
+    diff = [i for i in range(len(a)) if a[i] != b[i]]
+    if len(diff) == 2 and len(a) >= 4:
+        i, j = diff
+        return j == i + 1 and a[i] == b[j] and a[j] == b[i]
+    return len(diff) == 1 and len(a) >= 7
+
+
+def same_question(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Whether two canonical word sets ask the same thing: equal, up to typos"""
+    if a == b:
+        return True
+    only_a, only_b = a - b, b - a
+    return (
+        all(any(_typo(x, y) for y in only_b) for x in only_a)
+        and all(any(_typo(y, x) for x in only_a) for y in only_b)
+    )
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    @staticmethod
+    def words(text: str) -> List[str]:
+        """Normalized, stemmed content words with filler dropped and synonyms folded"""
+        tokens = [_stem(word) for word in tokenize(normalize_question(text))]
+        words: List[str] = []
+        i = 0
+        while i < len(tokens):
+            phrase = _PHRASES.get(tuple(tokens[i:i + 2]))
+            word = phrase or tokens[i]
+            i += 2 if phrase else 1
+            if word not in _FILLER:
+                words.append(_SYNONYMS.get(word, word))
+        return words
+
+    def features(self, words: List[str]) -> List[Tuple[str, float]]:
+        """Weighted word unigrams and bigrams plus character 3-5 grams of each word"""
+        features = [(f"w:{word}", 2.0) for word in words]
+        features.extend((f"b:{a} {b}", 1.0) for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            for n in (3, 4, 5):
+                features.extend((f"c:{padded[i:i + n]}", 1.0) for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, words: List[str]):
+        """L2-normalized float32 vector; each feature hashes to a bucket and a sign"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(words):
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+class _Bucket:
+    """Contiguous rows for questions sharing a keyword signature"""
+
+    def __init__(self, dim: int):
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.last_used = np.zeros(16, dtype=np.float64)
+        self.answers: List[str] = []
+        self.words: List[FrozenSet[str]] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.answers)
+
+    def append(self, vector, words: FrozenSet[str], answer: str, now: float):
+        """Add a row, doubling the backing arrays when full"""
+        if self.size == len(self.matrix):
+            self.matrix = np.concatenate([self.matrix, np.zeros_like(self.matrix)])
+            self.last_used = np.concatenate([self.last_used, np.zeros_like(self.last_used)])
+        self.matrix[self.size] = vector
+        self.last_used[self.size] = now
+        self.answers.append(answer)
+        self.words.append(words)
+
+    def remove(self, index: int):
+        """Drop a row by moving the last row into its place"""
+        last = self.size - 1
+        self.matrix[index] = self.matrix[last]
+        self.last_used[index] = self.last_used[last]
+        self.answers[index] = self.answers[last]
+        self.words[index] = self.words[last]
+        self.answers.pop()
+        self.words.pop()
+
+
+class SemanticCache:
+    def __init__(self, keywords: Tuple[str, ...] = ()):
+        self.capacity = int(os.getenv('SEMANTIC_CACHE_SIZE', '10000'))
+        # Only shortlists candidates; same_question decides. Calibrated with benchmarks/bench_semantic_cache.py
+        self.threshold = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.5'))
+        self.dim = int(os.getenv('SEMANTIC_CACHE_DIM', '256'))
+        self.enabled = np is not None and self.capacity > 0
+        if np is None and self.capacity > 0:
+            logger.warning("NumPy is not installed, semantic answer cache disabled")
+        self.metrics = {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0}
+
+        # Hashed n-grams barely separate 'pnode' from 'vnode', so a hit must mention the same keywords.
+        # Rows are grouped by that keyword signature, so a lookup only scans rows it could match.
+        self.keywords = {_stem(keyword): 1 << bit for bit, keyword in enumerate(keywords)}
+        self.embedder = HashingEmbedder(self.dim)
+        self._buckets: Dict[int, _Bucket] = {}
+        self._version: Optional[str] = None
+        self.size = 0
+
+    def _signature(self, words: List[str]) -> int:
+        """Bitmask of the topic keywords a question mentions"""
+        signature = 0
+        for word in words:
+            signature |= self.keywords.get(word, 0)
+        return signature
+
+    def lookup(self, question: str, version: str) -> Optional[Tuple[str, float]]:
+        """Closest cached answer for the prompt version as (answer, similarity), if above the threshold"""
+        return self.lookup_batch([question], version)[0]
+
+    def lookup_batch(self, questions: List[str], version: str) -> List[Optional[Tuple[str, float]]]:
+        """Score questions against their bucket with one matrix product per bucket"""
+        results: List[Optional[Tuple[str, float]]] = [None] * len(questions)
+        if not self.enabled or version != self._version:
+            self.metrics['misses'] += len(questions)
+            return results
+
+        groups: Dict[int, List[Tuple[int, List[str]]]] = {}
+        for position, question in enumerate(questions):
+            words = self.embedder.words(question)
+            groups.setdefault(self._signature(words), []).append((position, words))
+
+        now = time.monotonic()
+        for signature, members in groups.items():
+            bucket = self._buckets.get(signature)
+            if bucket is None or not bucket.size:
+                continue
+            queries = np.stack([self.embedder.embed(words) for _, words in members])
+            scores = queries @ bucket.matrix[:bucket.size].T
+            k = min(CANDIDATES, bucket.size)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k] if bucket.size > k else np.tile(np.arange(k), (len(members), 1))
+            for row, (position, words) in enumerate(members):
+                # Similar is not enough: a hit must ask for the same things, not e.g. 'udp' instead of 'tcp'
+                wanted = frozenset(words)
+                for index in sorted(top[row], key=lambda index: -scores[row, index]):
+                    score = scores[row, index]
+                    if score < self.threshold:
+                        break
+                    if same_question(wanted, bucket.words[index]):
+                        bucket.last_used[index] = now
+                        results[position] = (bucket.answers[index], float(score))
+                        break
+
+        hits = sum(result is not None for result in results)
+        self.metrics['hits'] += hits
+        self.metrics['misses'] += len(questions) - hits
+        return results
+
+    def put(self, question: str, version: str, answer: str):
+        """Store an answer, evicting the least recently used row when full"""
+        if not self.enabled:
+            return
+        if version != self._version:
+            # Answers from an older prompt are never served again
+            self._buckets.clear()
+            self.size = 0
+            self._version = version
+        if self.size >= self.capacity:
+            self._evict()
+
+        words = self.embedder.words(question)
+        signature = self._signature(words)
+        bucket = self._buckets.get(signature)
+        if bucket is None:
+            bucket = self._buckets[signature] = _Bucket(self.dim)
+        bucket.append(self.embedder.embed(words), frozenset(words), answer, time.monotonic())
+        self.size += 1
+        self.metrics['size'] = self.size
+
+    def _evict(self):
+        """Remove the least recently used row across all buckets"""
+        signature, index = min(
+            ((signature, int(bucket.last_used[:bucket.size].argmin())) for signature, bucket in self._buckets.items() if bucket.size),
+            key=lambda item: self._buckets[item[0]].last_used[item[1]],
+        )
+        self._buckets[signature].remove(index)
+        self.size -= 1
+        self.metrics['evictions'] += 1
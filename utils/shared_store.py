@@ -0,0 +1,94 @@
+"""
+Shared Store Module
+SQLite (WAL) key-value and token-bucket store shared by clustered bot processes
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+"""
+
+
+class SharedStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; executor threads each get their own"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def take_token(self, key: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        """Atomically consume one token from a shared bucket, returning (allowed, retry_after)"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        retry_after = 0.0 if allowed else ((1 - tokens) / rate if rate > 0 else float('inf'))
+        return allowed, retry_after
+
+    def refund_token(self, key: str, capacity: float):
+        """Return one token to a shared bucket, never above its capacity"""
+        self._conn().execute('UPDATE buckets SET tokens = MIN(?, tokens + 1) WHERE key = ?', (capacity, key))
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for an unexpired key"""
+        row = self._conn().execute(
+            'SELECT value FROM kv WHERE key = ? AND expires > ?', (key, time.time())
+        ).fetchone()
+        return (False, None) if row is None else (True, json.loads(row[0]))
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a JSON-serializable value with a time to live"""
+        self._conn().execute(
+            'INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)',
+            (key, json.dumps(value), time.time() + ttl),
+        )
+
+    def purge_expired(self):
+        """Drop expired keys and buckets that have been idle for a day"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute('DELETE FROM kv WHERE expires <= ?', (now,))
+        conn.execute('DELETE FROM buckets WHERE updated <= ?', (now - 86400,))
+
+
+_store: Optional[SharedStore] = None
+
+
+def get_shared_store() -> Optional[SharedStore]:
+    """Shared store configured by SHARED_STORE_PATH, or None for single-process mode"""
+    global _store
+    path = os.getenv('SHARED_STORE_PATH')
+    if not path:
+        return None
+    if _store is None or _store.path != path:
+        _store = SharedStore(path)
+    return _store
@@ -0,0 +1,66 @@
+"""
+Shutdown Coordinator
+Stops intake, drains in-flight work under a deadline, then flushes and closes resources
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ShutdownCoordinator:
+    def __init__(self):
+        # Read again in run(): the coordinator is built at import, before bot.py loads .env
+        self.timeout = float(os.getenv('SHUTDOWN_TIMEOUT', '20'))
+        self.flush_timeout = float(os.getenv('SHUTDOWN_FLUSH_TIMEOUT', '5'))
+        self.draining = False
+        self._drains: List[Tuple[str, Callable[[float], Awaitable[None]]]] = []
+        self._flushes: List[Tuple[str, Callable[[], Awaitable[None]]]] = []
+        self._done: Optional[asyncio.Event] = None
+
+    def on_drain(self, name: str, drain: Callable[[float], Awaitable[None]]):
+        """Register in-flight work to finish within the deadline; drains run concurrently"""
+        self._drains.append((name, drain))
+
+    def on_flush(self, name: str, flush: Callable[[], Awaitable[None]]):
+        """Register a cleanup step; flushes run in registration order after draining"""
+        self._flushes.append((name, flush))
+
+    async def _drain(self, name: str, drain: Callable[[float], Awaitable[None]]):
+        """Run one drain, cancelling it if it overruns its own deadline"""
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(drain(self.timeout), self.timeout + self.flush_timeout)
+            logger.info(f"Drained {name} in {time.monotonic() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Draining {name} failed: {e!r}")
+
+    async def run(self):
+        """Run the full shutdown sequence once; later calls wait for the first to finish"""
+        if self._done is not None:
+            await self._done.wait()
+            return
+        self._done = asyncio.Event()
+        self.draining = True
+        self.timeout = float(os.getenv('SHUTDOWN_TIMEOUT', '20'))
+        self.flush_timeout = float(os.getenv('SHUTDOWN_FLUSH_TIMEOUT', '5'))
+        logger.info(f"Shutting down, draining in-flight work for up to {self.timeout:.0f}s")
+
+        await asyncio.gather(*(self._drain(name, drain) for name, drain in self._drains))
+
+        for name, flush in self._flushes:
+            try:
+                await asyncio.wait_for(flush(), self.flush_timeout)
+            except Exception as e:
+                logger.error(f"Shutdown step {name} failed: {e!r}")
+
+        logger.info("Shutdown complete")
+        self._done.set()
+
+
+# Shared coordinator; components register their drain and flush steps at setup
+shutdown = ShutdownCoordinator()
@@ -0,0 +1,41 @@
+"""
+Startup Timing Module
+Records import and initialization phases for the --startup-profile mode
+"""
+
+import time
+from typing import List, Tuple
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, str, float]] = []
+
+    def mark(self, phase: str, label: str):
+        """Record the time spent since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, label, now - self._last))
+        self._last = now
+
+    def reset_clock(self):
+        """Start the next measurement from now, skipping any untimed gap"""
+        self._last = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self.started
+
+    def format_report(self) -> str:
+        """Render the recorded phases as a plain-text table"""
+        total = sum(seconds for _, _, seconds in self.phases) or 1e-9
+        lines = [f"{'phase':<8}{'step':<40}{'ms':>10}{'share':>8}"]
+        for phase, label, seconds in self.phases:
+            lines.append(f"{phase:<8}{label:<40}{seconds * 1000:>10.1f}{seconds / total * 100:>7.1f}%")
+        lines.append(f"{'':<8}{'total':<40}{total * 1000:>10.1f}")
+        return '\n'.join(lines)
+
+
+# Created on first import, which bot.py does before any heavy import
+startup_timer = StartupTimer()